@@ -0,0 +1,173 @@
+# llm_cache.py - Content-addressed cache of LLM responses stored in SQLite
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Optional
+from config import settings
+from sqlite import ConnectionPool
+from ai.llm_scheduler import llm_scheduler, BATCH
+
+
+class LLMCache:
+    """
+    Responses keyed by sha256(model, temperature, prompt messages), with a TTL
+    and least-recently-used eviction once max_entries is exceeded
+    """
+
+    def __init__(self, database: str, ttl_seconds: float, max_entries: int):
+        self.pool = ConnectionPool(database, size=4)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._schema_ready = False
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(model: str, temperature: float, messages: list) -> str:
+        payload = json.dumps(
+            {
+                "model": model,
+                "temperature": temperature,
+                "messages": [[m.type, m.content] for m in messages],
+            },
+            sort_keys=True
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def enabled_for(self, temperature: float) -> bool:
+        if not settings.LLM_CACHE_ENABLED:
+            return False
+        return temperature == 0 or settings.LLM_CACHE_NONZERO_TEMPERATURE
+
+    def _connection(self):
+        if not self._schema_ready:
+            with self.pool.connection() as db:
+                db.execute('''
+                    CREATE TABLE IF NOT EXISTS llm_cache (
+                        key TEXT PRIMARY KEY,
+                        model TEXT,
+                        temperature REAL,
+                        response TEXT,
+                        created_at REAL,
+                        last_used REAL,
+                        hits INTEGER DEFAULT 0
+                    )
+                ''')
+                db.execute('CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used ON llm_cache(last_used)')
+                db.commit()
+            self._schema_ready = True
+        return self.pool.connection()
+
+    def _count(self, attr: str, n: int = 1):
+        with self._lock:
+            setattr(self, attr, getattr(self, attr) + n)
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        try:
+            with self._connection() as db:
+                row = db.execute(
+                    "SELECT response, created_at FROM llm_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None or now - row[1] > self.ttl_seconds:
+                    if row is not None:
+                        db.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                        db.commit()
+                    self._count("misses")
+                    return None
+                db.execute(
+                    "UPDATE llm_cache SET last_used = ?, hits = hits + 1 WHERE key = ?", (now, key)
+                )
+                db.commit()
+        except sqlite3.Error as e:
+            print(f"LLM cache lookup failed: {e}")
+            self._count("misses")
+            return None
+        self._count("hits")
+        return row[0]
+
+    def put(self, key: str, model: str, temperature: float, response: str):
+        now = time.time()
+        try:
+            with self._connection() as db:
+                db.execute(
+                    """INSERT OR REPLACE INTO llm_cache (key, model, temperature, response, created_at, last_used, hits)
+                       VALUES (?, ?, ?, ?, ?, ?, 0)""",
+                    (key, model, temperature, response, now, now)
+                )
+                # Evict least recently used entries beyond the size bound
+                cursor = db.execute(
+                    """DELETE FROM llm_cache WHERE key IN (
+                           SELECT key FROM llm_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?
+                       )""",
+                    (self.max_entries,)
+                )
+                evicted = cursor.rowcount
+                db.commit()
+        except sqlite3.Error as e:
+            print(f"LLM cache store failed: {e}")
+            return
+        self._count("stores")
+        if evicted > 0:
+            self._count("evictions", evicted)
+
+    def purge(self, expired_only: bool = False) -> int:
+        with self._connection() as db:
+            if expired_only:
+                cursor = db.execute(
+                    "DELETE FROM llm_cache WHERE created_at < ?", (time.time() - self.ttl_seconds,)
+                )
+            else:
+                cursor = db.execute("DELETE FROM llm_cache")
+            db.commit()
+            return cursor.rowcount
+
+    def stats(self) -> dict:
+        try:
+            with self._connection() as db:
+                entries = db.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        except sqlite3.Error:
+            entries = None
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "stores": self.stores,
+            "evictions": self.evictions,
+        }
+
+
+llm_cache = LLMCache(settings.LLM_CACHE_DB, settings.LLM_CACHE_TTL_SECONDS, settings.LLM_CACHE_MAX_ENTRIES)
+
+
+def invoke_cached(model, messages: list, parse, use_cache: bool = True, priority: int = BATCH):
+    """
+    Invoke `model` unless an identical prompt was answered before.
+    `parse` turns the raw text into the result; only parseable replies are cached.
+    Cache misses go through the LLM scheduler and raise LLMBusyError past the deadline.
+    """
+    temperature = model.temperature or 0.0
+    cacheable = use_cache and llm_cache.enabled_for(temperature)
+    key = LLMCache.key(model.model, temperature, messages) if cacheable else None
+
+    if cacheable:
+        cached = llm_cache.get(key)
+        if cached is not None:
+            return parse(cached)
+
+    with llm_scheduler.slot(priority):
+        response = model.invoke(messages)
+    result = parse(response.content)
+
+    if cacheable:
+        llm_cache.put(key, model.model, temperature, response.content)
+    return result
@@ -0,0 +1,152 @@
+# llm_scheduler.py - Bounded, prioritized access to the local Ollama instance
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Optional
+from config import settings
+
+# Priority classes (lower runs first)
+INTERACTIVE = 0  # chat
+BATCH = 1        # assessment evaluation, major recommendations, explanations
+
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BATCH: "batch"}
+
+
+class LLMBusyError(RuntimeError):
+    """Raised when a call cannot start before its deadline; callers use their fallback"""
+
+
+class LLMScheduler:
+    """
+    Priority semaphore in front of the model. At most `max_concurrency` calls
+    run at once; waiters are admitted by (priority, arrival order). A call whose
+    expected queue wait already exceeds its deadline is rejected immediately.
+    """
+
+    def __init__(self, max_concurrency: int, deadlines: dict):
+        self.max_concurrency = max_concurrency
+        self.deadlines = deadlines
+        self._cond = threading.Condition()
+        self._waiting = []  # heap of (priority, seq)
+        self._seq = itertools.count()
+        self._active = 0
+        self._avg_service = None  # EWMA of call duration, seconds
+        self._stats = {
+            "admitted": 0,
+            "shed": 0,
+            "timeouts": 0,
+            "total_wait": 0.0,
+            "max_wait": 0.0,
+        }
+
+    def _expected_wait(self, priority: int) -> float:
+        if self._avg_service is None:
+            return 0.0
+        ahead = sum(1 for p, _ in self._waiting if p <= priority)
+        busy_rounds = max(0, ahead + self._active - self.max_concurrency + 1)
+        return busy_rounds / self.max_concurrency * self._avg_service
+
+    def acquire(self, priority: int, timeout: Optional[float] = None):
+        """Wait for a slot; raises LLMBusyError if none frees up within the deadline"""
+        if timeout is None:
+            timeout = self.deadlines[priority]
+        started = time.monotonic()
+        deadline = started + timeout
+
+        with self._cond:
+            if self._expected_wait(priority) > timeout:
+                self._stats["shed"] += 1
+                raise LLMBusyError(f"LLM queue wait would exceed {timeout}s deadline")
+
+            entry = (priority, next(self._seq))
+            heapq.heappush(self._waiting, entry)
+            try:
+                while not (self._active < self.max_concurrency and self._waiting[0] == entry):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats["timeouts"] += 1
+                        raise LLMBusyError(f"No LLM slot within {timeout}s deadline")
+                    self._cond.wait(remaining)
+                heapq.heappop(self._waiting)
+            except BaseException:
+                if entry in self._waiting:
+                    self._waiting.remove(entry)
+                    heapq.heapify(self._waiting)
+                self._cond.notify_all()
+                raise
+
+            waited = time.monotonic() - started
+            self._active += 1
+            self._stats["admitted"] += 1
+            self._stats["total_wait"] += waited
+            self._stats["max_wait"] = max(self._stats["max_wait"], waited)
+            # Another slot may still be free for the next waiter
+            self._cond.notify_all()
+
+    def release(self, service_time: Optional[float] = None):
+        with self._cond:
+            self._active -= 1
+            if service_time is not None:
+                self._avg_service = (
+                    service_time if self._avg_service is None
+                    else 0.8 * self._avg_service + 0.2 * service_time
+                )
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, priority: int = BATCH, timeout: Optional[float] = None):
+        self.acquire(priority, timeout)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(time.monotonic() - started)
+
+    @asynccontextmanager
+    async def aslot(self, priority: int = INTERACTIVE, timeout: Optional[float] = None):
+        """Async variant: the wait happens in a helper thread, never on the event loop"""
+        waiter = asyncio.ensure_future(asyncio.to_thread(self.acquire, priority, timeout))
+        try:
+            await asyncio.shield(waiter)
+        except asyncio.CancelledError:
+            # The request went away; give the slot back once the waiter gets one
+            waiter.add_done_callback(
+                lambda f: None if f.cancelled() or f.exception() else self.release()
+            )
+            raise
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(time.monotonic() - started)
+
+    def stats(self) -> dict:
+        with self._cond:
+            admitted = self._stats["admitted"]
+            return {
+                "max_concurrency": self.max_concurrency,
+                "active": self._active,
+                "queue_depth": len(self._waiting),
+                "queue_depth_by_priority": {
+                    name: sum(1 for p, _ in self._waiting if p == priority)
+                    for priority, name in PRIORITY_NAMES.items()
+                },
+                "admitted": admitted,
+                "shed": self._stats["shed"],
+                "timeouts": self._stats["timeouts"],
+                "avg_wait_ms": round(self._stats["total_wait"] * 1000 / admitted, 1) if admitted else 0.0,
+                "max_wait_ms": round(self._stats["max_wait"] * 1000, 1),
+                "avg_service_ms": round(self._avg_service * 1000, 1) if self._avg_service else None,
+            }
+
+
+llm_scheduler = LLMScheduler(
+    settings.LLM_MAX_CONCURRENCY,
+    {
+        INTERACTIVE: settings.LLM_INTERACTIVE_DEADLINE_SECONDS,
+        BATCH: settings.LLM_BATCH_DEADLINE_SECONDS,
+    }
+)
@@ -1,5 +1,139 @@
-
+# ollama_llm.py - Process-wide Ollama client registry
+import threading
+import time
+from typing import Dict, Optional
+import httpx
 from langchain_ollama import ChatOllama
+from config import settings
+
+
+class LLMRegistry:
+    """
+    One ChatOllama client per temperature, shared by every request so the
+    underlying HTTP connection is reused. Availability is probed once (and
+    re-probed at most every OLLAMA_RECHECK_SECONDS while down) instead of each
+    request discovering a dead server by exception. Probes run on a
+    background thread; get() only reads the last known state, so it is safe
+    to call from the event loop.
+    """
+
+    def __init__(self, base_url: str, model: str, keep_alive: str):
+        self.base_url = base_url
+        self.model = model
+        self.keep_alive = keep_alive
+        self._clients: Dict[float, ChatOllama] = {}
+        self._lock = threading.Lock()
+        self._http = httpx.Client(base_url=base_url, timeout=5.0)
+        self.available: Optional[bool] = None
+        self.last_error: Optional[str] = None
+        self._checked_at = 0.0
+        self._probing = False
+
+    def client(self, temperature: float = 0.7) -> ChatOllama:
+        """Shared client for a temperature, whether or not the server is up"""
+        llm = self._clients.get(temperature)
+        if llm is None:
+            with self._lock:
+                llm = self._clients.get(temperature)
+                if llm is None:
+                    llm = ChatOllama(
+                        model=self.model,
+                        base_url=self.base_url,
+                        temperature=temperature,
+                        keep_alive=self.keep_alive,
+                        client_kwargs={"timeout": settings.LLM_CALL_TIMEOUT_SECONDS}
+                    )
+                    self._clients[temperature] = llm
+        return llm
+
+    def get(self, temperature: float = 0.7) -> Optional[ChatOllama]:
+        """Shared client, or None while Ollama is known to be unavailable"""
+        if not self.is_available():
+            return None
+        return self.client(temperature)
+
+    def is_available(self) -> bool:
+        """Last known state (unknown counts as down); schedules a probe when one is due"""
+        if self.available is None or (
+            not self.available and time.monotonic() - self._checked_at > settings.OLLAMA_RECHECK_SECONDS
+        ):
+            self._probe_in_background(self.check)
+        return bool(self.available)
+
+    def _probe_in_background(self, target):
+        """Run target on a daemon thread unless a probe is already running"""
+        with self._lock:
+            if self._probing:
+                return
+            self._probing = True
+
+        def run():
+            try:
+                target()
+            finally:
+                self._probing = False
+
+        threading.Thread(target=run, name="ollama-probe", daemon=True).start()
+
+    def check(self) -> bool:
+        """Ask the server which models are pulled; logs only when the state changes"""
+        try:
+            response = self._http.get("/api/tags")
+            response.raise_for_status()
+            names = {m.get("name") for m in response.json().get("models", [])}
+            wanted = self.model if ":" in self.model else f"{self.model}:latest"
+            if wanted in names:
+                self._set_state(True, None)
+            else:
+                self._set_state(False, f"model '{self.model}' is not pulled (run: ollama pull {self.model})")
+        except (httpx.HTTPError, ValueError) as e:
+            self._set_state(False, f"cannot reach Ollama at {self.base_url}: {e}")
+        return bool(self.available)
+
+    def record_error(self, error: Exception):
+        """Mark the server down after a connection failure during a call"""
+        if isinstance(error, (ConnectionError, httpx.ConnectError, httpx.ConnectTimeout)):
+            self._set_state(False, str(error))
+
+    def _set_state(self, available: bool, error: Optional[str]):
+        self._checked_at = time.monotonic()
+        changed = self.available != available
+        self.available = available
+        self.last_error = error
+        if changed:
+            if available:
+                print(f"Ollama model '{self.model}' is available at {self.base_url}")
+            else:
+                print(f"Ollama unavailable, using rule-based fallbacks: {error}")
+
+    def warmup(self):
+        """Load the model into memory with an empty generate request"""
+        if not self.check():
+            return
+        try:
+            self._http.post(
+                "/api/generate",
+                json={"model": self.model, "prompt": "", "keep_alive": self.keep_alive},
+                timeout=settings.OLLAMA_WARMUP_TIMEOUT
+            )
+            print(f"Ollama model '{self.model}' warmed up")
+        except httpx.HTTPError as e:
+            print(f"Ollama warmup failed: {e}")
+
+    def start(self):
+        """Probe availability (and warm up if enabled) without blocking startup"""
+        self._probe_in_background(self.warmup if settings.OLLAMA_WARMUP else self.check)
+
+    def status(self) -> dict:
+        return {
+            "model": self.model,
+            "base_url": self.base_url,
+            "available": self.available,
+            "last_error": self.last_error,
+        }
+
+
+registry = LLMRegistry(settings.OLLAMA_BASE_URL, settings.OLLAMA_MODEL, settings.OLLAMA_KEEP_ALIVE)
 
-llm = ChatOllama(model="gemma2:2b", temperature=0.0)
-print(f"ollama llm is running:{llm}")
+# Deterministic client used by the chatbot graph and the recommender explanation
+llm = registry.client(temperature=0.0)
@@ -1,9 +1,11 @@
 
 from ai.ollama_llm import llm
 from ai.prompts import RECOMMEND_PROMPT
+from ai.llm_scheduler import llm_scheduler, BATCH
 
 def explain(universities):
     print(f"recommender explain function is calling",universities)
-    return llm.invoke(
-        RECOMMEND_PROMPT.format(universities=universities)
-    ).content
+    with llm_scheduler.slot(BATCH):
+        return llm.invoke(
+            RECOMMEND_PROMPT.format(universities=universities)
+        ).content
@@ -0,0 +1 @@
+# __init__.py - Part of benchmarks module
@@ -0,0 +1,170 @@
+# bench_assessment.py - /assessment/evaluate latency under concurrent load
+#
+# Run from the project root:
+#   PYTHONPATH=backend python -m benchmarks.bench_assessment
+#
+# Serves the app with uvicorn (one event loop, as in production) and fires
+# BENCH_CLIENTS concurrent evaluations for BENCH_SECONDS. The model is a stub
+# that sleeps BENCH_LLM_SECONDS per call, so the numbers measure the
+# endpoint, not Ollama. Reports p50/p99 of /assessment/evaluate and of a
+# /health probe running alongside, with the model phase run on the event
+# loop (the old handler) and in the threadpool (the current one).
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+
+SECONDS = float(os.getenv("BENCH_SECONDS", "5"))
+CLIENTS = int(os.getenv("BENCH_CLIENTS", "8"))
+LLM_SECONDS = float(os.getenv("BENCH_LLM_SECONDS", "0.2"))
+
+workdir = tempfile.mkdtemp(prefix="bench_assessment_")
+os.environ.setdefault("DATABASE_NAME", os.path.join(workdir, "unused.db"))
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+os.environ.setdefault("LLM_CACHE_ENABLED", "false")  # every call pays the model latency
+os.environ.setdefault("LLM_MAX_CONCURRENCY", str(CLIENTS))
+os.environ.setdefault("OLLAMA_WARMUP", "false")
+
+import httpx
+import uvicorn
+import sqlite
+from sqlite import ConnectionPool
+from database_enhanced import create_enhanced_schema, seed_enhanced_data
+from services import ai_service
+from services.auth_service import create_access_token
+from routers import assessment
+import main
+
+ANSWERS = [{"question": f"q{i}", "answer": "b"} for i in range(20)]
+
+
+class StubReply:
+    def __init__(self, content: str):
+        self.content = content
+
+
+class StubModel:
+    """Stands in for ChatOllama: fixed latency, valid JSON for both prompts"""
+    model = "bench-stub"
+    temperature = 0.7
+
+    def invoke(self, messages):
+        time.sleep(LLM_SECONDS)
+        if "recommend 3-7 university majors" in messages[-1].content:
+            return StubReply(json.dumps({"recommendations": [
+                {"major_name": f"Major {i}", "match_score": 0.9 - i / 10, "explanation": "fit",
+                 "difficulty_level": "Medium", "career_paths": "Engineer", "estimated_cost": 15000,
+                 "study_duration": "4 years", "roadmap": ["Step 1", "Step 2", "Step 3"]}
+                for i in range(5)
+            ]}))
+        return StubReply(json.dumps({
+            "personality_type": "Analytical", "strengths": ["a", "b", "c"], "weaknesses": ["d", "e", "f"],
+            "scores": {"analytical_thinking": 80, "creativity": 60, "problem_solving": 75, "communication": 70},
+        }))
+
+
+def build_database(path: str):
+    conn = create_enhanced_schema(path)
+    seed_enhanced_data(conn)
+    for i in range(CLIENTS):
+        cursor = conn.execute(
+            "INSERT INTO users (email, auth_provider, is_active) VALUES (?, 'email', 1)", (f"bench-{i}@example.com",)
+        )
+        conn.execute(
+            """INSERT INTO student_profiles (user_id, full_name, gpa, budget, preferred_country, preferred_major)
+               VALUES (?, ?, 3.4, 20000, 'Germany', 'Computer Science')""",
+            (cursor.lastrowid, f"Bench {i}")
+        )
+    conn.commit()
+    user_ids = [row[0] for row in conn.execute("SELECT id FROM users WHERE email LIKE 'bench-%' ORDER BY id")]
+    conn.close()
+    return user_ids
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * pct))], 1) if ordered else 0.0
+
+
+def run(label: str, on_event_loop: bool) -> dict:
+    path = os.path.join(workdir, f"{label}.db")
+    user_ids = build_database(path)
+    sqlite.pool = ConnectionPool(path, CLIENTS + 4, 30.0)
+
+    original = assessment.run_in_threadpool
+    if on_event_loop:
+        async def inline(func, *args):
+            return func(*args)
+        assessment.run_in_threadpool = inline
+
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(main.app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+
+    base = f"http://127.0.0.1:{port}"
+    evaluate_ms, health_ms, errors = [], [], []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + SECONDS
+
+    def evaluator(user_id: int):
+        headers = {"Authorization": "Bearer " + create_access_token({"sub": str(user_id)})}
+        with httpx.Client(base_url=base, timeout=60) as client:
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                r = client.post("/assessment/evaluate", headers=headers,
+                                json={"test_type": "personality", "answers": ANSWERS})
+                elapsed = (time.perf_counter() - started) * 1000
+                with lock:
+                    (evaluate_ms if r.status_code == 200 else errors).append(elapsed)
+
+    def health_probe():
+        with httpx.Client(base_url=base, timeout=60) as client:
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                client.get("/health")
+                health_ms.append((time.perf_counter() - started) * 1000)
+                time.sleep(0.02)
+
+    threads = [threading.Thread(target=evaluator, args=(uid,)) for uid in user_ids]
+    threads.append(threading.Thread(target=health_probe))
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    server.should_exit = True
+    thread.join()
+    assessment.run_in_threadpool = original
+    sqlite.pool.close_all()
+
+    return {
+        "label": label,
+        "rps": round(len(evaluate_ms) / SECONDS, 1),
+        "p50": percentile(evaluate_ms, 0.50),
+        "p99": percentile(evaluate_ms, 0.99),
+        "health_p50": percentile(health_ms, 0.50),
+        "health_p99": percentile(health_ms, 0.99),
+        "errors": len(errors),
+    }
+
+
+if __name__ == "__main__":
+    ai_service.get_ollama_model = lambda: StubModel()
+    results = [run("event_loop", True), run("threadpool", False)]
+
+    print()
+    print(f"{CLIENTS} clients, {SECONDS}s each, stub model {LLM_SECONDS * 1000:.0f} ms per call (2 calls per evaluation)")
+    print(f"{'model phase':<13}{'eval/s':>8}{'eval p50':>10}{'eval p99':>10}{'health p50':>12}{'health p99':>12}{'errors':>8}")
+    for r in results:
+        print(f"{r['label']:<13}{r['rps']:>8}{r['p50']:>10}{r['p99']:>10}{r['health_p50']:>12}{r['health_p99']:>12}{r['errors']:>8}")
@@ -0,0 +1,145 @@
+# bench_assessment_results.py - Assessment lookups at 1M stored results, before/after the indexes
+#
+# Run from the project root:
+#   PYTHONPATH=backend python -m benchmarks.bench_assessment_results
+#
+# Fills a fresh database with BENCH_RESULTS assessment results (spread over
+# BENCH_RESULTS / BENCH_RESULTS_PER_USER users, BENCH_RECS recommendations
+# each), then times the three lookups the API makes:
+#   my-results   /assessment/my-results: a user's results, newest first
+#   latest       /universities/recommend: a user's latest result
+#   result       /assessment/results/{id}: one result with its recommendations
+# first without the assessment indexes (the old queries: recommendations
+# found by user_id), then with them (assessment_service.get_result).
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+RESULTS = int(os.getenv("BENCH_RESULTS", "1000000"))
+RESULTS_PER_USER = int(os.getenv("BENCH_RESULTS_PER_USER", "10"))
+RECS = int(os.getenv("BENCH_RECS", "3"))
+SLOW_CALLS = int(os.getenv("BENCH_SLOW_CALLS", "20"))  # per query without indexes
+CALLS = int(os.getenv("BENCH_CALLS", "5000"))  # per query with indexes
+
+workdir = tempfile.mkdtemp(prefix="bench_assessment_results_")
+os.environ.setdefault("DATABASE_NAME", os.path.join(workdir, "unused.db"))
+
+from database_enhanced import create_enhanced_schema
+from services.assessment_service import get_result
+
+ASSESSMENT_INDEXES = {
+    "idx_assessment_results_user_completed",
+    "idx_major_recommendations_result_score",
+    "idx_major_recommendations_user",
+}
+
+MY_RESULTS = """SELECT id, test_type, personality_type, completed_at FROM assessment_results
+                WHERE user_id = ? ORDER BY completed_at DESC, id DESC"""
+LATEST = """SELECT personality_type, scores, strengths FROM assessment_results
+            WHERE user_id = ? ORDER BY completed_at DESC, id DESC LIMIT 1"""
+
+
+def legacy_result(db: sqlite3.Connection, result_id: int, user_id: int):
+    """The old two-query fetch, recommendations looked up by user_id"""
+    db.execute(
+        """SELECT id, personality_type, scores, strengths, weaknesses, completed_at
+           FROM assessment_results WHERE id = ? AND user_id = ?""",
+        (result_id, user_id)
+    ).fetchone()
+    return db.execute(
+        """SELECT major_name, match_score, explanation, difficulty_level, career_paths,
+                  estimated_cost, study_duration, roadmap
+           FROM major_recommendations WHERE user_id = ? ORDER BY match_score DESC""",
+        (user_id,)
+    ).fetchall()
+
+
+def build_database(path: str) -> sqlite3.Connection:
+    conn = create_enhanced_schema(path)
+    users = max(1, RESULTS // RESULTS_PER_USER)
+    start = datetime(2024, 1, 1)
+    started = time.perf_counter()
+
+    def results():
+        for i in range(1, RESULTS + 1):
+            completed = (start + timedelta(seconds=i * 7)).strftime("%Y-%m-%d %H:%M:%S")
+            yield (i, 1 + i % users, "personality", "Analytical", '{"analytical_thinking": 80}',
+                   '["a", "b", "c"]', '["d", "e", "f"]', completed)
+
+    def recommendations():
+        for i in range(1, RESULTS + 1):
+            created = (start + timedelta(seconds=i * 7)).strftime("%Y-%m-%d %H:%M:%S")
+            for n in range(RECS):
+                yield (1 + i % users, i, f"Major {n}", 0.9 - n / 10, "fit", "Medium",
+                       "Engineer", 15000, "4 years", '["Step 1", "Step 2"]', created)
+
+    conn.executemany(
+        """INSERT INTO assessment_results
+           (id, user_id, test_type, personality_type, scores, strengths, weaknesses, completed_at)
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+        results()
+    )
+    conn.executemany(
+        """INSERT INTO major_recommendations
+           (user_id, result_id, major_name, match_score, explanation, difficulty_level,
+            career_paths, estimated_cost, study_duration, roadmap, created_at)
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+        recommendations()
+    )
+    conn.commit()
+    print(f"Loaded {RESULTS} results / {RESULTS * RECS} recommendations for {users} users "
+          f"in {time.perf_counter() - started:.1f}s")
+    return conn
+
+
+def timed(calls: int, fn) -> dict:
+    users = max(1, RESULTS // RESULTS_PER_USER)
+    rng = random.Random(42)
+    samples = []
+    for _ in range(calls):
+        result_id = rng.randint(1, RESULTS)
+        user_id = 1 + result_id % users
+        started = time.perf_counter()
+        fn(result_id, user_id)
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {
+        "p50": statistics.median(samples),
+        "p99": samples[min(len(samples) - 1, int(len(samples) * 0.99))],
+    }
+
+
+def measure(conn: sqlite3.Connection, calls: int, indexed: bool) -> dict:
+    fetch = (lambda r, u: get_result(conn, r, u)) if indexed else (lambda r, u: legacy_result(conn, r, u))
+    return {
+        "my-results": timed(calls, lambda r, u: conn.execute(MY_RESULTS, (u,)).fetchall()),
+        "latest": timed(calls, lambda r, u: conn.execute(LATEST, (u,)).fetchone()),
+        "result": timed(calls, fetch),
+    }
+
+
+if __name__ == "__main__":
+    conn = build_database(os.path.join(workdir, "results.db"))
+
+    for name in ASSESSMENT_INDEXES:
+        conn.execute(f"DROP INDEX IF EXISTS {name}")
+    before = measure(conn, SLOW_CALLS, indexed=False)
+
+    started = time.perf_counter()
+    conn.close()
+    conn = create_enhanced_schema(os.path.join(workdir, "results.db"))  # recreates the indexes
+    conn.execute("ANALYZE")
+    print(f"Index build: {time.perf_counter() - started:.1f}s")
+    after = measure(conn, CALLS, indexed=True)
+    conn.close()
+
+    print()
+    print(f"{'query':<12}{'before p50 ms':>15}{'before p99 ms':>15}{'after p50 ms':>14}{'after p99 ms':>14}{'speedup':>10}")
+    for query in before:
+        b, a = before[query], after[query]
+        print(f"{query:<12}{b['p50']:>15.3f}{b['p99']:>15.3f}{a['p50']:>14.3f}{a['p99']:>14.3f}"
+              f"{b['p50'] / a['p50']:>9.0f}x")
@@ -0,0 +1,47 @@
+# bench_auth.py - Per-request auth overhead, full jwt.decode vs the verified-token cache
+#
+# Run from the project root:
+#   PYTHONPATH=backend python -m benchmarks.bench_auth
+#
+# Times get_current_user directly (the JWT part of every authenticated
+# request) for a dashboard-like mix of BENCH_TOKENS users, cold and warm.
+import os
+import time
+
+from fastapi.security import HTTPAuthorizationCredentials
+
+CALLS = int(os.getenv("BENCH_CALLS", "50000"))
+TOKENS = int(os.getenv("BENCH_TOKENS", "200"))
+
+from services.auth_service import create_access_token
+from middleware import auth_middleware
+from middleware.auth_middleware import VerifiedTokenCache, get_current_user
+
+
+def per_call_us(credentials) -> float:
+    started = time.perf_counter()
+    for i in range(CALLS):
+        get_current_user(credentials[i % len(credentials)])
+    return (time.perf_counter() - started) / CALLS * 1e6
+
+
+if __name__ == "__main__":
+    credentials = [
+        HTTPAuthorizationCredentials(
+            scheme="Bearer",
+            credentials=create_access_token({"sub": str(i), "email": f"user{i}@example.com"})
+        )
+        for i in range(TOKENS)
+    ]
+
+    auth_middleware.token_cache = VerifiedTokenCache(0)
+    uncached = per_call_us(credentials)
+
+    auth_middleware.token_cache = VerifiedTokenCache(10_000)
+    cached = per_call_us(credentials)
+
+    print(f"{CALLS} calls over {TOKENS} tokens")
+    print(f"{'get_current_user':<22}{'us/call':>10}")
+    print(f"{'jwt.decode every call':<22}{uncached:>10.2f}")
+    print(f"{'verified-token cache':<22}{cached:>10.2f}")
+    print(f"speedup {uncached / cached:.1f}x, hit rate {auth_middleware.token_cache.stats()['hit_rate']}")
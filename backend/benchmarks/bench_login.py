@@ -0,0 +1,116 @@
+# bench_login.py - /auth/login throughput, inline bcrypt vs the hashing process pool
+#
+# Run from the project root:
+#   PYTHONPATH=backend python -m benchmarks.bench_login
+#
+# Concurrent clients log in as pre-registered users for BENCH_SECONDS each.
+# Reports requests/second overall and per core, plus how responsive a cheap
+# endpoint (/health) stays while the login burst is running.
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+SECONDS = float(os.getenv("BENCH_SECONDS", "5"))
+CLIENTS = int(os.getenv("BENCH_CLIENTS", "16"))
+USERS = int(os.getenv("BENCH_USERS", "32"))
+ROUNDS = int(os.getenv("BENCH_ROUNDS", "12"))
+CORES = os.cpu_count() or 1
+
+workdir = tempfile.mkdtemp(prefix="bench_login_")
+os.environ.setdefault("DATABASE_NAME", os.path.join(workdir, "unused.db"))
+# Measure hashing throughput, not the per-IP login limit
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+from fastapi.testclient import TestClient
+import sqlite
+from sqlite import ConnectionPool
+from database_enhanced import create_enhanced_schema
+from services import auth_service, password_service
+from services.password_service import PasswordHasher, _hash
+import main
+
+
+def build_database(path: str):
+    conn = create_enhanced_schema(path)
+    password_hash = _hash("benchmark", ROUNDS)
+    conn.executemany(
+        "INSERT INTO users (email, password_hash, auth_provider, is_active) VALUES (?, ?, 'email', 1)",
+        [(f"login-{i}@example.com", password_hash) for i in range(USERS)]
+    )
+    conn.commit()
+    conn.close()
+
+
+def run(label: str, workers: int) -> dict:
+    path = os.path.join(workdir, f"{label}.db")
+    build_database(path)
+    sqlite.pool = ConnectionPool(path, CLIENTS + 2, 30.0)
+
+    hasher = PasswordHasher(workers, max(CLIENTS, 1) * 2, 30.0, ROUNDS)
+    hasher.start()
+    password_service.hasher = hasher
+    auth_service.hasher = hasher
+
+    client = TestClient(main.app)
+    # Warm up (worker spawn, connection pool)
+    client.post("/auth/login", json={"email": "login-0@example.com", "password": "benchmark"})
+
+    counts = {"ok": 0, "errors": 0}
+    health_ms = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + SECONDS
+
+    def login_worker(n: int):
+        local = TestClient(main.app)
+        ok = errors = 0
+        i = n
+        while time.perf_counter() < deadline:
+            r = local.post("/auth/login", json={
+                "email": f"login-{i % USERS}@example.com", "password": "benchmark"
+            })
+            if r.status_code == 200:
+                ok += 1
+            else:
+                errors += 1
+            i += CLIENTS
+        with lock:
+            counts["ok"] += ok
+            counts["errors"] += errors
+
+    def health_probe():
+        local = TestClient(main.app)
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            local.get("/health")
+            health_ms.append((time.perf_counter() - started) * 1000)
+            time.sleep(0.05)
+
+    threads = [threading.Thread(target=login_worker, args=(n,)) for n in range(CLIENTS)]
+    threads.append(threading.Thread(target=health_probe))
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    hasher.shutdown()
+    sqlite.pool.close_all()
+
+    rps = counts["ok"] / SECONDS
+    return {
+        "label": label,
+        "rps": round(rps, 1),
+        "rps_per_core": round(rps / CORES, 1),
+        "health_p50_ms": round(statistics.median(health_ms), 1) if health_ms else None,
+        "errors": counts["errors"],
+    }
+
+
+if __name__ == "__main__":
+    results = [run("inline", 0), run("process_pool", CORES)]
+
+    print()
+    print(f"{CLIENTS} clients, {SECONDS}s each, bcrypt rounds={ROUNDS}, {CORES} core(s)")
+    print(f"{'hashing':<15}{'login req/s':>13}{'req/s/core':>12}{'/health p50 ms':>16}{'errors':>8}")
+    for r in results:
+        print(f"{r['label']:<15}{r['rps']:>13}{r['rps_per_core']:>12}{r['health_p50_ms']:>16}{r['errors']:>8}")
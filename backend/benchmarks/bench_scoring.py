@@ -0,0 +1,119 @@
+# bench_scoring.py - Vectorized university scoring vs the original per-row loop
+#
+# Run from the project root:
+#   PYTHONPATH=backend python -m benchmarks.bench_scoring
+#
+# Builds synthetic catalogs of 10k and 100k universities, checks that the
+# engine returns exactly what the old loop returned, and times both.
+import random
+import time
+
+from services.scoring_service import UniversityScoringEngine
+
+SIZES = [10_000, 100_000]
+COUNTRIES = ["Germany", "Netherlands", "USA", "Canada", "Switzerland", "Singapore", "UK", "France"]
+MAJORS = [(1, "Computer Science"), (2, "Mechanical Engineering"), (3, "Business Administration"),
+          (4, "AI and Data Science"), (5, "Medicine")]
+PROFILES = [
+    # (gpa, budget, preferred_country, preferred_major)
+    (2.5, 30000, "Germany", "Computer"),
+    (3.0, 15000, "canada", "Engineering"),
+    (2.0, 60000, None, ""),
+]
+
+
+def legacy_recommend(universities, gpa, budget, preferred_country, max_results):
+    """The loop recommend_universities used before the scoring engine (rows in SQL order)"""
+    recommendations = []
+    for uni in universities:
+        uni_id, name, country, tuition, min_gpa, has_scholarship, success_weight, acceptance_rate = uni
+        score = 0.0
+        reasons = []
+        pros = []
+        cons = []
+        if gpa <= min_gpa:
+            gpa_score = min(1.0, (gpa - min_gpa) / (4.0 - min_gpa)) if min_gpa < 4.0 else 1.0
+            score += gpa_score * 0.3
+            if gpa >= min_gpa + 0.3:
+                pros.append(f"Your GPA ({gpa}) exceeds requirements ({min_gpa})")
+                reasons.append("Strong academic match based on GPA")
+        else:
+            cons.append(f"GPA requirement ({min_gpa}) is higher than yours ({gpa})")
+            continue
+        if tuition <= budget:
+            budget_score = 1.0 - (tuition / budget) * 0.5
+            score += budget_score * 0.25
+            pros.append(f"Tuition (${tuition}) is within your budget (${budget})")
+            reasons.append("Affordable tuition within budget")
+        else:
+            if has_scholarship:
+                score += 0.15
+                pros.append("Scholarship opportunities available")
+                cons.append(f"Tuition (${tuition}) exceeds budget, but scholarships may help")
+            else:
+                cons.append(f"Tuition (${tuition}) exceeds budget (${budget})")
+        if has_scholarship:
+            score += 0.2
+            reasons.append("Scholarship opportunities available")
+        if preferred_country and country.lower() == preferred_country.lower():
+            score += 0.1
+            reasons.append(f"Located in your preferred country ({country})")
+            pros.append(f"Located in {country} as preferred")
+        score += (success_weight - 1.0) * 0.15
+        if success_weight > 1.1:
+            reasons.append("Strong success history with past students")
+            pros.append("High success rate with previous applicants")
+        if score > 0.3:
+            recommendations.append({
+                "id": uni_id, "name": name, "country": country, "tuition_fee": tuition,
+                "min_gpa": min_gpa, "scholarship_available": bool(has_scholarship),
+                "recommendation_score": round(score, 2),
+                "reasons": reasons, "pros": pros, "cons": cons
+            })
+    recommendations.sort(key=lambda x: x["recommendation_score"], reverse=True)
+    return recommendations[:max_results]
+
+
+def build_catalog(n: int, seed: int = 7):
+    rng = random.Random(seed)
+    universities = [
+        (i, f"University {i}", rng.choice(COUNTRIES), rng.randrange(0, 60000, 500),
+         round(rng.uniform(2.0, 4.0), 1), rng.random() < 0.5, round(rng.uniform(0.8, 1.6), 2),
+         round(rng.uniform(0.02, 0.9), 2))
+        for i in range(1, n + 1)
+    ]
+    links = [(u[0], m[0]) for u in universities for m in MAJORS if rng.random() < 0.4]
+    return universities, links
+
+
+def best_of(fn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+if __name__ == "__main__":
+    print(f"{'universities':>12}{'profile':>9}{'legacy ms':>12}{'engine ms':>12}{'speedup':>9}")
+    for n in SIZES:
+        universities, links = build_catalog(n)
+        engine = UniversityScoringEngine(universities, MAJORS, links)
+        majors_by_id = dict(MAJORS)
+        offered = {}
+        for uni_id, major_id in links:
+            offered.setdefault(uni_id, set()).add(majors_by_id[major_id].lower())
+
+        for p, (gpa, budget, country, major) in enumerate(PROFILES):
+            # Candidate rows in the old SQL order: offering the major, success_weight DESC
+            candidates = [u for u in engine.rows
+                          if any(major.lower() in m for m in offered.get(u[0], ()))]
+
+            expected = legacy_recommend(candidates, gpa, budget, country, 10)
+            actual = engine.recommend(gpa, budget, country, major, 10)
+            assert actual == expected, f"mismatch at n={n}, profile={p}"
+
+            legacy_ms = best_of(lambda: legacy_recommend(candidates, gpa, budget, country, 10))
+            engine_ms = best_of(lambda: engine.recommend(gpa, budget, country, major, 10))
+            print(f"{n:>12}{p:>9}{legacy_ms:>12.2f}{engine_ms:>12.2f}{legacy_ms / engine_ms:>8.1f}x")
@@ -0,0 +1,110 @@
+# bench_storage_profile.py - Concurrent read/write throughput, rollback journal vs WAL profile
+#
+# Run from the project root:
+#   PYTHONPATH=backend python -m benchmarks.bench_storage_profile
+#
+# Readers hit /universities/search while writers hit /assessment/evaluate
+# (with the rule-based fallback instead of Ollama so only the DB work is measured).
+import os
+import tempfile
+import threading
+import time
+
+SECONDS = float(os.getenv("BENCH_SECONDS", "5"))
+READERS = int(os.getenv("BENCH_READERS", "8"))
+WRITERS = int(os.getenv("BENCH_WRITERS", "2"))
+UNIVERSITIES = int(os.getenv("BENCH_UNIVERSITIES", "2000"))
+
+ROLLBACK_PROFILE = {
+    "journal_mode": "DELETE",
+    "synchronous": "FULL",
+    "busy_timeout": 5000,
+}
+
+workdir = tempfile.mkdtemp(prefix="bench_storage_")
+os.environ.setdefault("DATABASE_NAME", os.path.join(workdir, "unused.db"))
+
+from fastapi.testclient import TestClient
+import sqlite
+from sqlite import ConnectionPool, STORAGE_PROFILE
+from database_enhanced import create_enhanced_schema, seed_enhanced_data
+from services import ai_service
+import main
+
+
+def build_database(path: str, profile: dict):
+    conn = create_enhanced_schema(path)
+    seed_enhanced_data(conn)
+    conn.execute(f"PRAGMA journal_mode = {profile['journal_mode']}")
+    conn.executemany(
+        """INSERT INTO universities (name, country, city, tuition_fee, min_gpa, language,
+                                     scholarship_available, ranking, acceptance_rate)
+           VALUES (?, ?, ?, ?, ?, 'English', ?, ?, 0.3)""",
+        [(f"Bench University {i}", ("Germany", "Canada", "USA", "Netherlands")[i % 4],
+          f"City {i % 50}", (i * 37) % 60000, 2.0 + (i % 20) / 10, i % 2, i)
+         for i in range(UNIVERSITIES)]
+    )
+    conn.commit()
+    conn.close()
+
+
+def run(label: str, profile: dict) -> dict:
+    path = os.path.join(workdir, f"{label}.db")
+    build_database(path, profile)
+    sqlite.pool = ConnectionPool(path, READERS + WRITERS, 30.0, profile)
+
+    client = TestClient(main.app)
+    token = client.post("/auth/register", json={
+        "email": f"bench-{label}@example.com", "password": "benchmark", "full_name": "Bench"
+    }).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    payload = {"test_type": "personality", "answers": [{"question_id": 1, "answer": "A"}]}
+
+    counts = {"read": 0, "write": 0, "errors": 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + SECONDS
+
+    def worker(kind: str):
+        local = TestClient(main.app)
+        done = errors = 0
+        while time.perf_counter() < deadline:
+            if kind == "read":
+                r = local.get("/universities/search", params={"search_query": "Bench", "page": 3},
+                              headers=headers)
+            else:
+                r = local.post("/assessment/evaluate", json=payload, headers=headers)
+            if r.status_code == 200:
+                done += 1
+            else:
+                errors += 1
+        with lock:
+            counts[kind] += done
+            counts["errors"] += errors
+
+    threads = [threading.Thread(target=worker, args=("read",)) for _ in range(READERS)]
+    threads += [threading.Thread(target=worker, args=("write",)) for _ in range(WRITERS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    sqlite.pool.close_all()
+
+    return {
+        "label": label,
+        "reads_per_sec": round(counts["read"] / SECONDS, 1),
+        "writes_per_sec": round(counts["write"] / SECONDS, 1),
+        "errors": counts["errors"],
+    }
+
+
+if __name__ == "__main__":
+    # Keep the benchmark on the DB path: no Ollama round-trips
+    ai_service.get_ollama_model = lambda: None
+
+    results = [run("rollback_journal", ROLLBACK_PROFILE), run("wal_profile", STORAGE_PROFILE)]
+
+    print()
+    print(f"{READERS} readers / {WRITERS} writers, {SECONDS}s each, {UNIVERSITIES} universities")
+    print(f"{'profile':<20}{'search req/s':>15}{'evaluate req/s':>17}{'errors':>9}")
+    for r in results:
+        print(f"{r['label']:<20}{r['reads_per_sec']:>15}{r['writes_per_sec']:>17}{r['errors']:>9}")
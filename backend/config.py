@@ -7,21 +7,92 @@ load_dotenv()
 class Settings:
     # Database
     DATABASE_NAME = os.getenv("DATABASE_NAME", "University.db")
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+    DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "5.0"))  # seconds to wait for a free connection
+
+    # SQLite storage profile (applied to every pooled connection)
+    DB_JOURNAL_MODE = os.getenv("DB_JOURNAL_MODE", "WAL")
+    DB_SYNCHRONOUS = os.getenv("DB_SYNCHRONOUS", "NORMAL")
+    DB_MMAP_SIZE = int(os.getenv("DB_MMAP_SIZE", str(256 * 1024 * 1024)))  # bytes
+    DB_CACHE_SIZE = int(os.getenv("DB_CACHE_SIZE", "-20000"))  # negative = KiB (~20MB)
+    DB_TEMP_STORE = os.getenv("DB_TEMP_STORE", "MEMORY")
+    DB_BUSY_TIMEOUT_MS = int(os.getenv("DB_BUSY_TIMEOUT_MS", "5000"))
+    DB_FOREIGN_KEYS = os.getenv("DB_FOREIGN_KEYS", "ON")  # enforce REFERENCES / ON DELETE CASCADE
+
+    # Catalog snapshot: how often (seconds) to check catalog_version for changes
+    CATALOG_VERSION_CHECK_SECONDS = float(os.getenv("CATALOG_VERSION_CHECK_SECONDS", "5"))
 
     # JWT Settings
     SECRET_KEY = os.getenv("SECRET_KEY", "bcbe7c26cb50d2ebe7e5e7b6f7a58464316791a568c46a053b6803852a07eaee")
     ALGORITHM = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  
     REFRESH_TOKEN_EXPIRE_DAYS = 30
+    JWT_CACHE_MAX_ENTRIES = int(os.getenv("JWT_CACHE_MAX_ENTRIES", "10000"))  # verified tokens kept; 0 disables
+    
+    # Password hashing (bcrypt runs in a process pool, off the request threads)
+    BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))  # existing hashes are upgraded on next login
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1)))  # 0 = hash inline
+    PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))  # queued + running operations
+    PASSWORD_HASH_QUEUE_TIMEOUT = float(os.getenv("PASSWORD_HASH_QUEUE_TIMEOUT", "2.0"))  # then 503
+    
+    # is_active / is_premium cache used by the auth dependencies
+    USER_STATUS_CACHE_TTL_SECONDS = float(os.getenv("USER_STATUS_CACHE_TTL_SECONDS", "30"))
+    USER_STATUS_CACHE_MAX_ENTRIES = int(os.getenv("USER_STATUS_CACHE_MAX_ENTRIES", "10000"))
+    PROFILE_CACHE_TTL_SECONDS = float(os.getenv("PROFILE_CACHE_TTL_SECONDS", "300"))  # /auth/me responses
+    PROFILE_CACHE_MAX_ENTRIES = int(os.getenv("PROFILE_CACHE_MAX_ENTRIES", "10000"))
     
     # File Upload
     UPLOAD_DIR = os.getenv("UPLOAD_DIR", "./backend/storage/uploads")
     MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
+    UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(256 * 1024)))  # bytes read/hashed/written per step
+    IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", "2"))  # image variant processes (0 = resize inline)
+    PDF_WORKERS = int(os.getenv("PDF_WORKERS", "2"))  # text extraction processes (0 = parse inline)
+    PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "50"))  # pages parsed per document
+    PDF_MAX_SECONDS = float(os.getenv("PDF_MAX_SECONDS", "20"))  # parse time per document
+    BLOB_GC_GRACE_SECONDS = float(os.getenv("BLOB_GC_GRACE_SECONDS", "3600"))  # unreferenced blobs younger than this are kept
+    BLOB_GC_INTERVAL_SECONDS = float(os.getenv("BLOB_GC_INTERVAL_SECONDS", "3600"))  # background blob/upload GC (0 = admin-triggered only)
+    # Resumable multipart uploads (/upload/sessions): large scans sent in independently retried parts
+    MULTIPART_MAX_FILE_SIZE = int(os.getenv("MULTIPART_MAX_FILE_SIZE", str(100 * 1024 * 1024)))
+    MULTIPART_PART_SIZE = int(os.getenv("MULTIPART_PART_SIZE", str(5 * 1024 * 1024)))  # default; clients may choose
+    MULTIPART_MIN_PART_SIZE = int(os.getenv("MULTIPART_MIN_PART_SIZE", str(256 * 1024)))
+    MULTIPART_MAX_PART_SIZE = int(os.getenv("MULTIPART_MAX_PART_SIZE", str(32 * 1024 * 1024)))
+    MULTIPART_SESSION_TTL_SECONDS = float(os.getenv("MULTIPART_SESSION_TTL_SECONDS", str(24 * 3600)))  # unfinished uploads are dropped by the next blob GC after this
+    MULTIPART_COMPLETE_LEASE_SECONDS = float(os.getenv("MULTIPART_COMPLETE_LEASE_SECONDS", "600"))  # a completion running longer is presumed dead and may be retried
+    UPLOAD_CACHE_SECONDS = int(os.getenv("UPLOAD_CACHE_SECONDS", "86400"))  # browser cache lifetime for /uploads files
     ALLOWED_EXTENSIONS = {'.pdf', '.jpg', '.jpeg', '.png', '.doc', '.docx'}
     
+    # Frontend assets (fingerprinted + precompressed copies of frontend/static)
+    ASSETS_SOURCE_DIR = os.getenv("ASSETS_SOURCE_DIR", "frontend/static")
+    ASSETS_BUILD_DIR = os.getenv("ASSETS_BUILD_DIR", "frontend/build")
+    ASSETS_BUILD_ON_STARTUP = os.getenv("ASSETS_BUILD_ON_STARTUP", "true").lower() == "true"  # false = serve a prebuilt manifest
+    
     # Ollama Settings
     OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
     OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "gemma2:2b")
+    OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")  # how long Ollama keeps the model loaded
+    OLLAMA_WARMUP = os.getenv("OLLAMA_WARMUP", "true").lower() == "true"  # load the model at startup
+    OLLAMA_WARMUP_TIMEOUT = float(os.getenv("OLLAMA_WARMUP_TIMEOUT", "120"))
+    OLLAMA_RECHECK_SECONDS = float(os.getenv("OLLAMA_RECHECK_SECONDS", "60"))  # re-probe interval while down
+    
+    # LLM scheduler (one local Ollama instance serves every call)
+    LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "2"))
+    LLM_INTERACTIVE_DEADLINE_SECONDS = float(os.getenv("LLM_INTERACTIVE_DEADLINE_SECONDS", "15"))  # max queue wait for chat
+    LLM_BATCH_DEADLINE_SECONDS = float(os.getenv("LLM_BATCH_DEADLINE_SECONDS", "30"))  # max queue wait for assessments/recommendations
+    LLM_CALL_TIMEOUT_SECONDS = float(os.getenv("LLM_CALL_TIMEOUT_SECONDS", "120"))  # max generation time once admitted
+    
+    # Background assessment jobs (POST /assessment/jobs)
+    ASSESSMENT_JOB_WORKERS = int(os.getenv("ASSESSMENT_JOB_WORKERS", "2"))  # evaluation threads
+    ASSESSMENT_JOB_DEDUP_SECONDS = float(os.getenv("ASSESSMENT_JOB_DEDUP_SECONDS", "600"))  # identical resubmits reuse a finished job
+    ASSESSMENT_JOB_LEASE_SECONDS = float(os.getenv("ASSESSMENT_JOB_LEASE_SECONDS", "600"))  # running longer than this at startup = orphaned, re-queued
+    ASSESSMENT_JOB_SSE_KEEPALIVE_SECONDS = float(os.getenv("ASSESSMENT_JOB_SSE_KEEPALIVE_SECONDS", "15"))
+    
+    # LLM response cache (assessment evaluation, major recommendation)
+    LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+    # Separate file next to DATABASE_NAME: never contends with request transactions
+    LLM_CACHE_DB = os.getenv("LLM_CACHE_DB", os.path.join(os.path.dirname(DATABASE_NAME), "llm_cache.db"))
+    LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+    LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000"))
+    LLM_CACHE_NONZERO_TEMPERATURE = os.getenv("LLM_CACHE_NONZERO_TEMPERATURE", "true").lower() == "true"  # false = only cache temperature 0
     
     # ChromaDB Settings
     CHROMA_DB_PATH = os.getenv("CHROMA_DB_PATH", "./chroma_db")
@@ -30,6 +101,20 @@ class Settings:
     # OTP Settings (Simulated - replace with real SMS service in production)
     OTP_EXPIRY_MINUTES = 10
     OTP_LENGTH = 6
+    OTP_BACKEND = os.getenv("OTP_BACKEND", "memory")  # memory (single worker) or sqlite (shared by all workers)
+    
+    # Rate limiting: path -> (limit, keys[, bucket]); limit is "<count>/<second|minute|hour|day>";
+    # paths with the same bucket name draw from the same buckets
+    RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    RATE_LIMITS = {
+        "/auth/send-otp": (os.getenv("RATE_LIMIT_SEND_OTP", "5/minute"), ["ip", "phone"]),
+        "/auth/verify-otp": (os.getenv("RATE_LIMIT_VERIFY_OTP", "10/minute"), ["ip", "phone"]),
+        "/auth/login": (os.getenv("RATE_LIMIT_LOGIN", "10/minute"), ["ip", "email"]),
+        "/chat": (os.getenv("RATE_LIMIT_CHAT", "20/minute"), ["ip", "user_id"], "chat"),
+        "/chat/stream": (os.getenv("RATE_LIMIT_CHAT", "20/minute"), ["ip", "user_id"], "chat"),
+    }
+    RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))  # idle buckets beyond this are evicted (LRU)
+    RATE_LIMIT_SHARDS = int(os.getenv("RATE_LIMIT_SHARDS", "64"))
     SMS_PROVIDER = os.getenv("SMS_PROVIDER", "simulated")# twilio, nexmo, simulated
     # TWILIO_ACCOUNT_SID = os.getenv("TWILIO_ACCOUNT_SID", "")
     # TWILIO_AUTH_TOKEN = os.getenv("TWILIO_AUTH_TOKEN", "")
@@ -1,10 +1,14 @@
 
 import sqlite3
+import sys
 from datetime import datetime
+from sqlite import apply_storage_profile
 
 def create_enhanced_schema(db_name="University.db"):
     """Creates comprehensive database schema for the platform"""
     conn = sqlite3.connect(db_name)
+    # journal_mode=WAL is persisted in the database file, so set it before creating tables
+    apply_storage_profile(conn)
     cursor = conn.cursor()
     
     # ============= USER MANAGEMENT =============
@@ -394,17 +398,342 @@ def create_enhanced_schema(db_name="University.db"):
     # Create indexes for performance
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_users_email ON users(email)')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_users_phone ON users(phone)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_otp_phone ON otp_verification(phone)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_otp_expires ON otp_verification(expires_at)')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_applications_user ON applications(user_id)')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_applications_status ON applications(status)')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_universities_country ON universities(country)')
+    # Keyset pagination order for search (rowid is implicitly the last key)
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_universities_active_rank ON universities(is_active, ranking, name)')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_notifications_user ON notifications(user_id)')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_chat_messages_session ON chat_messages(session_id)')
     
+    create_search_index(cursor)
+    create_catalog_version(cursor)
+    create_blob_store(cursor)
+    create_document_texts(cursor)
+    add_image_variant_columns(cursor)
+    create_upload_sessions(cursor)
+    add_recommendation_result_link(cursor)
+    create_assessment_jobs(cursor)
+    repair_foreign_keys(cursor)
+    
     conn.commit()
     print(f"Enhanced database schema created successfully in '{db_name}'")
     return conn
 
 
+# ============= FULL-TEXT SEARCH =============
+
+# (fts table, content table, indexed columns)
+FTS_TABLES = [
+    ("universities_fts", "universities", ["name", "city", "country", "overview"]),
+    ("majors_fts", "majors", ["name", "description", "career_paths", "required_skills"]),
+]
+
+def create_search_index(cursor):
+    """
+    Creates external-content FTS5 indexes over universities and majors,
+    with triggers keeping them in sync with the base tables
+    """
+    for fts, table, columns in FTS_TABLES:
+        cols = ", ".join(columns)
+        new_cols = ", ".join(f"new.{c}" for c in columns)
+        old_cols = ", ".join(f"old.{c}" for c in columns)
+        
+        cursor.execute(f'''
+            CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+                {cols},
+                content='{table}', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+            )
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {table}_fts_insert AFTER INSERT ON {table} BEGIN
+                INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_cols});
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {table}_fts_delete AFTER DELETE ON {table} BEGIN
+                INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_cols});
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {table}_fts_update AFTER UPDATE OF {cols} ON {table} BEGIN
+                INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_cols});
+                INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_cols});
+            END
+        ''')
+        # Index rows that existed before the triggers did
+        cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+# ============= CATALOG VERSION =============
+
+CATALOG_TABLES = ["universities", "majors", "university_majors", "university_media"]
+
+def create_catalog_version(cursor):
+    """
+    Single-row counter bumped by triggers on every catalog change, so
+    in-process catalog snapshots can tell when they are stale
+    """
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS catalog_version (
+            id INTEGER PRIMARY KEY CHECK(id = 1),
+            version INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    cursor.execute('INSERT OR IGNORE INTO catalog_version (id, version) VALUES (1, 0)')
+    
+    for table in CATALOG_TABLES:
+        for event in ("INSERT", "UPDATE", "DELETE"):
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS {table}_catalog_{event.lower()} AFTER {event} ON {table} BEGIN
+                    UPDATE catalog_version SET version = version + 1 WHERE id = 1;
+                END
+            ''')
+
+
+# ============= CONTENT-ADDRESSED BLOBS =============
+
+# Tables whose rows reference a blob through blob_sha256
+BLOB_REFERENCING_TABLES = ["documents", "application_documents"]
+
+def create_blob_store(cursor):
+    """
+    One row per stored file content (keyed by SHA-256). ref_count is kept by
+    triggers on the referencing tables; released_at (unix time) records the
+    last time a blob was touched or lost a reference, for the GC grace period.
+    """
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS blobs (
+            sha256 TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            path TEXT NOT NULL,
+            ref_count INTEGER NOT NULL DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            released_at REAL
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_blobs_unreferenced ON blobs(released_at) WHERE ref_count <= 0')
+    
+    for table in BLOB_REFERENCING_TABLES:
+        columns = {row[1] for row in cursor.execute(f"PRAGMA table_info({table})")}
+        if "blob_sha256" not in columns:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN blob_sha256 TEXT")
+        cursor.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_blob ON {table}(blob_sha256)')
+        
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {table}_blob_ref_insert AFTER INSERT ON {table}
+            WHEN new.blob_sha256 IS NOT NULL BEGIN
+                UPDATE blobs SET ref_count = ref_count + 1 WHERE sha256 = new.blob_sha256;
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {table}_blob_ref_delete AFTER DELETE ON {table}
+            WHEN old.blob_sha256 IS NOT NULL BEGIN
+                UPDATE blobs SET ref_count = ref_count - 1, released_at = CAST(strftime('%s', 'now') AS REAL)
+                WHERE sha256 = old.blob_sha256;
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {table}_blob_ref_update AFTER UPDATE OF blob_sha256 ON {table}
+            WHEN old.blob_sha256 IS NOT new.blob_sha256 BEGIN
+                UPDATE blobs SET ref_count = ref_count - 1, released_at = CAST(strftime('%s', 'now') AS REAL)
+                WHERE sha256 = old.blob_sha256;
+                UPDATE blobs SET ref_count = ref_count + 1 WHERE sha256 = new.blob_sha256;
+            END
+        ''')
+    
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_documents_user ON documents(user_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_application_documents_app ON application_documents(application_id)')
+    
+    # Repair counts (rows written before the triggers existed, interrupted writers)
+    refs = " + ".join(
+        f"(SELECT COUNT(*) FROM {table} WHERE blob_sha256 = blobs.sha256)"
+        for table in BLOB_REFERENCING_TABLES
+    )
+    cursor.execute(f"UPDATE blobs SET ref_count = {refs} WHERE ref_count != {refs}")
+
+
+def create_document_texts(cursor):
+    """
+    Extracted text per blob (so identical files are parsed once); the row
+    doubles as the extraction job's status
+    """
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS document_texts (
+            sha256 TEXT PRIMARY KEY,
+            status TEXT CHECK(status IN ('queued', 'processing', 'done', 'failed')) DEFAULT 'queued',
+            text TEXT,
+            page_count INTEGER,
+            pages_parsed INTEGER,
+            truncated_reason TEXT,
+            error TEXT,
+            queued_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            finished_at TIMESTAMP
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_document_texts_status ON document_texts(status)')
+
+
+def add_image_variant_columns(cursor):
+    """JSON variant sets ({thumbnail|card|full: {webp|jpeg: {url, width, height, bytes}}})"""
+    for table, column in [("university_media", "variants"), ("student_profiles", "profile_image_variants")]:
+        columns = {row[1] for row in cursor.execute(f"PRAGMA table_info({table})")}
+        if column not in columns:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} TEXT")
+
+
+def create_upload_sessions(cursor):
+    """
+    Resumable multipart uploads: one session per file, one row per received
+    part (the part bytes live under UPLOAD_DIR/multipart/<id>/)
+    """
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS upload_sessions (
+            id TEXT PRIMARY KEY,
+            user_id INTEGER NOT NULL,
+            doc_type TEXT NOT NULL,
+            file_name TEXT NOT NULL,
+            file_size INTEGER NOT NULL,
+            part_size INTEGER NOT NULL,
+            part_count INTEGER NOT NULL,
+            status TEXT CHECK(status IN ('open', 'completing', 'completed')) DEFAULT 'open',
+            document_id INTEGER,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            expires_at REAL NOT NULL,
+            claimed_at REAL,
+            FOREIGN KEY (user_id) REFERENCES users(id),
+            FOREIGN KEY (document_id) REFERENCES documents(id)
+        )
+    ''')
+    # When a completion claimed the session; a 'completing' claim older than
+    # MULTIPART_COMPLETE_LEASE_SECONDS was left by a crashed process
+    columns = {row[1] for row in cursor.execute("PRAGMA table_info(upload_sessions)")}
+    if "claimed_at" not in columns:
+        cursor.execute("ALTER TABLE upload_sessions ADD COLUMN claimed_at REAL")
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS upload_parts (
+            upload_id TEXT NOT NULL,
+            part_number INTEGER NOT NULL,
+            size INTEGER NOT NULL,
+            sha256 TEXT NOT NULL,
+            received_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (upload_id, part_number),
+            FOREIGN KEY (upload_id) REFERENCES upload_sessions(id)
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_upload_sessions_expires ON upload_sessions(expires_at)')
+
+
+def add_recommendation_result_link(cursor):
+    """
+    major_recommendations.result_id: the assessment_results row a
+    recommendation came from, plus the indexes behind the assessment lookups
+    (a user's results newest first, one result with its recommendations)
+    """
+    columns = {row[1] for row in cursor.execute("PRAGMA table_info(major_recommendations)")}
+    if "result_id" not in columns:
+        cursor.execute(
+            "ALTER TABLE major_recommendations ADD COLUMN result_id INTEGER "
+            "REFERENCES assessment_results(id) ON DELETE CASCADE"
+        )
+        # One-off backfill: older rows were written in the same request as their
+        # result, so link only when exactly one of the user's results has the
+        # same timestamp. Anything ambiguous stays NULL rather than guessed.
+        cursor.execute('''
+            UPDATE major_recommendations SET result_id = (
+                SELECT MIN(r.id) FROM assessment_results r
+                WHERE r.user_id = major_recommendations.user_id
+                  AND r.completed_at = major_recommendations.created_at
+                HAVING COUNT(*) = 1
+            )
+            WHERE user_id IS NOT NULL
+        ''')
+        unmatched = cursor.execute(
+            "SELECT COUNT(*) FROM major_recommendations WHERE result_id IS NULL"
+        ).fetchone()[0]
+        if unmatched:
+            print(f"Warning: {unmatched} major_recommendations rows have no exactly matching "
+                  f"assessment result; their result_id is left NULL")
+    
+    cursor.execute('DROP INDEX IF EXISTS idx_major_recommendations_result')
+    cursor.execute('''CREATE INDEX IF NOT EXISTS idx_major_recommendations_result_score
+                      ON major_recommendations(result_id, match_score DESC)''')
+    cursor.execute('''CREATE INDEX IF NOT EXISTS idx_major_recommendations_user
+                      ON major_recommendations(user_id, created_at)''')
+    cursor.execute('''CREATE INDEX IF NOT EXISTS idx_assessment_results_user_completed
+                      ON assessment_results(user_id, completed_at DESC, id DESC)''')
+
+
+def create_assessment_jobs(cursor):
+    """
+    Background assessment evaluations (POST /assessment/jobs). At most one
+    queued/running job per user and identical submission.
+    """
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS assessment_jobs (
+            id TEXT PRIMARY KEY,
+            user_id INTEGER NOT NULL,
+            test_type TEXT NOT NULL,
+            answers TEXT NOT NULL,
+            request_hash TEXT NOT NULL,
+            status TEXT CHECK(status IN ('queued', 'running', 'done', 'failed')) DEFAULT 'queued',
+            attempts INTEGER DEFAULT 0,
+            result_id INTEGER,
+            result TEXT,
+            error TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            started_at TIMESTAMP,
+            finished_at TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+            FOREIGN KEY (result_id) REFERENCES assessment_results(id) ON DELETE SET NULL
+        )
+    ''')
+    cursor.execute('''
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_assessment_jobs_pending
+        ON assessment_jobs(user_id, request_hash) WHERE status IN ('queued', 'running')
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_assessment_jobs_dedup ON assessment_jobs(user_id, request_hash, finished_at)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_assessment_jobs_status ON assessment_jobs(status, created_at)')
+
+
+# Tables whose foreign keys came with the assessment results fix (result_id, jobs)
+FK_REPAIR_TABLES = ["major_recommendations", "assessment_jobs"]
+
+
+def repair_foreign_keys(cursor, apply=False, tables=FK_REPAIR_TABLES):
+    """
+    Rows written while foreign_keys was OFF may point at parents that no
+    longer exist. By default they are only reported. With apply=True (run
+    `python database_enhanced.py --repair-foreign-keys`), what enforcement
+    would have done is applied: delete for ON DELETE CASCADE, clear for
+    SET NULL; anything else is still only reported.
+    """
+    actions = {}
+    for checked in tables:
+        for table, rowid, parent, fk_id in cursor.execute(f"PRAGMA foreign_key_check({checked})").fetchall():
+            if (table, fk_id) not in actions:
+                fk = [row for row in cursor.execute(f"PRAGMA foreign_key_list({table})") if row[0] == fk_id]
+                actions[(table, fk_id)] = (fk[0][6].upper(), [row[3] for row in fk], parent, [])
+            actions[(table, fk_id)][3].append(rowid)
+    
+    for (table, _), (on_delete, columns, parent, rowids) in actions.items():
+        params = [(rowid,) for rowid in rowids]
+        if apply and on_delete == "CASCADE":
+            cursor.executemany(f"DELETE FROM {table} WHERE rowid = ?", params)
+            print(f"Removed {len(rowids)} {table} rows whose {parent} row no longer exists")
+        elif apply and on_delete == "SET NULL":
+            assignments = ", ".join(f"{column} = NULL" for column in columns)
+            cursor.executemany(f"UPDATE {table} SET {assignments} WHERE rowid = ?", params)
+            print(f"Cleared {len(rowids)} {table}.{', '.join(columns)} references to missing {parent} rows")
+        else:
+            print(f"Warning: {len(rowids)} {table} rows reference missing {parent} rows (ON DELETE {on_delete})")
+    if actions and not apply:
+        print("Run `python database_enhanced.py --repair-foreign-keys` to apply ON DELETE to them")
+
+
 def seed_enhanced_data(conn):
     """Seed comprehensive sample data"""
     cursor = conn.cursor()
@@ -465,9 +794,9 @@ def seed_enhanced_data(conn):
     ''', universities_data)
     
     # Link universities to majors
-    cursor.execute('SELECT id FROM universities')
+    cursor.execute('SELECT id FROM universities ORDER BY id')
     uni_ids = [row[0] for row in cursor.fetchall()]
-    cursor.execute('SELECT id FROM majors')
+    cursor.execute('SELECT id FROM majors ORDER BY id')
     major_ids = [row[0] for row in cursor.fetchall()]
     
     university_major_links = []
@@ -527,6 +856,14 @@ def seed_enhanced_data(conn):
 
 
 if __name__ == "__main__":
+    if "--repair-foreign-keys" in sys.argv:
+        # One-off: delete/clear rows left dangling while foreign_keys was OFF
+        connection = sqlite3.connect("University.db")
+        repair_foreign_keys(connection.cursor(), apply=True)
+        connection.commit()
+        connection.close()
+        sys.exit(0)
+    
     # Create and seed database
     connection = create_enhanced_schema()
     seed_enhanced_data(connection)
@@ -1,10 +1,27 @@
 # chatbot_graph.py - Part of graph module
 from langgraph.graph import StateGraph
 from graph.state import ChatState
-from ai.ollama_llm import llm
+from ai.ollama_llm import registry
+from ai.llm_scheduler import llm_scheduler, LLMBusyError, INTERACTIVE
 
-def respond(state: ChatState):
-    result = llm.invoke(state["input"])
+UNAVAILABLE_REPLY = "The AI assistant is currently unavailable. Please try again later."
+BUSY_REPLY = "The AI assistant is busy right now. Please try again in a moment."
+
+async def respond(state: ChatState):
+    # Async so the event loop is free while the model generates; under
+    # chatbot.astream(stream_mode="messages") the tokens are streamed out as they arrive
+    llm = registry.get(temperature=0.0)
+    if llm is None:
+        return {"output": UNAVAILABLE_REPLY}
+    try:
+        async with llm_scheduler.aslot(INTERACTIVE):
+            result = await llm.ainvoke(state["input"])
+    except LLMBusyError as e:
+        print(f"Chat request shed by LLM scheduler: {e}")
+        return {"output": BUSY_REPLY}
+    except Exception as e:
+        registry.record_error(e)
+        raise
     print(f"output response from the model")
     return {"output": result.content}
 
@@ -16,4 +33,3 @@ builder.set_entry_point("chat")
 builder.set_finish_point("chat")
 
 chatbot = builder.compile()
-
@@ -1,9 +1,20 @@
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, HTMLResponse
-from routers import auth, chat, upload, admin, application, university, assessment
+from fastapi.responses import HTMLResponse
+from routers import auth, chat, upload, admin, application, university, assessment, documents, files
+from sqlite import pool
+from services import catalog_service
+from services.password_service import hasher
+from services.pdf_service import pdf_pool
+from services.image_service import image_pool
+from services.storage_service import blob_gc
+from services.asset_service import assets
+from services.assessment_service import job_queue
+from ai.ollama_llm import registry as llm_registry
+from middleware.rate_limit import RateLimitMiddleware, limiter
+from config import settings
 import uvicorn
 
 app = FastAPI(
@@ -20,7 +31,9 @@ app.include_router(application.router)
 app.include_router(assessment.router)
 app.include_router(chat.router)
 app.include_router(upload.router)
+app.include_router(documents.router)
 app.include_router(admin.router)
+app.include_router(files.router)
 
 app.mount(
     "/static",
@@ -30,6 +43,10 @@ app.mount(
 
 
 
+# Added first so CORSMiddleware wraps it and 429 responses carry CORS headers
+if settings.RATE_LIMIT_ENABLED:
+    app.add_middleware(RateLimitMiddleware, limiter=limiter, rules=settings.RATE_LIMITS)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  
@@ -39,43 +56,110 @@ app.add_middleware(
 )
 
 
+@app.on_event("startup")
+def load_catalog():
+    catalog_service.warm_up()
+    llm_registry.start()
+
+
+@app.on_event("startup")
+def prepare_assets():
+    assets.start()
+
+
+@app.on_event("startup")
+def start_password_hasher():
+    hasher.start()
+
+
+@app.on_event("startup")
+def resume_pdf_jobs():
+    pdf_pool.resume_pending()
+
+
+@app.on_event("startup")
+def resume_assessment_jobs():
+    job_queue.resume_pending()
+
+
+@app.on_event("startup")
+def start_blob_gc():
+    blob_gc.start()
+
+
+@app.on_event("shutdown")
+def close_db_pool():
+    pool.close_all()
+
+
+@app.on_event("shutdown")
+def stop_password_hasher():
+    hasher.shutdown()
+
+
+@app.on_event("shutdown")
+def stop_pdf_pool():
+    pdf_pool.shutdown()
+
+
+@app.on_event("shutdown")
+def stop_image_pool():
+    image_pool.shutdown()
+
+
+@app.on_event("shutdown")
+def stop_assessment_jobs():
+    job_queue.shutdown()
+
+
+@app.on_event("shutdown")
+def stop_blob_gc():
+    blob_gc.shutdown()
+
+
 @app.get("/health")
 def health():
     """Health check endpoint"""
     return {
         "status": "ok",
         "service": "University Recommendation Platform",
-        "version": "1.0.0"
+        "version": "1.0.0",
+        "ai": llm_registry.status()
     }
 
+@app.api_route("/assets/{asset_path:path}", methods=["GET", "HEAD"])
+def get_asset(asset_path: str, request: Request):
+    """Fingerprinted CSS/JS (cached for a year; precompressed when the client accepts it)"""
+    return assets.asset(request, asset_path)
+
 @app.get("/", response_class=HTMLResponse)
-def root():
+def root(request: Request):
     """Serve landing page"""
-    return FileResponse(path="frontend/static/templates/landing.html")
+    return assets.page(request, "landing.html")
 
 @app.get("/login", response_class=HTMLResponse)
-def login_page():
-    return FileResponse(path="frontend/static/templates/login.html")
+def login_page(request: Request):
+    return assets.page(request, "login.html")
 
 @app.get("/register", response_class=HTMLResponse)
-def register_page():
-    return FileResponse(path="frontend/static/templates/register.html")
+def register_page(request: Request):
+    return assets.page(request, "register.html")
 
 @app.get("/dashboard", response_class=HTMLResponse)
-def dashboard_page():
-    return FileResponse(path="frontend/static/templates/dashboard.html")
+def dashboard_page(request: Request):
+    return assets.page(request, "dashboard.html")
 
 @app.get("/assessment", response_class=HTMLResponse)
-def assessment_page():
-    return FileResponse(path="frontend/static/templates/assessment.html")
+def assessment_page(request: Request):
+    return assets.page(request, "assessment.html")
 
 @app.get("/profile", response_class=HTMLResponse)
-def profile_page():
-    return FileResponse(path="frontend/static/templates/profile.html")
+def profile_page(request: Request):
+    return assets.page(request, "profile.html")
 
 @app.get("/settings", response_class=HTMLResponse)
-def settings_page():
-    return FileResponse(path="frontend/static/templates/settings.html")
+def settings_page(request: Request):
+    return assets.page(request, "settings.html")
 
 if __name__ == "__main__":
     from database_enhanced import create_enhanced_schema, seed_enhanced_data
@@ -1,4 +1,4 @@
 # middleware/__init__.py
-from .auth_middleware import get_current_user, get_current_active_user, require_premium, get_optional_user
+from .auth_middleware import get_current_user, get_current_active_user, require_premium, require_admin, get_optional_user
 
-__all__ = ["get_current_user", "get_current_active_user", "require_premium", "get_optional_user"]
+__all__ = ["get_current_user", "get_current_active_user", "require_premium", "require_admin", "get_optional_user"]
@@ -1,19 +1,85 @@
 from fastapi.responses import HTMLResponse
-from fastapi import HTTPException, Security, Depends, status
+from fastapi import HTTPException, Request, Security, Depends, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import jwt, JWTError
 from config import settings
-from datetime import datetime
-import sqlite3
+from collections import OrderedDict
+from services.user_service import user_status_cache
+from sqlite import request_db
+import hashlib
+import threading
+import time
 
 security = HTTPBearer()
 
+class VerifiedTokenCache:
+    """
+    LRU of tokens that already passed jwt.decode, keyed by sha256 of the token
+    (raw tokens are never kept). An entry is only served until the token's exp.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[bytes, tuple]" = OrderedDict()  # digest -> (exp, user)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str):
+        digest = hashlib.sha256(token.encode()).digest()
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is not None:
+                if entry[0] > time.time():
+                    self._entries.move_to_end(digest)
+                    self.hits += 1
+                    return dict(entry[1])
+                del self._entries[digest]
+            self.misses += 1
+        return None
+
+    def put(self, token: str, exp, user: dict):
+        if self.max_entries <= 0 or not exp:
+            return
+        digest = hashlib.sha256(token.encode()).digest()
+        with self._lock:
+            self._entries[digest] = (float(exp), dict(user))
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+token_cache = VerifiedTokenCache(settings.JWT_CACHE_MAX_ENTRIES)
+
 def get_current_user(credentials: HTTPAuthorizationCredentials = Security(security)):
     """
     Validates JWT token and returns current user
     """
     token = credentials.credentials
     
+    cached = token_cache.get(token)
+    if cached is not None:
+        return cached
+    return decode_token(token)
+
+def decode_token(token: str):
+    """
+    jwt.decode a bearer token (no cache lookup) and cache the verified user
+    """
     try:
         payload = jwt.decode(
             token,
@@ -29,16 +95,10 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Security(securi
                 headers={"WWW-Authenticate": "Bearer"},
             )
         
-        # Check if token is expired
-        exp = payload.get("exp")
-        if exp and datetime.fromtimestamp(exp) < datetime.now():
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Token has expired",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        
-        return {"user_id": user_id, "email": payload.get("email")}
+        # jwt.decode already rejected expired tokens; exp bounds the cache entry
+        user = {"user_id": user_id, "email": payload.get("email")}
+        token_cache.put(token, payload.get("exp"), user)
+        return user
         
     except JWTError:
         raise HTTPException(
@@ -47,18 +107,21 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Security(securi
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-def get_current_active_user(current_user: dict = Depends(get_current_user)):
+def verify_token(token: str):
+    """Current user for a raw bearer token, or None if it does not verify"""
+    try:
+        return decode_token(token)
+    except HTTPException:
+        return None
+
+def get_current_active_user(request: Request, current_user: dict = Depends(get_current_user)):
     """
-    Validates that the current user is active
+    Validates that the current user is active (via the user status cache;
+    a miss reuses the request's connection when the route has one)
     """
-    from sqlite import get_db
+    user_status = user_status_cache.get(current_user["user_id"], request_db(request))
     
-    db = get_db()
-    cursor = db.cursor()
-    cursor.execute("SELECT is_active FROM users WHERE id = ?", (current_user["user_id"],))
-    result = cursor.fetchone()
-    
-    if not result or not result[0]:
+    if not user_status or not user_status["is_active"]:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Inactive user account"
@@ -66,18 +129,13 @@ def get_current_active_user(current_user: dict = Depends(get_current_user)):
     
     return current_user
 
-def require_premium(current_user: dict = Depends(get_current_active_user)):
+def require_premium(request: Request, current_user: dict = Depends(get_current_active_user)):
     """
-    Requires user to have premium access
+    Requires user to have premium access (via the user status cache)
     """
-    from sqlite import get_db
-    
-    db = get_db()
-    cursor = db.cursor()
-    cursor.execute("SELECT is_premium FROM users WHERE id = ?", (current_user["user_id"],))
-    result = cursor.fetchone()
+    user_status = user_status_cache.get(current_user["user_id"], request_db(request))
     
-    if not result or not result[0]:
+    if not user_status or not user_status["is_premium"]:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Premium subscription required for this feature"
@@ -85,6 +143,18 @@ def require_premium(current_user: dict = Depends(get_current_active_user)):
     
     return current_user
 
+def require_admin(current_user: dict = Depends(get_current_active_user)):
+    """
+    Requires the platform admin account (settings.ADMIN_EMAIL)
+    """
+    if not current_user.get("email") or current_user["email"].lower() != settings.ADMIN_EMAIL.lower():
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
+    
+    return current_user
+
 # Optional authentication (doesn't fail if no token)
 def get_optional_user(credentials: HTTPAuthorizationCredentials = Security(security)):
     """
@@ -0,0 +1,235 @@
+# middleware/rate_limit.py - Token-bucket rate limiting for abuse-prone routes
+import json
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from starlette.concurrency import run_in_threadpool
+from config import settings
+from middleware.auth_middleware import token_cache, verify_token
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+MAX_BODY_BYTES = 64 * 1024  # larger bodies are passed through but not parsed for keys
+
+
+def parse_limit(spec: str) -> Tuple[float, float]:
+    """'5/minute' -> (refill rate per second, burst capacity)"""
+    count, _, period = spec.partition("/")
+    seconds = PERIODS.get(period.strip(), None) or float(period)
+    count = float(count)
+    return count / seconds, count
+
+
+class _Shard:
+    __slots__ = ("lock", "buckets", "allowed", "limited", "evictions")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.buckets: "OrderedDict[str, list]" = OrderedDict()  # key -> [tokens, updated_at]
+        # Counters live with the buckets so the hot path never takes a global lock
+        self.allowed = 0
+        self.limited = 0
+        self.evictions = 0
+
+
+class TokenBucketLimiter:
+    """
+    Token buckets spread over `shards` independently locked LRU maps, so
+    concurrent requests rarely contend. Each shard holds at most
+    max_keys / shards buckets; the least recently used are evicted (an
+    evicted bucket simply starts full again).
+    """
+
+    def __init__(self, max_keys: int, shards: int = 64):
+        self._shards = [_Shard() for _ in range(shards)]
+        self._per_shard = max(1, max_keys // shards)
+        self.max_keys = self._per_shard * shards
+
+    def _shard(self, key: str) -> _Shard:
+        return self._shards[hash(key) % len(self._shards)]
+
+    def take(self, key: str, rate: float, burst: float) -> float:
+        """Consume one token; returns 0 if allowed, else seconds until one is available"""
+        shard = self._shard(key)
+        now = time.monotonic()
+        with shard.lock:
+            bucket = shard.buckets.get(key)
+            if bucket is None:
+                bucket = [burst, now]
+                shard.buckets[key] = bucket
+                if len(shard.buckets) > self._per_shard:
+                    shard.buckets.popitem(last=False)
+                    shard.evictions += 1
+            else:
+                shard.buckets.move_to_end(key)
+                bucket[0] = min(burst, bucket[0] + (now - bucket[1]) * rate)
+                bucket[1] = now
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return 0.0
+            return (1 - bucket[0]) / rate
+
+    def refund(self, key: str, burst: float):
+        shard = self._shard(key)
+        with shard.lock:
+            bucket = shard.buckets.get(key)
+            if bucket is not None:
+                bucket[0] = min(burst, bucket[0] + 1)
+
+    def _count(self, key: str, allowed: bool):
+        shard = self._shard(key)
+        with shard.lock:
+            if allowed:
+                shard.allowed += 1
+            else:
+                shard.limited += 1
+
+    def hit(self, keys: List[str], rate: float, burst: float) -> float:
+        """All-or-nothing across the keys of one request"""
+        taken = []
+        for key in keys:
+            retry_after = self.take(key, rate, burst)
+            if retry_after:
+                for k in taken:
+                    self.refund(k, burst)
+                self._count(key, allowed=False)
+                return retry_after
+            taken.append(key)
+        if keys:
+            self._count(keys[0], allowed=True)
+        return 0.0
+
+    def stats(self) -> dict:
+        counters = {"keys": 0, "allowed": 0, "limited": 0, "evictions": 0}
+        for shard in self._shards:
+            with shard.lock:
+                counters["keys"] += len(shard.buckets)
+                counters["allowed"] += shard.allowed
+                counters["limited"] += shard.limited
+                counters["evictions"] += shard.evictions
+        return {
+            "keys": counters.pop("keys"),
+            "max_keys": self.max_keys,
+            "shards": len(self._shards),
+            **counters,
+        }
+
+
+class RateLimitMiddleware:
+    """
+    ASGI middleware applying settings.RATE_LIMITS: {path: (limit, [key kinds][, bucket])}.
+    Paths naming the same bucket share their token buckets (default: the path).
+    Key kinds: ip (client address), user_id (bearer token subject, else the
+    JSON body's user_id), and any other name is read from the JSON body
+    (e.g. phone, email). Requests missing a key kind are limited on the rest.
+    """
+
+    def __init__(self, app, limiter: TokenBucketLimiter, rules: Dict[str, tuple]):
+        self.app = app
+        self.limiter = limiter
+        self.rules = {
+            path: (parse_limit(rule[0]), rule[1], rule[2] if len(rule) > 2 else path)
+            for path, rule in rules.items()
+        }
+
+    async def __call__(self, scope, receive, send):
+        rule = self.rules.get(scope.get("path")) if scope["type"] == "http" else None
+        if rule is None or scope["method"] == "OPTIONS":
+            return await self.app(scope, receive, send)
+
+        (rate, burst), kinds, bucket = rule
+        body = None
+        if any(kind != "ip" for kind in kinds):
+            body, receive = await self._buffer_body(receive)
+
+        keys = []
+        for kind in kinds:
+            value = await self._identity(kind, scope, body)
+            if value is not None:
+                keys.append(f"{bucket}|{kind}|{value}")
+
+        retry_after = self.limiter.hit(keys, rate, burst) if keys else 0.0
+        if retry_after:
+            return await self._reject(send, retry_after)
+        await self.app(scope, receive, send)
+
+    @staticmethod
+    async def _buffer_body(receive):
+        """Read the request body once and hand the app a receive() that replays it"""
+        chunks = []
+        size = 0
+        more = True
+        while more:
+            message = await receive()
+            if message["type"] != "http.request":
+                break
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            chunks.append(chunk)
+            more = message.get("more_body", False)
+        raw = b"".join(chunks)
+
+        replayed = False
+
+        async def replay():
+            nonlocal replayed
+            if not replayed:
+                replayed = True
+                return {"type": "http.request", "body": raw, "more_body": False}
+            return await receive()
+
+        try:
+            body = json.loads(raw) if raw and size <= MAX_BODY_BYTES else None
+        except ValueError:
+            body = None
+        return (body if isinstance(body, dict) else None), replay
+
+    @staticmethod
+    async def _identity(kind: str, scope, body: Optional[dict]):
+        if kind == "ip":
+            client = scope.get("client")
+            return client[0] if client else None
+        if kind == "user_id":
+            user_id = await _bearer_subject(scope)
+            if user_id is None and body is not None:
+                user_id = body.get("user_id")
+            return user_id
+        value = body.get(kind) if body is not None else None
+        if not value:
+            return None
+        if kind == "phone":
+            # Same number however it is formatted
+            return "".join(filter(str.isdigit, str(value))) or None
+        return str(value).strip().lower()
+
+    @staticmethod
+    async def _reject(send, retry_after: float):
+        payload = json.dumps({"detail": "Too many requests, please slow down"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(payload)).encode()),
+                (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": payload})
+
+
+async def _bearer_subject(scope) -> Optional[str]:
+    """
+    Subject of a verified bearer token. Tokens seen before come from the
+    auth token cache; a new one is decoded in the threadpool, off the loop.
+    """
+    for name, value in scope.get("headers", ()):
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() == "bearer" and token:
+                user = token_cache.get(token) or await run_in_threadpool(verify_token, token)
+                return user["user_id"] if user else None
+    return None
+
+
+limiter = TokenBucketLimiter(settings.RATE_LIMIT_MAX_KEYS, settings.RATE_LIMIT_SHARDS)
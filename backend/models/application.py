@@ -49,6 +49,12 @@ class ApplicationDocumentCreate(BaseModel):
     document_type: str
     file_name: str
 
+class MultipartUploadCreate(BaseModel):
+    doc_type: str = Field(..., min_length=1, max_length=50)
+    file_name: str = Field(..., min_length=1, max_length=255)
+    file_size: int = Field(..., gt=0)
+    part_size: Optional[int] = Field(None, gt=0)  # default MULTIPART_PART_SIZE
+
 class ApplicationDocument(BaseModel):
     id: int
     application_id: int
@@ -85,6 +85,7 @@ class UniversityMedia(BaseModel):
     media_url: str
     caption: Optional[str] = None
     display_order: int
+    variants: Optional[dict] = None  # {thumbnail|card|full: {webp|jpeg: {url, width, height, bytes}}}
     
     class Config:
         from_attributes = True
@@ -146,10 +147,12 @@ class UniversitySearchFilter(BaseModel):
 
 class UniversitySearchResponse(BaseModel):
     universities: List[UniversityBasic]
-    total_count: int
+    total_count: Optional[int] = None  # None when the count was skipped (cursor mode)
     page: int
     page_size: int
-    total_pages: int
+    total_pages: Optional[int] = None
+    next_cursor: Optional[str] = None  # Opaque keyset cursor for the next page
+    has_more: bool = False
     filters_applied: dict
 
 # ============= AI Recommendation =============
@@ -1,9 +1,100 @@
-from fastapi import APIRouter
-from sqlite import get_db
+from fastapi import APIRouter, Depends, HTTPException
+from sqlite import get_db, pool
+from ai.llm_cache import llm_cache
+from ai.llm_scheduler import llm_scheduler
+from services import storage_service
+from services.pdf_service import pdf_pool
+from services.asset_service import assets
+from services.assessment_service import job_queue
+from services.user_service import user_status_cache, profile_cache, set_user_active
+from middleware.auth_middleware import require_admin, token_cache
+from middleware.rate_limit import limiter
+import sqlite3
 
 router = APIRouter(prefix="/admin")
 
 @router.get("/ai-weights")
-def get_weights():
-    db = get_db()
+def get_weights(db: sqlite3.Connection = Depends(get_db)):
     return dict(db.execute("SELECT * FROM ai_weights").fetchone())
+
+@router.get("/db-pool")
+def get_db_pool_stats(admin: dict = Depends(require_admin)):
+    """Connection pool metrics (checkouts, waits, wait time)"""
+    return pool.stats()
+
+@router.get("/llm-cache")
+def get_llm_cache_stats(admin: dict = Depends(require_admin)):
+    """LLM response cache size and hit/miss counters"""
+    return llm_cache.stats()
+
+@router.get("/llm-scheduler")
+def get_llm_scheduler_stats(admin: dict = Depends(require_admin)):
+    """LLM queue depth, in-flight calls, wait time and shed/timeout counters"""
+    return llm_scheduler.stats()
+
+@router.delete("/llm-cache")
+def purge_llm_cache(expired_only: bool = False, admin: dict = Depends(require_admin)):
+    """Purge cached LLM responses (all, or only those past their TTL)"""
+    return {"purged": llm_cache.purge(expired_only=expired_only)}
+
+@router.get("/user-status-cache")
+def get_user_status_cache_stats(admin: dict = Depends(require_admin)):
+    """Auth user-status cache size and hit/miss counters"""
+    return user_status_cache.stats()
+
+@router.get("/profile-cache")
+def get_profile_cache_stats(admin: dict = Depends(require_admin)):
+    """/auth/me response cache size and hit/miss counters"""
+    return profile_cache.stats()
+
+@router.get("/token-cache")
+def get_token_cache_stats(admin: dict = Depends(require_admin)):
+    """Verified-JWT cache size and hit/miss counters"""
+    return token_cache.stats()
+
+@router.get("/rate-limit")
+def get_rate_limit_stats(admin: dict = Depends(require_admin)):
+    """Token-bucket counts, allowed/limited requests and evictions"""
+    return limiter.stats()
+
+@router.get("/blobs")
+def get_blob_stats(admin: dict = Depends(require_admin), db: sqlite3.Connection = Depends(get_db)):
+    """Stored vs referenced document bytes (deduplication savings)"""
+    return storage_service.blob_stats(db)
+
+@router.post("/blobs/gc")
+def collect_blobs(grace_seconds: float = None, admin: dict = Depends(require_admin),
+                  db: sqlite3.Connection = Depends(get_db)):
+    """Delete blobs that no document or application document references"""
+    return storage_service.gc_blobs(db, grace_seconds)
+
+@router.get("/pdf-pool")
+def get_pdf_pool_stats(admin: dict = Depends(require_admin)):
+    """PDF extraction jobs submitted/completed/failed and the per-document budget"""
+    return pdf_pool.stats()
+
+@router.get("/assessment-jobs")
+def get_assessment_job_stats(admin: dict = Depends(require_admin)):
+    """Background assessment jobs submitted/deduplicated/completed/failed and SSE subscribers"""
+    return job_queue.stats()
+
+@router.get("/assets")
+def get_asset_stats(admin: dict = Depends(require_admin)):
+    """Fingerprinted asset/page counts and the precompressed encodings built"""
+    return assets.stats()
+
+@router.post("/users/{user_id}/deactivate")
+def deactivate_user(user_id: int, admin: dict = Depends(require_admin),
+                    db: sqlite3.Connection = Depends(get_db)):
+    """Disable an account; takes effect on the user's next request"""
+    if not set_user_active(db, user_id, False):
+        raise HTTPException(status_code=404, detail="User not found")
+    return {"user_id": user_id, "is_active": False}
+
+@router.post("/users/{user_id}/activate")
+def activate_user(user_id: int, admin: dict = Depends(require_admin),
+                  db: sqlite3.Connection = Depends(get_db)):
+    """Re-enable a deactivated account"""
+    if not set_user_active(db, user_id, True):
+        raise HTTPException(status_code=404, detail="User not found")
+    return {"user_id": user_id, "is_active": True}
@@ -1,15 +1,18 @@
 # application.py - Part of routers module
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, HTTPException
 from sqlite import get_db
+import sqlite3
 
 router = APIRouter(prefix="/application")
 
 @router.post("/apply")
-def apply(user_id: int, university_id: int):
-    db = get_db()
-    db.execute(
-        "INSERT INTO applications (user_id, university_id, status) VALUES (?, ?, ?)",
-        (user_id, university_id, "Submitted")
-    )
+def apply(user_id: int, university_id: int, db: sqlite3.Connection = Depends(get_db)):
+    try:
+        db.execute(
+            "INSERT INTO applications (user_id, university_id, status) VALUES (?, ?, ?)",
+            (user_id, university_id, "Submitted")
+        )
+    except sqlite3.IntegrityError:
+        raise HTTPException(status_code=404, detail="User or university not found")
     db.commit()
     return {"status": "submitted"}
@@ -1,13 +1,17 @@
 
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from models.assessment import SubmitAssessment, AssessmentResultResponse, RecommendationsResponse
-from services import ai_service
+from services import assessment_service
+from services.assessment_service import job_queue
+from config import settings
 from middleware.auth_middleware import get_current_active_user
-from sqlite import get_db
+from sqlite import get_db, db_connection
+import asyncio
 import sqlite3
 import json
 from datetime import datetime
-import logging
 from pydantic import BaseModel
 from typing import List 
 
@@ -20,130 +24,101 @@ class AssessmentRequest(BaseModel):
 @router.post("/evaluate", response_model=dict)
 async def evaluate_assessment(
     assessment: AssessmentRequest,
-    current_user: dict = Depends(get_current_active_user),
-    db: sqlite3.Connection = Depends(get_db)
+    current_user: dict = Depends(get_current_active_user)
 ):
     """Evaluate assessment and return major recommendations"""
-    user_id = current_user["user_id"]
-    
-
-    results = ai_service.evaluate_assessment(
+    # LLM calls and SQLite writes block: keep them off the event loop
+    return await run_in_threadpool(
+        assessment_service.evaluate_and_save,
+        int(current_user["user_id"]),
         assessment.test_type,
         assessment.answers
     )
-    
-    logging.info(f"results :{results}")
-    # Store assessment results
-    cursor = db.cursor()
-    cursor.execute(
-        """INSERT INTO assessment_results 
-           (user_id, test_type, personality_type, scores, strengths, weaknesses)
-           VALUES (?, ?, ?, ?, ?, ?)""",
-        (
-            user_id,
-            assessment.test_type,
-            results.get("personality_type", ""),
-            json.dumps(results.get("scores", {})),
-            json.dumps(results.get("strengths", [])),
-            json.dumps(results.get("weaknesses", [])),
-            
-        )
-    )
-    result_id = cursor.lastrowid
-    
-    # Get major recommendations
-    recommendations = ai_service.recommend_majors(user_id, db, results)
 
-    logging.info(f'recommanded majors by AI:{recommendations}')
-    
-    # Store major recommendations
-    for rec in recommendations:
-        cursor.execute(
-            """INSERT INTO major_recommendations
-               (user_id, major_name, match_score, explanation,
-                difficulty_level, career_paths, estimated_cost, study_duration, roadmap)
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-            (
-                user_id,
-                #result_id,
-                rec.get("major_name", ""),
-                rec.get("match_score", 0.0),
-                rec.get("explanation", ""),
-                rec.get("difficulty_level", ""),
-                rec.get("career_paths", ""),
-                rec.get("estimated_cost", 0),
-                rec.get("study_duration", ""),
-                json.dumps(rec.get("roadmap", []))
-            )
-        )
-    
-    db.commit()
-    
-    return {
-        "success": True,
-        "result_id": result_id,
-        "assessment_summary": results,
-        "recommendations": recommendations,
-        "total_count": len(recommendations)
-    }
+@router.post("/jobs", status_code=202)
+def submit_assessment_job(
+    assessment: AssessmentRequest,
+    response: Response,
+    current_user: dict = Depends(get_current_active_user)
+):
+    """
+    Queue an evaluation and return its job id immediately; poll
+    /assessment/jobs/{job_id} or subscribe to /assessment/jobs/{job_id}/events.
+    Resubmitting the same answers returns the existing job (200).
+    """
+    job, created = job_queue.submit(int(current_user["user_id"]), assessment.test_type, assessment.answers)
+    if not created:
+        response.status_code = 200
+    response.headers["Location"] = f"/assessment/jobs/{job['job_id']}"
+    return job
+
+@router.get("/jobs/{job_id}")
+def get_assessment_job(
+    job_id: str,
+    current_user: dict = Depends(get_current_active_user),
+    db: sqlite3.Connection = Depends(get_db)
+):
+    """Job status; includes the evaluation result once done"""
+    job = assessment_service.get_job(db, job_id, int(current_user["user_id"]))
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+def _sse(data: dict, event: str = None) -> str:
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+def _load_job(job_id: str, user_id: int):
+    with db_connection() as db:
+        return assessment_service.get_job(db, job_id, user_id)
+
+async def _job_events(job_id: str, user_id: int):
+    """Current status, then one final event when the job finishes"""
+    finished = job_queue.subscribe(job_id)
+    try:
+        job = await run_in_threadpool(_load_job, job_id, user_id)
+        yield _sse(job, event="status")
+        while job["status"] in ("queued", "running"):
+            # Set by this process's workers; the timeout re-reads SQLite in case
+            # another process ran the job, and keeps proxies from closing the stream
+            try:
+                await asyncio.wait_for(finished.wait(), settings.ASSESSMENT_JOB_SSE_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+            job = await run_in_threadpool(_load_job, job_id, user_id)
+        yield _sse(job, event=job["status"])
+    finally:
+        job_queue.unsubscribe(job_id, finished)
+
+@router.get("/jobs/{job_id}/events")
+async def stream_assessment_job(
+    job_id: str,
+    current_user: dict = Depends(get_current_active_user)
+):
+    """Server-Sent Events: a 'status' event now, then 'done' or 'failed'"""
+    user_id = int(current_user["user_id"])
+    if await run_in_threadpool(_load_job, job_id, user_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return StreamingResponse(
+        _job_events(job_id, user_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @router.get("/results/{result_id}")
-async def get_assessment_results(
+def get_assessment_results(
     result_id: int,
     current_user: dict = Depends(get_current_active_user),
     db: sqlite3.Connection = Depends(get_db)
 ):
     """Get specific assessment results"""
-    user_id = current_user["user_id"]
-    cursor = db.cursor()
-    
-    # Get assessment result
-    cursor.execute(
-        """SELECT id, personality_type, scores, strengths, weaknesses, completed_at
-           FROM assessment_results
-           WHERE id = ? AND user_id = ?""",
-        (result_id, user_id)
-    )
-    result = cursor.fetchone()
-    print(f"result:{result}")
-    if not result:
+    result = assessment_service.get_result(db, result_id, int(current_user["user_id"]))
+    if result is None:
         raise HTTPException(status_code=404, detail="Assessment not found")
-    
-    # Get recommendations
-    cursor.execute(
-        """SELECT major_name, match_score, explanation, difficulty_level, career_paths,
-                  estimated_cost, study_duration, roadmap
-           FROM major_recommendations
-           WHERE user_id = ?
-           ORDER BY match_score DESC""",
-        (result_id,)
-    )
-    recommendations = []
-    for row in cursor.fetchall():
-        recommendations.append({
-            "major_name": row[0],
-            "match_score": row[1],
-            "explanation": row[2],
-            "difficulty_level": row[3],
-            "career_paths": row[4],
-            "estimated_cost": row[5],
-            "study_duration": row[6],
-            "roadmap": json.loads(row[7]) if row[7] else []
-        })
-    print(f"recommandadtion list:{recommendations}")
-    return {
-        "result_id": result[0],
-        "personality_type": result[1],
-        "scores": json.loads(result[2]) if result[2] else {},
-        "strengths": json.loads(result[3]) if result[3] else [],
-        "weaknesses": json.loads(result[4]) if result[4] else [],
-       # "insights": result[5],
-        "completed_at": result[6],
-        "recommendations": recommendations
-    }
+    return result
 
 @router.get("/my-results")
-async def get_my_assessments(
+def get_my_assessments(
     current_user: dict = Depends(get_current_active_user),
     db: sqlite3.Connection = Depends(get_db)
 ):
@@ -155,7 +130,7 @@ async def get_my_assessments(
         """SELECT id, test_type, personality_type, completed_at
            FROM assessment_results
            WHERE user_id = ?
-           ORDER BY completed_at DESC""",
+           ORDER BY completed_at DESC, id DESC""",
         (user_id,)
     )
     
@@ -1,20 +1,25 @@
 
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, Request, Response, File, UploadFile, status
 from models.user import (
     OTPRequest, OTPVerify, UserRegister, UserLogin,
     TokenResponse, UserWithProfile, StudentProfileCreate
 )
-from services import auth_service, otp_service, notification_service
+from services import auth_service, otp_service, notification_service, storage_service
+from services.password_service import HasherBusyError
+from services.user_service import profile_cache, invalidate_user
 from sqlite import get_db
+from config import settings
 from middleware.auth_middleware import get_current_active_user
+from utils.http_files import etag_matches
 import sqlite3
+import json
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 @router.post("/send-otp", status_code=status.HTTP_200_OK)
-def send_otp(request: OTPRequest, db: sqlite3.Connection = Depends(get_db)):
+def send_otp(request: OTPRequest):
     """Send OTP to phone number"""
-    otp_code, success = otp_service.create_otp(db, request.phone)
+    otp_code, success = otp_service.create_otp(request.phone)
     
     if not success:
         raise HTTPException(
@@ -25,14 +30,14 @@ def send_otp(request: OTPRequest, db: sqlite3.Connection = Depends(get_db)):
     return {
         "message": "OTP sent successfully",
         "phone": request.phone,
-        "expires_in_minutes": 10
+        "expires_in_minutes": settings.OTP_EXPIRY_MINUTES
     }
 
 @router.post("/verify-otp", response_model=TokenResponse)
 def verify_otp(request: OTPVerify, db: sqlite3.Connection = Depends(get_db)):
     """Verify OTP and login/register user"""
     # Verify OTP
-    is_valid = otp_service.verify_otp(db, request.phone, request.otp_code)
+    is_valid = otp_service.verify_otp(request.phone, request.otp_code, db)
     
     if not is_valid:
         raise HTTPException(
@@ -69,9 +74,16 @@ def register(request: UserRegister, db: sqlite3.Connection = Depends(get_db)):
         )
     
     # Create user
-    user_id = auth_service.create_user(
-        db, request.phone, request.email, request.password, request.auth_provider
-    )
+    try:
+        user_id = auth_service.create_user(
+            db, request.phone, request.email, request.password, request.auth_provider
+        )
+    except HasherBusyError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many sign-ins in progress, please retry",
+            headers={"Retry-After": "1"}
+        )
     
     if not user_id:
         raise HTTPException(
@@ -110,7 +122,14 @@ def login(request: UserLogin, db: sqlite3.Connection = Depends(get_db)):
             detail="Email and password required"
         )
     
-    user = auth_service.authenticate_user(db, request.email, request.password)
+    try:
+        user = auth_service.authenticate_user(db, request.email, request.password)
+    except HasherBusyError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many sign-ins in progress, please retry",
+            headers={"Retry-After": "1"}
+        )
     
     if not user:
         raise HTTPException(
@@ -124,64 +143,21 @@ def login(request: UserLogin, db: sqlite3.Connection = Depends(get_db)):
 
 @router.get("/me")
 def get_current_user_info(
-    current_user: dict = Depends(get_current_active_user),
-    db: sqlite3.Connection = Depends(get_db)
+    request: Request,
+    current_user: dict = Depends(get_current_active_user)
 ):
-    """Get current user information with profile"""
-    user_id = current_user["user_id"]
+    """Get current user information with profile (cached; supports If-None-Match)"""
+    cached = profile_cache.get(current_user["user_id"])
     
-    # Get user info
-    cursor = db.cursor()
-    cursor.execute(
-        "SELECT id, email, phone, auth_provider, is_active, is_premium, created_at FROM users WHERE id = ?",
-        (user_id,)
-    )
-    user_row = cursor.fetchone()
-    
-    if not user_row:
+    if cached is None:
         raise HTTPException(status_code=404, detail="User not found")
     
-    user_data = {
-        "id": user_row[0],
-        "email": user_row[1],
-        "phone": user_row[2],
-        "auth_provider": user_row[3],
-        "is_active": bool(user_row[4]),
-        "is_premium": bool(user_row[5]),
-        "created_at": user_row[6]
-    }
-    
-    # Get profile
-    cursor.execute(
-        """SELECT id, user_id, full_name, nationality, date_of_birth, gpa, budget,
-                  preferred_country, preferred_major, learning_style, career_goal, bio, profile_image
-           FROM student_profiles WHERE user_id = ?""",
-        (user_id,)
-    )
-    profile_row = cursor.fetchone()
-    
-    profile_data = None
-    if profile_row:
-        profile_data = {
-            "id": profile_row[0],
-            "user_id": profile_row[1],
-            "full_name": profile_row[2],
-            "nationality": profile_row[3],
-            "date_of_birth": profile_row[4],
-            "gpa": profile_row[5],
-            "budget": profile_row[6],
-            "preferred_country": profile_row[7],
-            "preferred_major": profile_row[8],
-            "learning_style": profile_row[9],
-            "career_goal": profile_row[10],
-            "bio": profile_row[11],
-            "profile_image": profile_row[12]
-        }
+    body, etag = cached
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
     
-    return {
-        "user": user_data,
-        "profile": profile_data
-    }
+    return Response(content=body, media_type="application/json", headers=headers)
 
 @router.post("/profile/create")
 def create_profile(
@@ -220,9 +196,40 @@ def create_profile(
         )
     
     db.commit()
+    invalidate_user(user_id)
     
     return {"message": "Profile updated successfully"}
 
+@router.post("/profile/image")
+async def upload_profile_image(
+    file: UploadFile = File(...),
+    current_user: dict = Depends(get_current_active_user),
+    db: sqlite3.Connection = Depends(get_db)
+):
+    """Upload a profile picture; thumbnail/card/full variants are generated"""
+    user_id = int(current_user["user_id"])
+    try:
+        info = await storage_service.save_profile_image(file, user_id)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    profile_image = info["variants"]["full"]["jpeg"]["url"]
+    variants = json.dumps(info["variants"])
+    cursor = db.cursor()
+    cursor.execute(
+        "UPDATE student_profiles SET profile_image = ?, profile_image_variants = ? WHERE user_id = ?",
+        (profile_image, variants, user_id)
+    )
+    if cursor.rowcount == 0:
+        cursor.execute(
+            "INSERT INTO student_profiles (user_id, profile_image, profile_image_variants) VALUES (?, ?, ?)",
+            (user_id, profile_image, variants)
+        )
+    db.commit()
+    invalidate_user(user_id)
+    
+    return {"profile_image": profile_image, "variants": info["variants"]}
+
 @router.post("/logout")
 def logout(current_user: dict = Depends(get_current_active_user)):
     """Logout user (client should discard tokens)"""
@@ -1,17 +1,82 @@
 # chat.py - Part of routers module
 from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from graph.chatbot_graph import chatbot
+from collections import deque
+import json
+import time
 
 router = APIRouter()
 
+# Recent time-to-first-token samples (ms) for /chat/metrics
+_ttft_samples = deque(maxlen=1000)
+
 class ChatRequest(BaseModel):
     user_id: int
     message: str
 
 @router.post("/chat")
-def chat(req: ChatRequest):
-    reply = chatbot.invoke({"input": req.message})
+async def chat(req: ChatRequest):
+    reply = await chatbot.ainvoke({"input": req.message})
     print(f" response received from the model",reply)
   
     return {"reply": reply["output"]}
+
+def _sse(data: dict, event: str = None) -> str:
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+async def _stream_reply(message: str):
+    started = time.perf_counter()
+    ttft_ms = None
+    final_output = None
+    
+    try:
+        async for mode, data in chatbot.astream({"input": message}, stream_mode=["messages", "values"]):
+            if mode == "values":
+                final_output = data.get("output")
+                continue
+            
+            chunk, _ = data
+            if not chunk.content:
+                continue
+            if ttft_ms is None:
+                ttft_ms = (time.perf_counter() - started) * 1000
+            yield _sse({"token": chunk.content})
+        
+        # Replies that did not come from the model (e.g. AI unavailable) arrive in one piece
+        if ttft_ms is None and final_output:
+            ttft_ms = (time.perf_counter() - started) * 1000
+            yield _sse({"token": final_output})
+    except Exception as e:
+        print(f"Error while streaming chat reply: {e}")
+        yield _sse({"detail": "Failed to generate a reply"}, event="error")
+        return
+    
+    total_ms = (time.perf_counter() - started) * 1000
+    if ttft_ms is not None:
+        _ttft_samples.append(ttft_ms)
+        print(f"chat stream: ttft={ttft_ms:.0f}ms total={total_ms:.0f}ms")
+    yield _sse({"ttft_ms": round(ttft_ms or 0, 1), "total_ms": round(total_ms, 1)}, event="done")
+
+@router.post("/chat/stream")
+async def chat_stream(req: ChatRequest):
+    """Stream the reply token by token as Server-Sent Events"""
+    return StreamingResponse(
+        _stream_reply(req.message),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/chat/metrics")
+def chat_metrics():
+    """Time-to-first-token over the most recent streamed replies"""
+    samples = sorted(_ttft_samples)
+    if not samples:
+        return {"count": 0, "ttft_p50_ms": None, "ttft_p95_ms": None}
+    return {
+        "count": len(samples),
+        "ttft_p50_ms": round(samples[len(samples) // 2], 1),
+        "ttft_p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 1)
+    }
@@ -0,0 +1,116 @@
+# documents.py - Part of routers module
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Request, UploadFile, status
+from middleware.auth_middleware import get_current_active_user
+from services import storage_service, pdf_service
+from sqlite import get_db
+from utils.http_files import file_response
+import sqlite3
+
+router = APIRouter(prefix="/documents", tags=["Documents"])
+
+@router.post("")
+async def upload_document(
+    doc_type: str = Form(...),
+    file: UploadFile = File(...),
+    current_user: dict = Depends(get_current_active_user),
+    db: sqlite3.Connection = Depends(get_db)
+):
+    """Upload a document (passport, transcript, ...); identical files are stored once"""
+    try:
+        return await storage_service.save_document(db, file, int(current_user["user_id"]), doc_type)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+@router.get("")
+def list_documents(
+    current_user: dict = Depends(get_current_active_user),
+    db: sqlite3.Connection = Depends(get_db)
+):
+    """List the current user's documents"""
+    cursor = db.cursor()
+    cursor.execute(
+        """SELECT id, doc_type, file_name, file_size, blob_sha256, uploaded_at
+           FROM documents WHERE user_id = ? ORDER BY uploaded_at DESC, id DESC""",
+        (current_user["user_id"],)
+    )
+    return {
+        "documents": [
+            {"id": r[0], "doc_type": r[1], "file_name": r[2], "file_size": r[3],
+             "sha256": r[4], "uploaded_at": r[5]}
+            for r in cursor.fetchall()
+        ]
+    }
+
+@router.api_route("/{document_id}/download", methods=["GET", "HEAD"])
+def download_document(
+    document_id: int,
+    request: Request,
+    current_user: dict = Depends(get_current_active_user),
+    db: sqlite3.Connection = Depends(get_db)
+):
+    """Download one of the user's documents (supports Range and If-None-Match)"""
+    cursor = db.cursor()
+    cursor.execute(
+        "SELECT file_path, file_name, blob_sha256 FROM documents WHERE id = ? AND user_id = ?",
+        (document_id, current_user["user_id"])
+    )
+    row = cursor.fetchone()
+    if not row:
+        raise HTTPException(status_code=404, detail="Document not found")
+    
+    file_path, file_name, sha256 = row
+    # Blobs are content-addressed, so the hash is a strong validator that never goes stale
+    return file_response(
+        request, file_path,
+        cache_control="private, max-age=0, must-revalidate",
+        etag=f'"{sha256}"' if sha256 else None,
+        filename=file_name
+    )
+
+@router.get("/{document_id}/text")
+def get_document_text(
+    document_id: int,
+    include_text: bool = False,
+    current_user: dict = Depends(get_current_active_user),
+    db: sqlite3.Connection = Depends(get_db)
+):
+    """Text extraction status for a PDF document (and the text once done)"""
+    cursor = db.cursor()
+    cursor.execute(
+        "SELECT blob_sha256 FROM documents WHERE id = ? AND user_id = ?",
+        (document_id, current_user["user_id"])
+    )
+    row = cursor.fetchone()
+    if not row:
+        raise HTTPException(status_code=404, detail="Document not found")
+    
+    text_status = pdf_service.get_text_status(db, row[0], include_text) if row[0] else None
+    if text_status is None:
+        raise HTTPException(status_code=404, detail="No text extraction for this document")
+    return {"document_id": document_id, **text_status}
+
+@router.post("/{document_id}/applications/{application_id}")
+def attach_document(
+    document_id: int,
+    application_id: int,
+    current_user: dict = Depends(get_current_active_user),
+    db: sqlite3.Connection = Depends(get_db)
+):
+    """Attach one of the user's documents to one of their applications"""
+    attachment_id = storage_service.attach_document_to_application(
+        db, document_id, int(current_user["user_id"]), application_id
+    )
+    if attachment_id is None:
+        raise HTTPException(status_code=404, detail="Document or application not found")
+    return {"id": attachment_id, "document_id": document_id, "application_id": application_id}
+
+@router.delete("/{document_id}")
+def delete_document(
+    document_id: int,
+    current_user: dict = Depends(get_current_active_user),
+    db: sqlite3.Connection = Depends(get_db)
+):
+    """Delete a document (its file is removed by the next blob GC if unused)"""
+    if not storage_service.delete_document(db, document_id, int(current_user["user_id"])):
+        raise HTTPException(status_code=404, detail="Document not found")
+    return {"message": "Document deleted"}
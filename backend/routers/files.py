@@ -0,0 +1,19 @@
+# files.py - Part of routers module
+from fastapi import APIRouter, HTTPException, Request
+from config import settings
+from services import storage_service
+from utils.http_files import file_response
+
+router = APIRouter(tags=["Files"])
+
+@router.api_route("/uploads/{file_path:path}", methods=["GET", "HEAD"])
+def get_upload(file_path: str, request: Request):
+    """
+    Serve a public upload (profile images, university media and their
+    variants) with ETag / Last-Modified validators and byte-range support.
+    Documents are only served by the authenticated /documents/{id}/download.
+    """
+    path = storage_service.resolve_upload_path(file_path)
+    if path is None:
+        raise HTTPException(status_code=404, detail="File not found")
+    return file_response(request, path, cache_control=f"public, max-age={settings.UPLOAD_CACHE_SECONDS}")
@@ -1,18 +1,42 @@
 # routers/university.py - University search, recommendation, and comparison
-from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi import APIRouter, HTTPException, Depends, Query, File, Form, UploadFile
 from models.university import (
     UniversitySearchFilter, UniversitySearchResponse, UniversityBasic,
     UniversityRecommendationRequest, UniversityRecommendation, RecommendationResponse,
     ComparisonRequest
 )
-from services import ai_service
-from middleware.auth_middleware import get_current_active_user, get_optional_user
+from services import ai_service, catalog_service, storage_service
+from middleware.auth_middleware import get_current_active_user, get_optional_user, require_admin
 from sqlite import get_db
 import sqlite3
+import re
+import json
+import base64
 from typing import List, Optional
 
 router = APIRouter(prefix="/universities", tags=["Universities"])
 
+def _encode_cursor(ranking, name, uni_id) -> str:
+    raw = json.dumps([ranking, name, uni_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def _decode_cursor(token: str):
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        ranking, name, uni_id = json.loads(raw)
+        # Values are bound straight into the keyset query: anything else is a forged cursor
+        if isinstance(ranking, bool) or not isinstance(ranking, (int, float, type(None))) \
+                or not isinstance(name, str):
+            raise ValueError("Invalid cursor value types")
+        return ranking, name, int(uni_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+def _fts_query(text: str) -> str:
+    """Turn free text into an FTS5 prefix query: every term must match, by prefix"""
+    terms = re.findall(r"\w+", text)
+    return " ".join(f'"{t}"*' for t in terms)
+
 @router.get("/search", response_model=UniversitySearchResponse)
 def search_universities(
     country: Optional[str] = Query(None),
@@ -24,20 +48,54 @@ def search_universities(
     language: Optional[str] = Query(None),
     scholarship_track: Optional[bool] = Query(None),
     search_query: Optional[str] = Query(None),
+    mode: str = Query("filter", pattern="^(filter|ranked)$"),
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
+    after: Optional[str] = Query(None, alias="cursor"),
+    include_total: Optional[bool] = Query(None),
     db: sqlite3.Connection = Depends(get_db),
     current_user: Optional[dict] = Depends(get_optional_user)
 ):
-    """Advanced university search with filters"""
+    """
+    Advanced university search with filters.
+    mode=ranked uses the full-text index: prefix matching on search_query
+    (name, city, country, overview) and major (name, description, careers, skills),
+    ordered by bm25 relevance.
+    
+    Pass the returned next_cursor as `cursor` for keyset pagination (filter mode only);
+    the total count is skipped in cursor mode unless include_total=true.
+    """
     cursor = db.cursor()
+    ranked = mode == "ranked"
+    text_query = _fts_query(search_query) if ranked and search_query else ""
+    major_query = _fts_query(major) if ranked and major else ""
+    # A filter made only of punctuation must not silently turn into no filter at all
+    if ranked and ((search_query and not text_query) or (major and not major_query)):
+        raise HTTPException(status_code=400, detail="Search text must contain at least one letter or digit")
+    if after and text_query:
+        raise HTTPException(status_code=400, detail="Cursor pagination is not supported for ranked text search")
+    if include_total is None:
+        include_total = after is None
     
     # Build query
-    query = "SELECT DISTINCT u.id, u.name, u.country, u.city, u.tuition_fee, u.min_gpa, u.scholarship_available, u.ranking FROM universities u"
+    select_cols = "SELECT DISTINCT u.id, u.name, u.country, u.city, u.tuition_fee, u.min_gpa, u.scholarship_available, u.ranking"
+    query = f"{select_cols} FROM universities u"
     where_clauses = ["u.is_active = 1"]
     params = []
     
-    if major:
+    if text_query:
+        query += " JOIN universities_fts ON universities_fts.rowid = u.id"
+        where_clauses.append("universities_fts MATCH ?")
+        params.append(text_query)
+    
+    if major_query:
+        where_clauses.append(
+            """u.id IN (SELECT um.university_id FROM university_majors um
+                        JOIN majors_fts ON majors_fts.rowid = um.major_id
+                        WHERE majors_fts MATCH ?)"""
+        )
+        params.append(major_query)
+    elif major and not ranked:
         query += " JOIN university_majors um ON u.id = um.university_id JOIN majors m ON um.major_id = m.id"
         where_clauses.append("m.name LIKE ?")
         params.append(f"%{major}%")
@@ -69,7 +127,7 @@ def search_universities(
     if scholarship_track is True:
         where_clauses.append("u.scholarship_available = 1")
     
-    if search_query:
+    if search_query and not ranked:
         where_clauses.append("(u.name LIKE ? OR u.country LIKE ? OR u.city LIKE ?)")
         params.extend([f"%{search_query}%", f"%{search_query}%", f"%{search_query}%"])
     
@@ -77,22 +135,43 @@ def search_universities(
         query += " WHERE " + " AND ".join(where_clauses)
     
     # Count total
-    count_query = query.replace(
-        "SELECT DISTINCT u.id, u.name, u.country, u.city, u.tuition_fee, u.min_gpa, u.scholarship_available, u.ranking",
-        "SELECT COUNT(DISTINCT u.id)"
-    )
-    cursor.execute(count_query, params)
-    total_count = cursor.fetchone()[0]
+    total_count = None
+    if include_total:
+        count_query = query.replace(select_cols, "SELECT COUNT(DISTINCT u.id)")
+        cursor.execute(count_query, params)
+        total_count = cursor.fetchone()[0]
     
     # Add pagination
     offset = (page - 1) * page_size
-    query += " ORDER BY u.ranking ASC, u.name ASC LIMIT ? OFFSET ?"
-    params.extend([page_size, offset])
+    if after:
+        # Keyset: continue strictly after the last (ranking, name, id) seen.
+        # SQLite sorts NULL rankings first, so they only follow a NULL-ranked cursor.
+        last_ranking, last_name, last_id = _decode_cursor(after)
+        if last_ranking is None:
+            keyset = "(u.ranking IS NOT NULL OR (u.ranking IS NULL AND (u.name, u.id) > (?, ?)))"
+            params.extend([last_name, last_id])
+        else:
+            keyset = "(u.ranking, u.name, u.id) > (?, ?, ?)"
+            params.extend([last_ranking, last_name, last_id])
+        query += (" AND " if " WHERE " in query else " WHERE ") + keyset
+        offset = 0
+    
+    if text_query:
+        # Column weights: name, city, country, overview (lower bm25 = better match)
+        query += " ORDER BY bm25(universities_fts, 10.0, 3.0, 3.0, 1.0), u.ranking ASC, u.name ASC"
+    else:
+        query += " ORDER BY u.ranking ASC, u.name ASC, u.id ASC"
+    # Fetch one extra row to know whether another page exists
+    query += " LIMIT ? OFFSET ?"
+    params.extend([page_size + 1, offset])
     
     cursor.execute(query, params)
+    rows = cursor.fetchall()
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
     universities = []
     
-    for row in cursor.fetchall():
+    for row in rows:
         universities.append(UniversityBasic(
             id=row[0],
             name=row[1],
@@ -104,7 +183,12 @@ def search_universities(
             ranking=row[7]
         ))
     
-    total_pages = (total_count + page_size - 1) // page_size
+    total_pages = (total_count + page_size - 1) // page_size if total_count is not None else None
+    
+    next_cursor = None
+    if has_more and not text_query:
+        last = rows[-1]
+        next_cursor = _encode_cursor(last[7], last[1], last[0])
     
     return UniversitySearchResponse(
         universities=universities,
@@ -112,68 +196,74 @@ def search_universities(
         page=page,
         page_size=page_size,
         total_pages=total_pages,
+        next_cursor=next_cursor,
+        has_more=has_more,
         filters_applied={
             "country": country,
             "major": major,
-            "scholarship_track": scholarship_track
+            "scholarship_track": scholarship_track,
+            "mode": mode
         }
     )
 
 @router.get("/{university_id}")
-def get_university_detail(
+def get_university_detail(university_id: int):
+    """Get detailed university information (served from the catalog snapshot)"""
+    uni = catalog_service.get_catalog().get(university_id)
+    
+    if not uni:
+        raise HTTPException(status_code=404, detail="University not found")
+    
+    return {
+        "id": uni["id"],
+        "name": uni["name"],
+        "country": uni["country"],
+        "city": uni["city"],
+        "tuition_fee": uni["tuition_fee"],
+        "min_gpa": uni["min_gpa"],
+        "language": uni["language"],
+        "scholarship_available": bool(uni["scholarship_available"]),
+        "overview": uni["overview"],
+        "duration": uni["duration"],
+        "accommodation_info": uni["accommodation_info"],
+        "website": uni["website"],
+        "ranking": uni["ranking"],
+        "acceptance_rate": uni["acceptance_rate"],
+        "media": uni["media"],
+        "majors": uni["majors"]
+    }
+
+@router.post("/{university_id}/media")
+async def upload_university_media(
     university_id: int,
+    file: UploadFile = File(...),
+    caption: Optional[str] = Form(None),
+    display_order: int = Form(0),
+    admin: dict = Depends(require_admin),
     db: sqlite3.Connection = Depends(get_db)
 ):
-    """Get detailed university information"""
-    cursor = db.cursor()
-    
-    cursor.execute(
-        """SELECT id, name, country, city, tuition_fee, min_gpa, language, scholarship_available,
-                  overview, duration, accommodation_info, website, ranking, acceptance_rate
-           FROM universities WHERE id = ? AND is_active = 1""",
-        (university_id,)
-    )
-    uni = cursor.fetchone()
-    
-    if not uni:
+    """Add an image or video to a university; images get thumbnail/card/full variants"""
+    if not catalog_service.get_catalog(db).get(university_id, active_only=False):
         raise HTTPException(status_code=404, detail="University not found")
     
-    # Get media
-    cursor.execute(
-        "SELECT id, media_type, media_url, caption FROM university_media WHERE university_id = ? ORDER BY display_order",
-        (university_id,)
-    )
-    media = [{"id": r[0], "media_type": r[1], "media_url": r[2], "caption": r[3]} for r in cursor.fetchall()]
+    media_type = "video" if file.filename.lower().endswith((".mp4", ".webm")) else "image"
+    try:
+        info = await storage_service.save_university_media(file, university_id, media_type)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    # Get majors
+    variants = info.get("variants")
+    media_url = variants["full"]["jpeg"]["url"] if variants else storage_service.get_file_url(info["file_path"])
+    cursor = db.cursor()
     cursor.execute(
-        """SELECT m.id, m.name, m.category, m.difficulty, m.career_paths, m.average_cost
-           FROM majors m
-           JOIN university_majors um ON m.id = um.major_id
-           WHERE um.university_id = ?""",
-        (university_id,)
+        """INSERT INTO university_media (university_id, media_type, media_url, caption, display_order, variants)
+           VALUES (?, ?, ?, ?, ?, ?)""",
+        (university_id, media_type, media_url, caption, display_order, json.dumps(variants) if variants else None)
     )
-    majors = [{"id": r[0], "name": r[1], "category": r[2], "difficulty": r[3], 
-               "career_paths": r[4], "average_cost": r[5]} for r in cursor.fetchall()]
+    db.commit()
+    catalog_service.invalidate()
     
-    return {
-        "id": uni[0],
-        "name": uni[1],
-        "country": uni[2],
-        "city": uni[3],
-        "tuition_fee": uni[4],
-        "min_gpa": uni[5],
-        "language": uni[6],
-        "scholarship_available": bool(uni[7]),
-        "overview": uni[8],
-        "duration": uni[9],
-        "accommodation_info": uni[10],
-        "website": uni[11],
-        "ranking": uni[12],
-        "acceptance_rate": uni[13],
-        "media": media,
-        "majors": majors
-    }
+    return {"id": cursor.lastrowid, "media_type": media_type, "media_url": media_url, "variants": variants}
 
 @router.post("/recommend", response_model=RecommendationResponse)
 def get_recommendations(
@@ -190,7 +280,7 @@ def get_recommendations(
         """SELECT personality_type, scores, strengths
            FROM assessment_results
            WHERE user_id = ?
-           ORDER BY completed_at DESC
+           ORDER BY completed_at DESC, id DESC
            LIMIT 1""",
         (user_id,)
     )
@@ -210,7 +300,8 @@ def get_recommendations(
         user_id=user_id,
         preferred_major=request.preferred_major or "",
         assessment_results=assessment_results,
-        max_results=request.max_results
+        max_results=request.max_results,
+        db=db
     )
     
     return RecommendationResponse(
@@ -225,36 +316,27 @@ def get_recommendations(
     )
 
 @router.post("/compare")
-def compare_universities(
-    request: ComparisonRequest,
-    db: sqlite3.Connection = Depends(get_db)
-):
+def compare_universities(request: ComparisonRequest):
     """Compare 2-3 universities"""
     if len(request.university_ids) < 2 or len(request.university_ids) > 3:
         raise HTTPException(status_code=400, detail="Please select 2 or 3 universities to compare")
     
-    cursor = db.cursor()
+    catalog = catalog_service.get_catalog()
     universities = []
     
     for uni_id in request.university_ids:
-        cursor.execute(
-            """SELECT id, name, country, tuition_fee, min_gpa, scholarship_available,
-                      ranking, acceptance_rate, duration
-               FROM universities WHERE id = ?""",
-            (uni_id,)
-        )
-        uni = cursor.fetchone()
+        uni = catalog.get(uni_id, active_only=False)
         if uni:
             universities.append({
-                "id": uni[0],
-                "name": uni[1],
-                "country": uni[2],
-                "tuition_fee": uni[3],
-                "min_gpa": uni[4],
-                "scholarship_available": bool(uni[5]),
-                "ranking": uni[6],
-                "acceptance_rate": uni[7],
-                "duration": uni[8]
+                "id": uni["id"],
+                "name": uni["name"],
+                "country": uni["country"],
+                "tuition_fee": uni["tuition_fee"],
+                "min_gpa": uni["min_gpa"],
+                "scholarship_available": bool(uni["scholarship_available"]),
+                "ranking": uni["ranking"],
+                "acceptance_rate": uni["acceptance_rate"],
+                "duration": uni["duration"]
             })
     
     # Create comparison table
@@ -1,13 +1,90 @@
 # upload.py - Part of routers module
-from fastapi import APIRouter, UploadFile
-from config import Settings
-import shutil, os
-
-router = APIRouter(prefix="/upload")
-
-@router.post("/")
-def upload(file: UploadFile):
-    path = os.path.join(Settings.UPLOAD_DIR, file.filename)
-    with open(path, "wb") as f:
-        shutil.copyfileobj(file.file, f)
-    return {"file": file.filename}
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Path, Request, status
+from middleware.auth_middleware import get_current_active_user
+from models.application import MultipartUploadCreate
+from services import storage_service
+from services.storage_service import UploadConflictError
+from sqlite import get_db
+import sqlite3
+
+router = APIRouter(prefix="/upload", tags=["Upload"])
+
+@router.post("/sessions", status_code=status.HTTP_201_CREATED)
+def create_upload_session(
+    upload: MultipartUploadCreate,
+    current_user: dict = Depends(get_current_active_user),
+    db: sqlite3.Connection = Depends(get_db)
+):
+    """Start a resumable upload; the response says how to split the file into parts"""
+    try:
+        return storage_service.create_upload_session(
+            db, int(current_user["user_id"]), upload.doc_type, upload.file_name,
+            upload.file_size, upload.part_size
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+@router.get("/sessions/{upload_id}")
+def get_upload_session(
+    upload_id: str,
+    current_user: dict = Depends(get_current_active_user),
+    db: sqlite3.Connection = Depends(get_db)
+):
+    """Received and missing parts, for resuming after a dropped connection"""
+    session = storage_service.get_upload_session(db, upload_id, int(current_user["user_id"]))
+    if session is None:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return session
+
+@router.put("/sessions/{upload_id}/parts/{part_number}")
+async def upload_part(
+    upload_id: str,
+    request: Request,
+    part_number: int = Path(..., ge=1),
+    x_content_sha256: Optional[str] = Header(None),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """
+    Upload one part as the raw request body (streamed to disk, never held in
+    memory). Parts may be sent in parallel and re-sent after a failure.
+    """
+    try:
+        part = await storage_service.write_upload_part(
+            upload_id, int(current_user["user_id"]), part_number,
+            request.stream(), x_content_sha256
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except UploadConflictError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    if part is None:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return part
+
+@router.post("/sessions/{upload_id}/complete")
+async def complete_upload(
+    upload_id: str,
+    current_user: dict = Depends(get_current_active_user)
+):
+    """Assemble the parts into a document (deduplicated like POST /documents)"""
+    try:
+        document = await storage_service.complete_upload_session(upload_id, int(current_user["user_id"]))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except UploadConflictError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    if document is None:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return document
+
+@router.delete("/sessions/{upload_id}")
+def abort_upload(
+    upload_id: str,
+    current_user: dict = Depends(get_current_active_user),
+    db: sqlite3.Connection = Depends(get_db)
+):
+    """Abandon an unfinished upload and delete its parts"""
+    if not storage_service.abort_upload_session(db, upload_id, int(current_user["user_id"])):
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return {"message": "Upload aborted"}
@@ -1,49 +1,27 @@
 
-from config import settings
 import json
 from typing import List, Dict, Any
 import sqlite3
 import logging
-from langchain_ollama import ChatOllama
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.messages import SystemMessage, HumanMessage
 from fastapi import FastAPI
 from fastapi.responses import HTMLResponse,FileResponse
 import uvicorn
 from fastapi import Depends
-from contextlib import contextmanager
+from sqlite import get_db
+from services import catalog_service
+from ai.ollama_llm import registry as llm_registry
+from ai.llm_cache import invoke_cached
 
 
 app=FastAPI()
 
-#defining the get_db_function
-@contextmanager
-def get_db_connection():
-    conn=sqlite3.connect("University.db",check_same_thread=False,timeout=10.0)
-    conn.row_factory=sqlite3.Row
-    try:
-        yield conn
-    finally:
-        conn.close()
-
 
 @app.get("/model")
 def get_ollama_model():
-    """Initialize Ollama model"""
-    if ChatOllama is None:
-        return None
-    
-    try:
-        model = ChatOllama(
-            model=settings.OLLAMA_MODEL,
-            base_url=settings.OLLAMA_BASE_URL,
-            temperature=0.7
-        )
-        return model
-    except Exception as e:
-        print(f"  Error initializing Ollama: {e}")
-        print(f"Make sure Ollama is running and model '{settings.OLLAMA_MODEL}' is pulled")
-        return None
+    """Shared Ollama model, or None while Ollama is unavailable"""
+    return llm_registry.get(temperature=0.7)
 
 @app.post("/evaluate")
 def evaluate_assessment(test_type: str, answers: List[Dict]) -> Dict[str, Any]:
@@ -91,30 +69,17 @@ Respond in JSON format:
             HumanMessage(content=prompt)
         ]
         
-       
-        response = model.invoke(messages)
-        response1=model.stream(response)
-        for response in response1:
-            print("response generated by streaming the output",response)
-       
-
-        print(f"response of the model:{response}")
-        result = json.loads(response.content)
+        result = invoke_cached(model, messages, json.loads)
         print(f"result of the model after loading into json object")
         return result
         
     except Exception as e:
         print(f"Error in AI evaluation: {e}")
+        llm_registry.record_error(e)
         return fallback_assessment_evaluation(test_type, answers)
 
-@app.get("/recommander",response_model=None)
-def recommend_majors(user_id: int, db: sqlite3.Connection=Depends(get_db_connection), assessment_results: str="{}") -> List[Dict]:
-    """
-    Recommend 3-7 majors based on assessment results, GPA, and preferences
-    """
-    model = get_ollama_model()
-    
-    # Get user profile
+def load_major_inputs(db: sqlite3.Connection, user_id: int):
+    """(profile row, majors rows) used by recommend_majors; profile is None without a profile"""
     cursor = db.cursor()
     cursor.execute(
         """SELECT gpa, budget, preferred_country, preferred_major, career_goal
@@ -122,16 +87,30 @@ def recommend_majors(user_id: int, db: sqlite3.Connection=Depends(get_db_connect
         (user_id,)
     )
     profile = cursor.fetchone()
+    cursor.execute("SELECT name, category, difficulty, career_paths, average_cost FROM majors")
+    return profile, cursor.fetchall()
+
+@app.get("/recommander",response_model=None)
+def recommend_majors(user_id: int, db: sqlite3.Connection=Depends(get_db), assessment_results: str="{}") -> List[Dict]:
+    """
+    Recommend 3-7 majors based on assessment results, GPA, and preferences
+    """
+    profile, majors = load_major_inputs(db, user_id)
+    return recommend_majors_for(profile, majors, assessment_results)
+
+def recommend_majors_for(profile, majors: list, assessment_results: Dict) -> List[Dict]:
+    """
+    recommend_majors on already loaded inputs, so callers need not hold a
+    database connection while the model runs
+    """
     print(f"profile:{profile}")
     if not profile:
         return []
     
     gpa, budget, preferred_country, preferred_major, career_goal = profile
-    
-    cursor.execute("SELECT name, category, difficulty, career_paths, average_cost FROM majors")
-    majors = cursor.fetchall()
     logging.info(f"majors offered by the university:{majors}")
     
+    model = get_ollama_model()
     if model is None:
         # Fallback to rule-based recommendations
         return fallback_major_recommendations(majors, assessment_results, gpa, preferred_major)
@@ -181,13 +160,13 @@ Respond in JSON format:
             HumanMessage(content=prompt)
         ]
         
-        response = model.invoke(messages)
-        print(f"response generated from the model:{response}")
-        result = json.loads(response.content)
+        result = invoke_cached(model, messages, json.loads)
+        print(f"response generated from the model:{result}")
         return result.get("recommendations", [])
         
     except Exception as e:
         print(f"Error in AI major recommendation: {e}")
+        llm_registry.record_error(e)
         return fallback_major_recommendations(majors, assessment_results, gpa, preferred_major)
 
 @app.get("/university",response_model=None)
@@ -196,108 +175,26 @@ def recommend_universities(
     preferred_major: str="{}",
     assessment_results: str="{}",
     max_results: int = 10,
+    db: sqlite3.Connection=Depends(get_db),
 ) -> List[Dict]:
-    with sqlite3.connect("University.db", check_same_thread=False,timeout=10.0) as db:
-        db.row_factory=sqlite3.Row
-        cursor = db.cursor()
-        print(f"cursor:{cursor}")
+    cursor = db.cursor()
+    print(f"cursor:{cursor}")
+
+    # Get user profile
+    cursor.execute(
+        """SELECT gpa, budget, preferred_country FROM student_profiles WHERE user_id = ?""",
+        (user_id,)
+    )
+    profile = cursor.fetchone()
+    print(f"profile data is fetch sucessfully")
+    if not profile:
+        return []
     
-        # Get user profile
-        cursor.execute(
-            """SELECT gpa, budget, preferred_country FROM student_profiles WHERE user_id = ?""",
-            (user_id,)
-        )
-        profile = cursor.fetchone()
-        print(f"profile data is fetch sucessfully")
-        if not profile:
-            return []
-        
-        gpa, budget, preferred_country = profile
-        
-        # Get universities offering the preferred major
-        cursor.execute(
-            """SELECT DISTINCT u.id, u.name, u.country, u.tuition_fee, u.min_gpa, 
-                    u.scholarship_available, u.success_weight, u.acceptance_rate
-            FROM universities u
-            JOIN university_majors um ON u.id = um.university_id
-            JOIN majors m ON um.major_id = m.id
-            WHERE m.name LIKE ? AND u.is_active = 1
-            ORDER BY u.success_weight DESC""",
-            (f"%{preferred_major}%",)
-        )
-        universities = cursor.fetchall()
-        
-        # Calculate recommendation scores
-        recommendations = []
-        
-        for uni in universities:
-            uni_id, name, country, tuition, min_gpa, has_scholarship, success_weight, acceptance_rate = uni
-            
-            # Calculate match score
-            score = 0.0
-            reasons = []
-            pros = []
-            cons = []
-            
-            # GPA match (30%)
-            if gpa <= min_gpa:
-                gpa_score = min(1.0, (gpa - min_gpa) / (4.0 - min_gpa)) if min_gpa < 4.0 else 1.0
-                score += gpa_score * 0.3
-                if gpa >= min_gpa + 0.3:
-                    pros.append(f"Your GPA ({gpa}) exceeds requirements ({min_gpa})")
-                    reasons.append("Strong academic match based on GPA")
-            else:
-                cons.append(f"GPA requirement ({min_gpa}) is higher than yours ({gpa})")
-                continue  # Skip if GPA doesn't meet minimum
-            
-            # Budget match (25%)
-            if tuition <= budget:
-                budget_score = 1.0 - (tuition / budget) * 0.5
-                score += budget_score * 0.25
-                pros.append(f"Tuition (${tuition}) is within your budget (${budget})")
-                reasons.append("Affordable tuition within budget")
-            else:
-                if has_scholarship:
-                    score += 0.15  # Partial credit if scholarships available
-                    pros.append("Scholarship opportunities available")
-                    cons.append(f"Tuition (${tuition}) exceeds budget, but scholarships may help")
-                else:
-                    cons.append(f"Tuition (${tuition}) exceeds budget (${budget})")
-            
-            # Scholarship availability (20%)
-            if has_scholarship:
-                score += 0.2
-                reasons.append("Scholarship opportunities available")
-            
-            # Country preference (10%)
-            if preferred_country and country.lower() == preferred_country.lower():
-                score += 0.1
-                reasons.append(f"Located in your preferred country ({country})")
-                pros.append(f"Located in {country} as preferred")
-            
-            # Success weight (15%)
-            score += (success_weight - 1.0) * 0.15
-            if success_weight > 1.1:
-                reasons.append("Strong success history with past students")
-                pros.append("High success rate with previous applicants")
-            
-            if score > 0.3:  # Only recommend if score is reasonable
-                recommendations.append({
-                    "id": uni_id,
-                    "name": name,
-                    "country": country,
-                    "tuition_fee": tuition,
-                    "min_gpa": min_gpa,
-                    "scholarship_available": bool(has_scholarship),
-                    "recommendation_score": round(score, 2),
-                    "reasons": reasons,
-                    "pros": pros,
-                    "cons": cons
-                })
-        
-    # Sort by score and return top N
-    recommendations.sort(key=lambda x: x["recommendation_score"], reverse=True)
-    return recommendations[:max_results]
+    gpa, budget, preferred_country = profile
+    
+    # Score the whole catalog at once and build text only for the top N
+    engine = catalog_service.get_catalog(db).engine
+    return engine.recommend(gpa, budget, preferred_country, preferred_major, max_results)
 
 # Fallback functions when Ollama is not available
 logging.warning("fallback mechanism is being called when there is no model available")
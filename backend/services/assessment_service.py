@@ -0,0 +1,365 @@
+# services/assessment_service.py - Assessment evaluation and persistence
+import asyncio
+import hashlib
+import json
+import logging
+import secrets
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from config import settings
+from services import ai_service
+from sqlite import db_connection
+
+
+def run_assessment(user_id: int, test_type: str, answers: List[Dict]) -> Tuple[Dict, List[Dict]]:
+    """
+    Evaluate the answers and recommend majors. Blocking (LLM calls): run it in
+    a worker thread. A pooled connection is only borrowed to read the profile
+    and majors, never held while the model is generating.
+    """
+    results = ai_service.evaluate_assessment(test_type, answers)
+    logging.info(f"results :{results}")
+    
+    with db_connection() as db:
+        profile, majors = ai_service.load_major_inputs(db, user_id)
+    recommendations = ai_service.recommend_majors_for(profile, majors, results)
+    logging.info(f'recommanded majors by AI:{recommendations}')
+    return results, recommendations
+
+
+def evaluation_response(result_id: int, results: Dict, recommendations: List[Dict]) -> Dict:
+    """The /assessment/evaluate body (also stored on finished jobs)"""
+    return {
+        "success": True,
+        "result_id": result_id,
+        "assessment_summary": results,
+        "recommendations": recommendations,
+        "total_count": len(recommendations)
+    }
+
+
+def save_assessment(db: sqlite3.Connection, user_id: int, test_type: str, answers: List[Dict],
+                    results: Dict, recommendations: List[Dict], job_id: Optional[str] = None) -> int:
+    """
+    Store the result and its recommendations in one transaction (one
+    executemany for the recommendations). Returns the assessment_results id.
+    With job_id the job is marked done in the same transaction; if the job
+    already has a result (a second run after its lease expired), nothing is
+    stored and the existing result id is returned.
+    """
+    cursor = db.cursor()
+    try:
+        cursor.execute(
+            """INSERT INTO assessment_results 
+               (user_id, test_type, answers, personality_type, scores, strengths, weaknesses)
+               VALUES (?, ?, ?, ?, ?, ?, ?)""",
+            (
+                user_id,
+                test_type,
+                json.dumps(answers),
+                results.get("personality_type", ""),
+                json.dumps(results.get("scores", {})),
+                json.dumps(results.get("strengths", [])),
+                json.dumps(results.get("weaknesses", [])),
+            )
+        )
+        result_id = cursor.lastrowid
+        
+        cursor.executemany(
+            """INSERT INTO major_recommendations
+               (user_id, result_id, major_name, match_score, explanation,
+                difficulty_level, career_paths, estimated_cost, study_duration, roadmap)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            [
+                (
+                    user_id,
+                    result_id,
+                    rec.get("major_name", ""),
+                    rec.get("match_score", 0.0),
+                    rec.get("explanation", ""),
+                    rec.get("difficulty_level", ""),
+                    rec.get("career_paths", ""),
+                    rec.get("estimated_cost", 0),
+                    rec.get("study_duration", ""),
+                    json.dumps(rec.get("roadmap", []))
+                )
+                for rec in recommendations
+            ]
+        )
+        if job_id is not None:
+            finished = cursor.execute(
+                """UPDATE assessment_jobs SET status = 'done', result_id = ?, result = ?, error = NULL,
+                          finished_at = CURRENT_TIMESTAMP
+                   WHERE id = ? AND result_id IS NULL""",
+                (result_id, json.dumps(evaluation_response(result_id, results, recommendations)), job_id)
+            ).rowcount
+            if not finished:
+                db.rollback()
+                return db.execute("SELECT result_id FROM assessment_jobs WHERE id = ?", (job_id,)).fetchone()[0]
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return result_id
+
+
+def get_result(db: sqlite3.Connection, result_id: int, user_id: int) -> Optional[Dict]:
+    """
+    One assessment result with its recommendations (best first), in a single
+    query: assessment_results by primary key, LEFT JOIN major_recommendations
+    through idx_major_recommendations_result_score. None if the result does
+    not exist or belongs to someone else.
+    """
+    rows = db.execute(
+        """SELECT r.id, r.test_type, r.personality_type, r.scores, r.strengths, r.weaknesses, r.completed_at,
+                  m.major_name, m.match_score, m.explanation, m.difficulty_level, m.career_paths,
+                  m.estimated_cost, m.study_duration, m.roadmap
+           FROM assessment_results r
+           LEFT JOIN major_recommendations m ON m.result_id = r.id
+           WHERE r.id = ? AND r.user_id = ?
+           ORDER BY m.match_score DESC""",
+        (result_id, user_id)
+    ).fetchall()
+    if not rows:
+        return None
+    
+    first = rows[0]
+    return {
+        "result_id": first[0],
+        "test_type": first[1],
+        "personality_type": first[2],
+        "scores": json.loads(first[3]) if first[3] else {},
+        "strengths": json.loads(first[4]) if first[4] else [],
+        "weaknesses": json.loads(first[5]) if first[5] else [],
+        "completed_at": first[6],
+        "recommendations": [
+            {
+                "major_name": row[7],
+                "match_score": row[8],
+                "explanation": row[9],
+                "difficulty_level": row[10],
+                "career_paths": row[11],
+                "estimated_cost": row[12],
+                "study_duration": row[13],
+                "roadmap": json.loads(row[14]) if row[14] else []
+            }
+            for row in rows if row[7] is not None
+        ]
+    }
+
+
+def evaluate_and_save(user_id: int, test_type: str, answers: List[Dict], job_id: Optional[str] = None) -> Dict:
+    """run_assessment + save_assessment; returns the /assessment/evaluate body"""
+    results, recommendations = run_assessment(user_id, test_type, answers)
+    with db_connection() as db:
+        result_id = save_assessment(db, user_id, test_type, answers, results, recommendations, job_id)
+    return evaluation_response(result_id, results, recommendations)
+
+
+def request_hash(test_type: str, answers: List[Dict]) -> str:
+    """Identifies a submission's content, for deduplicating repeated submits"""
+    payload = json.dumps({"test_type": test_type, "answers": answers}, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class AssessmentJobQueue:
+    """
+    Durable background evaluations. Jobs are rows in assessment_jobs, so a
+    restart re-queues whatever was pending (resume_pending). Worker threads
+    run evaluate_and_save; the LLM scheduler still bounds concurrent model
+    calls. Claiming a job is an atomic queued -> running UPDATE, so several
+    worker processes can share the table, and a job is marked done in the
+    transaction that saves its result, so at most one run stores one.
+    Submitting the same answers again while a job is pending, or within
+    dedup_seconds of it finishing, returns the existing job.
+    """
+
+    def __init__(self, workers: int, dedup_seconds: float, lease_seconds: float):
+        self.workers = workers
+        self.dedup_seconds = dedup_seconds
+        self.lease_seconds = lease_seconds
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._waiters: Dict[str, list] = {}  # job_id -> [(loop, asyncio.Event)]
+        self.submitted = 0
+        self.deduplicated = 0
+        self.completed = 0
+        self.failed = 0
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=max(1, self.workers), thread_name_prefix="assessment-job"
+                    )
+        return self._executor
+
+    def submit(self, user_id: int, test_type: str, answers: List[Dict]) -> Tuple[dict, bool]:
+        """Queue an evaluation; returns (job, created) where created is False for a duplicate"""
+        digest = request_hash(test_type, answers)
+        with db_connection() as db:
+            while True:
+                existing = db.execute(
+                    """SELECT id FROM assessment_jobs
+                       WHERE user_id = ? AND request_hash = ?
+                         AND (status IN ('queued', 'running')
+                              OR (status = 'done' AND finished_at >= datetime('now', ?)))
+                       ORDER BY created_at DESC LIMIT 1""",
+                    (user_id, digest, f"-{int(self.dedup_seconds)} seconds")
+                ).fetchone()
+                if existing:
+                    job_id = existing[0]
+                    break
+                job_id = secrets.token_urlsafe(12)
+                # The partial unique index makes a concurrent identical submit a
+                # no-op; the lookup then finds that job, even if it has finished
+                # since (or inserts again if it failed)
+                created = db.execute(
+                    """INSERT OR IGNORE INTO assessment_jobs (id, user_id, test_type, answers, request_hash)
+                       VALUES (?, ?, ?, ?, ?)""",
+                    (job_id, user_id, test_type, json.dumps(answers), digest)
+                ).rowcount
+                db.commit()
+                if created:
+                    break
+            job = get_job(db, job_id, user_id)
+
+        if existing:
+            self.deduplicated += 1
+            return job, False
+        self.submitted += 1
+        self._pool().submit(self._run, job_id)
+        return job, True
+
+    def _run(self, job_id: str):
+        with db_connection() as db:
+            claimed = db.execute(
+                """UPDATE assessment_jobs SET status = 'running', started_at = CURRENT_TIMESTAMP,
+                          attempts = attempts + 1
+                   WHERE id = ? AND status = 'queued'""",
+                (job_id,)
+            ).rowcount
+            db.commit()
+            if not claimed:
+                return
+            user_id, test_type, answers = db.execute(
+                "SELECT user_id, test_type, answers FROM assessment_jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+
+        try:
+            evaluate_and_save(user_id, test_type, json.loads(answers), job_id)
+        except Exception as e:
+            print(f"Assessment job {job_id} failed: {e}")
+            with db_connection() as db:
+                # Another run of the job may have stored a result meanwhile
+                db.execute(
+                    """UPDATE assessment_jobs SET status = 'failed', error = ?, finished_at = CURRENT_TIMESTAMP
+                       WHERE id = ? AND result_id IS NULL""",
+                    (f"{type(e).__name__}: {e}"[:500], job_id)
+                )
+                db.commit()
+            self.failed += 1
+        else:
+            self.completed += 1
+        self._notify(job_id)
+
+    def resume_pending(self):
+        """
+        Re-queue jobs a previous process left queued, or running for longer
+        than lease_seconds (a younger running job may belong to another
+        worker process that is still alive). If the original run is in fact
+        still going, whichever run saves first wins; the other stores nothing.
+        """
+        try:
+            with db_connection() as db:
+                db.execute(
+                    """UPDATE assessment_jobs SET status = 'queued'
+                       WHERE status = 'running' AND started_at < datetime('now', ?)""",
+                    (f"-{int(self.lease_seconds)} seconds",)
+                )
+                db.commit()
+                pending = [
+                    row[0] for row in db.execute(
+                        "SELECT id FROM assessment_jobs WHERE status = 'queued' ORDER BY created_at"
+                    )
+                ]
+        except sqlite3.OperationalError as e:
+            print(f"Assessment jobs not resumed: {e}")
+            return
+        for job_id in pending:
+            self._pool().submit(self._run, job_id)
+        if pending:
+            print(f"Resumed {len(pending)} assessment jobs")
+
+    def subscribe(self, job_id: str) -> asyncio.Event:
+        """Event set when this process finishes job_id; subscribe before reading the status"""
+        event = asyncio.Event()
+        with self._lock:
+            self._waiters.setdefault(job_id, []).append((asyncio.get_running_loop(), event))
+        return event
+
+    def unsubscribe(self, job_id: str, event: asyncio.Event):
+        with self._lock:
+            waiters = [w for w in self._waiters.get(job_id, []) if w[1] is not event]
+            if waiters:
+                self._waiters[job_id] = waiters
+            else:
+                self._waiters.pop(job_id, None)
+
+    def _notify(self, job_id: str):
+        with self._lock:
+            waiters = list(self._waiters.get(job_id, []))
+        for loop, event in waiters:
+            loop.call_soon_threadsafe(event.set)
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                # Unstarted jobs stay 'queued' in SQLite and resume on next start
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            waiting = sum(len(w) for w in self._waiters.values())
+        return {
+            "workers": self.workers,
+            "dedup_seconds": self.dedup_seconds,
+            "submitted": self.submitted,
+            "deduplicated": self.deduplicated,
+            "completed": self.completed,
+            "failed": self.failed,
+            "sse_subscribers": waiting,
+        }
+
+
+def get_job(db: sqlite3.Connection, job_id: str, user_id: int) -> Optional[dict]:
+    """A user's job; includes the evaluation response once done"""
+    row = db.execute(
+        """SELECT id, status, test_type, result_id, result, error, created_at, started_at, finished_at
+           FROM assessment_jobs WHERE id = ? AND user_id = ?""",
+        (job_id, user_id)
+    ).fetchone()
+    if row is None:
+        return None
+    job = {
+        "job_id": row[0],
+        "status": row[1],
+        "test_type": row[2],
+        "result_id": row[3],
+        "error": row[5],
+        "created_at": row[6],
+        "started_at": row[7],
+        "finished_at": row[8],
+    }
+    if row[4]:
+        job["result"] = json.loads(row[4])
+    return job
+
+
+job_queue = AssessmentJobQueue(
+    settings.ASSESSMENT_JOB_WORKERS, settings.ASSESSMENT_JOB_DEDUP_SECONDS, settings.ASSESSMENT_JOB_LEASE_SECONDS
+)
@@ -0,0 +1,82 @@
+# services/asset_service.py - Fingerprinted, precompressed frontend assets
+import os
+from fastapi import HTTPException, Request
+from fastapi.responses import Response
+from config import settings
+from utils.assets import TEMPLATES_DIR, build_assets, load_manifest
+from utils.http_files import file_response
+
+ENCODING_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+IMMUTABLE = "public, max-age=31536000, immutable"
+# Pages keep a stable URL, so browsers revalidate them (a 304 when unchanged)
+REVALIDATE = "no-cache"
+
+
+class AssetStore:
+    """
+    Serves the output of utils.assets.build_assets. Fingerprinted files are
+    cached forever by browsers; pages are revalidated by ETag. Only names
+    present in the manifest are served, so request paths never reach the
+    filesystem directly.
+    """
+
+    def __init__(self, src_dir: str, build_dir: str, build_on_startup: bool):
+        self.src_dir = src_dir
+        self.build_dir = build_dir
+        self.build_on_startup = build_on_startup
+        self.manifest = {"assets": {}, "templates": {}}
+        self._by_url = {}
+
+    def start(self):
+        if self.build_on_startup or not os.path.exists(os.path.join(self.build_dir, "manifest.json")):
+            manifest = build_assets(self.src_dir, self.build_dir)
+        else:
+            manifest = load_manifest(self.build_dir)
+        self._by_url = {entry["url"][len("/assets/"):]: entry for entry in manifest["assets"].values()}
+        self.manifest = manifest
+        print(f"Assets ready: {len(manifest['assets'])} fingerprinted files, "
+              f"{len(manifest['templates'])} pages")
+
+    def url(self, path: str) -> str:
+        """Fingerprinted URL for a frontend/static path, e.g. url('css/auth.css')"""
+        entry = self.manifest["assets"].get(path)
+        return entry["url"] if entry else f"/static/{path}"
+
+    def _encodings(self, entry: dict) -> list:
+        return [(coding, ENCODING_SUFFIXES[coding]) for coding in entry["encodings"]]
+
+    def asset(self, request: Request, fingerprinted: str) -> Response:
+        entry = self._by_url.get(fingerprinted)
+        if entry is None:
+            raise HTTPException(status_code=404, detail="Asset not found")
+        return file_response(
+            request,
+            os.path.join(self.build_dir, "assets", fingerprinted),
+            cache_control=IMMUTABLE,
+            etag=entry["etag"],
+            encodings=self._encodings(entry),
+        )
+
+    def page(self, request: Request, name: str) -> Response:
+        entry = self.manifest["templates"].get(name)
+        if entry is None:
+            raise HTTPException(status_code=404, detail="Page not found")
+        return file_response(
+            request,
+            os.path.join(self.build_dir, TEMPLATES_DIR, name),
+            cache_control=REVALIDATE,
+            etag=entry["etag"],
+            media_type="text/html",
+            encodings=self._encodings(entry),
+        )
+
+    def stats(self) -> dict:
+        return {
+            "build_dir": self.build_dir,
+            "assets": len(self.manifest["assets"]),
+            "pages": len(self.manifest["templates"]),
+            "encodings": sorted({c for e in self.manifest["assets"].values() for c in e["encodings"]}),
+        }
+
+
+assets = AssetStore(settings.ASSETS_SOURCE_DIR, settings.ASSETS_BUILD_DIR, settings.ASSETS_BUILD_ON_STARTUP)
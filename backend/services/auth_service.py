@@ -1,21 +1,19 @@
 # services/auth_service.py - Authentication and JWT service
 from jose import jwt
-from passlib.context import CryptContext
 from datetime import datetime, timedelta
 from config import settings
 from typing import Optional
+from services.password_service import hasher
+from services.user_service import invalidate_user
 import sqlite3
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 def hash_password(password: str) -> str:
-    """Hash a password"""
-    return pwd_context.hash(password)
+    """Hash a password (in the hashing process pool)"""
+    return hasher.hash(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+    """Verify a password against its hash (in the hashing process pool)"""
+    return hasher.verify(plain_password, hashed_password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create JWT access token"""
@@ -71,10 +69,19 @@ def authenticate_user(db: sqlite3.Connection, email: str, password: str):
     if not is_active:
         return None
     
-    if password_hash and verify_password(password, password_hash):
-        return {"id": user_id, "email": user_email}
+    if not password_hash:
+        return None
     
-    return None
+    valid, new_hash = hasher.verify_and_update(password, password_hash)
+    if not valid:
+        return None
+    
+    if new_hash:
+        # BCRYPT_ROUNDS changed since this hash was made: store it at the new cost
+        cursor.execute("UPDATE users SET password_hash = ? WHERE id = ?", (new_hash, user_id))
+        db.commit()
+    
+    return {"id": user_id, "email": user_email}
 
 def create_user(db: sqlite3.Connection, phone: Optional[str], email: Optional[str], 
                 password: Optional[str], auth_provider: str = "email"):
@@ -151,6 +158,7 @@ def handle_social_auth(db: sqlite3.Connection, provider: str, email: str, user_i
                 (provider, user["id"])
             )
             db.commit()
+            invalidate_user(user["id"])
         return user["id"]
     else:
         # Create new user
@@ -0,0 +1,146 @@
+# services/catalog_service.py - In-process snapshot of the university catalog
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+from config import settings
+from sqlite import db_connection
+from services.scoring_service import UniversityScoringEngine
+
+UNIVERSITY_COLUMNS = [
+    "id", "name", "country", "city", "tuition_fee", "min_gpa", "language", "scholarship_available",
+    "overview", "duration", "accommodation_info", "website", "ranking", "acceptance_rate",
+    "success_weight", "is_active"
+]
+
+
+class CatalogSnapshot:
+    """
+    Read-only copy of universities, majors and university_majors, with media
+    and majors pre-joined per university and a scoring engine over the active rows.
+    Only checked_at changes after loading (get_catalog's last version check).
+    """
+
+    def __init__(self, version: int, universities: Dict[int, dict], majors: List[tuple],
+                 links: List[tuple]):
+        self.version = version
+        self.universities = universities
+        self.checked_at = time.monotonic()
+
+        active = [
+            (u["id"], u["name"], u["country"], u["tuition_fee"], u["min_gpa"],
+             u["scholarship_available"], u["success_weight"], u["acceptance_rate"])
+            for u in universities.values() if u["is_active"]
+        ]
+        self.engine = UniversityScoringEngine(active, majors, links)
+
+    def get(self, university_id: int, active_only: bool = True) -> Optional[dict]:
+        uni = self.universities.get(university_id)
+        if uni is None or (active_only and not uni["is_active"]):
+            return None
+        return uni
+
+
+def _read_version(db: sqlite3.Connection) -> int:
+    try:
+        row = db.execute("SELECT version FROM catalog_version WHERE id = 1").fetchone()
+    except sqlite3.OperationalError:
+        # Database created before catalog_version existed: load once, never refresh
+        return 0
+    return row[0] if row else 0
+
+
+def load_snapshot(db: sqlite3.Connection) -> CatalogSnapshot:
+    """
+    Read the whole catalog in one read transaction. db must not be in a
+    transaction of its own (the read transaction is rolled back at the end).
+    """
+    cursor = db.cursor()
+    db.execute("BEGIN")
+    try:
+        version = _read_version(db)
+
+        cursor.execute(f"SELECT {', '.join(UNIVERSITY_COLUMNS)} FROM universities")
+        universities = {}
+        for row in cursor.fetchall():
+            uni = dict(zip(UNIVERSITY_COLUMNS, row))
+            uni["media"] = []
+            uni["majors"] = []
+            universities[uni["id"]] = uni
+
+        cursor.execute(
+            """SELECT university_id, id, media_type, media_url, caption, variants
+               FROM university_media ORDER BY university_id, display_order, id"""
+        )
+        for r in cursor.fetchall():
+            if r[0] in universities:
+                universities[r[0]]["media"].append(
+                    {"id": r[1], "media_type": r[2], "media_url": r[3], "caption": r[4],
+                     "variants": json.loads(r[5]) if r[5] else None}
+                )
+
+        cursor.execute("SELECT id, name, category, difficulty, career_paths, average_cost FROM majors")
+        major_rows = cursor.fetchall()
+        majors_by_id = {
+            r[0]: {"id": r[0], "name": r[1], "category": r[2], "difficulty": r[3],
+                   "career_paths": r[4], "average_cost": r[5]}
+            for r in major_rows
+        }
+
+        cursor.execute("SELECT university_id, major_id FROM university_majors ORDER BY id")
+        links = [tuple(r) for r in cursor.fetchall()]
+        for uni_id, major_id in links:
+            if uni_id in universities and major_id in majors_by_id:
+                universities[uni_id]["majors"].append(majors_by_id[major_id])
+    finally:
+        db.rollback()
+
+    print(f"catalog snapshot loaded: {len(universities)} universities, version {version}")
+    return CatalogSnapshot(version, universities, [(r[0], r[1]) for r in major_rows], links)
+
+
+_snapshot: Optional[CatalogSnapshot] = None
+_lock = threading.Lock()
+
+
+def get_catalog(db: Optional[sqlite3.Connection] = None) -> CatalogSnapshot:
+    """
+    Current catalog snapshot. catalog_version is only checked every
+    CATALOG_VERSION_CHECK_SECONDS, so most calls cost no queries at all.
+    Callers holding a connection pass it as db for the occasional check;
+    a reload always runs on its own pooled connection, so it never touches
+    the caller's transaction.
+    """
+    global _snapshot
+    snapshot = _snapshot
+    if snapshot is not None and time.monotonic() - snapshot.checked_at < settings.CATALOG_VERSION_CHECK_SECONDS:
+        return snapshot
+
+    with _lock:
+        snapshot = _snapshot
+        if snapshot is not None and time.monotonic() - snapshot.checked_at < settings.CATALOG_VERSION_CHECK_SECONDS:
+            return snapshot
+        if snapshot is not None:
+            with db_connection(db) as conn:
+                if _read_version(conn) == snapshot.version:
+                    snapshot.checked_at = time.monotonic()
+                    return snapshot
+        with db_connection() as conn:
+            _snapshot = load_snapshot(conn)
+        return _snapshot
+
+
+def invalidate():
+    """Force a version check on next access (call after writing catalog tables)"""
+    snapshot = _snapshot
+    if snapshot is not None:
+        snapshot.checked_at = float("-inf")
+
+
+def warm_up():
+    """Load the snapshot at startup; a missing schema just defers loading"""
+    try:
+        get_catalog()
+    except sqlite3.OperationalError as e:
+        print(f"Catalog snapshot not loaded: {e}")
@@ -0,0 +1,83 @@
+# services/image_service.py - Image variants generated in a process pool at upload time
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+from config import settings
+from utils.image_processing import generate_variants
+
+
+class ImageVariantPool:
+    """
+    Resizes/re-encodes uploads in worker processes so the event loop and
+    request threads never run Pillow. workers=0 processes inline.
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.processed = 0
+        self.failed = 0
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("spawn")
+                    )
+        return self._executor
+
+    def _discard(self, pool: ProcessPoolExecutor):
+        """Forget a broken pool so the next submit spawns a fresh one"""
+        with self._lock:
+            if self._executor is pool:
+                self._executor = None
+        pool.shutdown(wait=False)
+
+    def _submit(self, fn, *args):
+        """
+        A worker killed mid-job (OOM, crash on a hostile image) breaks the whole
+        executor, so a broken pool is replaced instead of failing every later upload
+        """
+        pool = self._pool()
+        try:
+            future = pool.submit(fn, *args)
+        except BrokenProcessPool:
+            self._discard(pool)
+            pool = self._pool()
+            future = pool.submit(fn, *args)
+        future.add_done_callback(lambda f: self._discard_if_broken(pool, f))
+        return future
+
+    def _discard_if_broken(self, pool: ProcessPoolExecutor, future):
+        if not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+            self._discard(pool)
+
+    async def generate(self, src_path: str, out_dir: str) -> dict:
+        try:
+            if self.workers <= 0:
+                variants = generate_variants(src_path, out_dir)
+            else:
+                variants = await asyncio.wrap_future(self._submit(generate_variants, src_path, out_dir))
+        except Exception:
+            self.failed += 1
+            raise
+        self.processed += 1
+        return variants
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def stats(self) -> dict:
+        return {"workers": self.workers, "processed": self.processed, "failed": self.failed}
+
+
+image_pool = ImageVariantPool(settings.IMAGE_WORKERS)
@@ -1,9 +1,13 @@
 # services/otp_service.py - OTP generation and verification (Simulated)
+import heapq
+import hmac
 import random
 import string
+import threading
+import time
 from datetime import datetime, timedelta
 from config import settings
-import sqlite3
+from sqlite import db_connection
 
 def generate_otp(length: int = 6) -> str:
     """Generate a random OTP code"""
@@ -35,33 +39,113 @@ def send_otp(phone: str, otp_code: str) -> bool:
         print(f"Unknown SMS provider: {settings.SMS_PROVIDER}")
         return False
 
-def create_otp(db: sqlite3.Connection, phone: str) -> tuple[str, bool]:
+class MemoryOTPStore:
+    """
+    Single-process OTP store: dict lookup by phone plus a min-heap of
+    expiry times, so expired codes are dropped without scanning.
+    """
+
+    def __init__(self):
+        self._codes = {}  # phone -> (otp_code, expires_at)
+        self._expiry = []  # heap of (expires_at, phone)
+        self._lock = threading.Lock()
+
+    def _prune(self, now: float):
+        while self._expiry and self._expiry[0][0] <= now:
+            expires_at, phone = heapq.heappop(self._expiry)
+            entry = self._codes.get(phone)
+            # A newer code for the same phone has its own heap entry
+            if entry is not None and entry[1] == expires_at:
+                del self._codes[phone]
+
+    def issue(self, phone: str, otp_code: str, ttl_seconds: float, db=None):
+        now = time.time()
+        expires_at = now + ttl_seconds
+        with self._lock:
+            self._prune(now)
+            self._codes[phone] = (otp_code, expires_at)
+            heapq.heappush(self._expiry, (expires_at, phone))
+
+    def verify_and_consume(self, phone: str, otp_code: str, db=None) -> bool:
+        now = time.time()
+        with self._lock:
+            self._prune(now)
+            entry = self._codes.get(phone)
+            if entry is None or entry[1] <= now or not hmac.compare_digest(entry[0].encode(), otp_code.encode("utf-8")):
+                return False
+            del self._codes[phone]
+            return True
+
+    def cleanup(self) -> int:
+        with self._lock:
+            before = len(self._codes)
+            self._prune(time.time())
+            return before - len(self._codes)
+
+
+class SQLiteOTPStore:
+    """
+    OTP store shared by every worker process through otp_verification.
+    At most one live row per phone: issuing deletes the phone's old row and
+    any expired rows, and a successful verification deletes the row it matched.
+    Callers inside a request pass its connection as db.
+    """
+
+    def issue(self, phone: str, otp_code: str, ttl_seconds: float, db=None):
+        now = datetime.now()
+        with db_connection(db) as db:
+            db.execute(
+                "DELETE FROM otp_verification WHERE phone = ? OR expires_at < ?",
+                (phone, now)
+            )
+            db.execute(
+                """INSERT INTO otp_verification (phone, otp_code, expires_at, is_verified)
+                   VALUES (?, ?, ?, 0)""",
+                (phone, otp_code, now + timedelta(seconds=ttl_seconds))
+            )
+            db.commit()
+
+    def verify_and_consume(self, phone: str, otp_code: str, db=None) -> bool:
+        # One DELETE both checks and consumes, so a code can only be used once
+        with db_connection(db) as db:
+            cursor = db.execute(
+                """DELETE FROM otp_verification
+                   WHERE phone = ? AND otp_code = ? AND is_verified = 0 AND expires_at > ?""",
+                (phone, otp_code, datetime.now())
+            )
+            db.commit()
+            return cursor.rowcount > 0
+
+    def cleanup(self) -> int:
+        with db_connection() as db:
+            cursor = db.execute(
+                "DELETE FROM otp_verification WHERE expires_at < ? OR is_verified = 1",
+                (datetime.now(),)
+            )
+            db.commit()
+            return cursor.rowcount
+
+
+def _create_store(backend: str):
+    if backend == "sqlite":
+        return SQLiteOTPStore()
+    if backend != "memory":
+        print(f"Unknown OTP backend '{backend}', using memory")
+    return MemoryOTPStore()
+
+
+otp_store = _create_store(settings.OTP_BACKEND)
+
+def create_otp(phone: str, db=None) -> tuple[str, bool]:
     """
     Create and store OTP for a phone number
     Returns (otp_code, success)
     """
-    cursor = db.cursor()
-    
     # Generate OTP
     otp_code = generate_otp(settings.OTP_LENGTH)
     
-    # Calculate expiry time
-    expires_at = datetime.now() + timedelta(minutes=settings.OTP_EXPIRY_MINUTES)
-    
     try:
-        # Delete any existing OTPs for this phone
-        cursor.execute(
-            "DELETE FROM otp_verification WHERE phone = ? AND is_verified = 0",
-            (phone,)
-        )
-        
-        # Insert new OTP
-        cursor.execute(
-            """INSERT INTO otp_verification (phone, otp_code, expires_at, is_verified)
-               VALUES (?, ?, ?, 0)""",
-            (phone, otp_code, expires_at)
-        )
-        db.commit()
+        otp_store.issue(phone, otp_code, settings.OTP_EXPIRY_MINUTES * 60, db)
         
         # Send OTP
         send_result = send_otp(phone, otp_code)
@@ -72,64 +156,20 @@ def create_otp(db: sqlite3.Connection, phone: str) -> tuple[str, bool]:
         print(f"Error creating OTP: {e}")
         return None, False
 
-def verify_otp(db: sqlite3.Connection, phone: str, otp_code: str) -> bool:
+def verify_otp(phone: str, otp_code: str, db=None) -> bool:
     """
-    Verify OTP code for a phone number
-    Returns True if valid, False otherwise
+    Verify and consume the OTP code for a phone number
+    Returns True if valid, False if wrong, expired or already used
     """
-    cursor = db.cursor()
-    
-    # Get latest OTP for this phone
-    cursor.execute(
-        """SELECT id, otp_code, expires_at, is_verified 
-           FROM otp_verification 
-           WHERE phone = ? 
-           ORDER BY created_at DESC 
-           LIMIT 1""",
-        (phone,)
-    )
-    result = cursor.fetchone()
-    
-    if not result:
-        print(f"No OTP found for phone: {phone}")
+    if not otp_store.verify_and_consume(phone, otp_code, db):
+        print(f"Invalid, expired or used OTP for phone: {phone}")
         return False
     
-    otp_id, stored_otp, expires_at, is_verified = result
-    
-    # Check if already verified
-    if is_verified:
-        print(f"OTP already used for phone: {phone}")
-        return False
-    
-    # Check if expired
-    expires_at_dt = datetime.fromisoformat(expires_at)
-    if datetime.now() > expires_at_dt:
-        print(f"OTP expired for phone: {phone}")
-        return False
-    
-    # Verify code
-    if stored_otp != otp_code:
-        print(f"Invalid OTP code for phone: {phone}")
-        return False
-    
-    # Mark as verified
-    cursor.execute(
-        "UPDATE otp_verification SET is_verified = 1 WHERE id = ?",
-        (otp_id,)
-    )
-    db.commit()
-    
     print(f"✅ OTP verified successfully for phone: {phone}")
     return True
 
-def cleanup_expired_otps(db: sqlite3.Connection):
-    """Remove expired OTPs from database"""
-    cursor = db.cursor()
-    cursor.execute(
-        "DELETE FROM otp_verification WHERE expires_at < ? OR is_verified = 1",
-        (datetime.now(),)
-    )
-    deleted = cursor.rowcount
-    db.commit()
+def cleanup_expired_otps():
+    """Remove expired OTPs from the store"""
+    deleted = otp_store.cleanup()
     print(f"Cleaned up {deleted} expired/used OTPs")
     return deleted
@@ -0,0 +1,132 @@
+# services/password_service.py - bcrypt hashing in a dedicated process pool
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Tuple
+from passlib.context import CryptContext
+from config import settings
+
+_contexts = {}
+
+
+def _context(rounds: int) -> CryptContext:
+    """CryptContext for a cost factor; hashes below it are flagged for rehash"""
+    ctx = _contexts.get(rounds)
+    if ctx is None:
+        ctx = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=rounds)
+        _contexts[rounds] = ctx
+    return ctx
+
+
+# Worker-side functions (must be module level so the pool can pickle them)
+
+def _hash(password: str, rounds: int) -> str:
+    return _context(rounds).hash(password)
+
+
+def _verify_and_update(password: str, password_hash: str, rounds: int) -> Tuple[bool, Optional[str]]:
+    return _context(rounds).verify_and_update(password, password_hash)
+
+
+class HasherBusyError(RuntimeError):
+    """Raised when the hashing queue stays full for PASSWORD_HASH_QUEUE_TIMEOUT seconds"""
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt in worker processes so request threads only wait on a future.
+    At most `max_pending` operations are queued or running; further callers
+    wait up to `queue_timeout` seconds for room and then get HasherBusyError.
+    workers=0 hashes inline (development, single-process tools).
+    """
+
+    def __init__(self, workers: int, max_pending: int, queue_timeout: float, rounds: int):
+        self.workers = workers
+        self.rounds = rounds
+        self.queue_timeout = queue_timeout
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self.max_pending = max_pending
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    # spawn: never fork a process that already runs server threads
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("spawn")
+                    )
+        return self._executor
+
+    def _discard(self, pool: ProcessPoolExecutor):
+        """Forget a broken pool so the next call spawns a fresh one"""
+        with self._lock:
+            if self._executor is pool:
+                self._executor = None
+        pool.shutdown(wait=False)
+
+    def _call(self, fn, *args):
+        pool = self._pool()
+        try:
+            return pool.submit(fn, *args).result()
+        except BrokenProcessPool:
+            self._discard(pool)
+            raise
+
+    def _run(self, fn, *args):
+        if self.workers <= 0:
+            return fn(*args)
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            self.rejected += 1
+            raise HasherBusyError("Password hashing queue is full")
+        try:
+            try:
+                return self._call(fn, *args)
+            except BrokenProcessPool:
+                # A worker died (e.g. OOM-killed): retry once on a fresh pool rather than failing every login
+                return self._call(fn, *args)
+        finally:
+            self._slots.release()
+
+    def hash(self, password: str) -> str:
+        return self._run(_hash, password, self.rounds)
+
+    def verify_and_update(self, password: str, password_hash: str) -> Tuple[bool, Optional[str]]:
+        """(valid, new_hash); new_hash is set when the stored cost differs from BCRYPT_ROUNDS"""
+        return self._run(_verify_and_update, password, password_hash, self.rounds)
+
+    def verify(self, password: str, password_hash: str) -> bool:
+        return self.verify_and_update(password, password_hash)[0]
+
+    def start(self):
+        """Spawn the workers up front so the first logins don't pay for it"""
+        if self.workers > 0:
+            pool = self._pool()
+            for _ in range(self.workers):
+                pool.submit(_context, self.rounds)
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "rounds": self.rounds,
+            "max_pending": self.max_pending,
+            "rejected": self.rejected,
+        }
+
+
+hasher = PasswordHasher(
+    settings.PASSWORD_HASH_WORKERS,
+    settings.PASSWORD_HASH_MAX_PENDING,
+    settings.PASSWORD_HASH_QUEUE_TIMEOUT,
+    settings.BCRYPT_ROUNDS
+)
@@ -5,6 +5,7 @@ from typing import Optional
 import random
 import string
 from config import settings
+from services.user_service import invalidate_user
 
 def generate_transaction_id() -> str:
     """Generate a unique transaction ID"""
@@ -173,6 +174,7 @@ def activate_premium_feature(
         (user_id,)
     )
     db.commit()
+    invalidate_user(user_id)
     
     print(f"✅ Activated {feature_name} for user {user_id} (duration: {duration_days} days)")
     
@@ -0,0 +1,201 @@
+# services/pdf_service.py - Background PDF text extraction, cached by content hash
+import multiprocessing
+import sqlite3
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+from config import settings
+from sqlite import db_connection
+from utils.pdf_parser import extract_text_budgeted
+
+
+class PDFExtractionPool:
+    """
+    Parses uploaded PDFs in worker processes. Results live in document_texts
+    keyed by the blob's SHA-256, so each distinct file is parsed once no
+    matter how many documents reference it. Every job runs under the
+    PDF_MAX_PAGES / PDF_MAX_SECONDS budget. workers=0 parses inline.
+    """
+
+    def __init__(self, workers: int, max_pages: int, max_seconds: float):
+        self.workers = workers
+        self.max_pages = max_pages
+        self.max_seconds = max_seconds
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("spawn")
+                    )
+        return self._executor
+
+    def _discard(self, pool: ProcessPoolExecutor):
+        """Forget a broken pool so the next submit spawns a fresh one"""
+        with self._lock:
+            if self._executor is pool:
+                self._executor = None
+        pool.shutdown(wait=False)
+
+    def _submit(self, fn, *args):
+        """
+        A worker killed mid-job (OOM, crash on a hostile PDF) breaks the whole
+        executor, so a broken pool is replaced instead of failing every later job
+        """
+        pool = self._pool()
+        try:
+            future = pool.submit(fn, *args)
+        except BrokenProcessPool:
+            self._discard(pool)
+            pool = self._pool()
+            future = pool.submit(fn, *args)
+        future.add_done_callback(lambda f: self._discard_if_broken(pool, f))
+        return future
+
+    def _discard_if_broken(self, pool: ProcessPoolExecutor, future):
+        if not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+            self._discard(pool)
+
+    def submit(self, sha256: str, path: str, force: bool = False, db=None) -> bool:
+        """Queue a blob for extraction; False if it is already queued, running or done"""
+        with db_connection(db) as db:
+            if force:
+                db.execute("DELETE FROM document_texts WHERE sha256 = ?", (sha256,))
+            cursor = db.execute(
+                "INSERT OR IGNORE INTO document_texts (sha256, status) VALUES (?, 'queued')", (sha256,)
+            )
+            db.commit()
+            if cursor.rowcount == 0:
+                return False
+            self._dispatch(sha256, path, db)
+        return True
+
+    def _dispatch(self, sha256: str, path: str, db=None):
+        self.submitted += 1
+        if self.workers <= 0:
+            self._mark_processing(sha256, db)
+            try:
+                result = extract_text_budgeted(path, self.max_pages, self.max_seconds)
+            except Exception as e:
+                self._store_failure(sha256, e, db)
+            else:
+                self._store_result(sha256, result, db)
+            return
+
+        try:
+            future = self._submit(extract_text_budgeted, path, self.max_pages, self.max_seconds)
+        except Exception as e:
+            # The upload's documents row is already committed: record the job as failed
+            self._store_failure(sha256, e, db)
+            return
+        self._mark_processing(sha256, db)
+        future.add_done_callback(lambda f: self._on_done(sha256, f))
+
+    def _on_done(self, sha256: str, future):
+        try:
+            result = future.result()
+        except Exception as e:
+            self._store_failure(sha256, e)
+        else:
+            self._store_result(sha256, result)
+
+    def _mark_processing(self, sha256: str, db=None):
+        with db_connection(db) as db:
+            db.execute(
+                "UPDATE document_texts SET status = 'processing' WHERE sha256 = ? AND status = 'queued'",
+                (sha256,)
+            )
+            db.commit()
+
+    def _store_result(self, sha256: str, result: dict, db=None):
+        with db_connection(db) as db:
+            db.execute(
+                """UPDATE document_texts
+                   SET status = 'done', text = ?, page_count = ?, pages_parsed = ?,
+                       truncated_reason = ?, error = NULL, finished_at = CURRENT_TIMESTAMP
+                   WHERE sha256 = ?""",
+                (result["text"], result["page_count"], result["pages_parsed"],
+                 result["truncated_reason"], sha256)
+            )
+            db.commit()
+        self.completed += 1
+        print(f"PDF {sha256[:12]} parsed: {result['pages_parsed']}/{result['page_count']} pages "
+              f"in {result['seconds']}s" + (f" ({result['truncated_reason']})" if result["truncated"] else ""))
+
+    def _store_failure(self, sha256: str, error: Exception, db=None):
+        with db_connection(db) as db:
+            db.execute(
+                """UPDATE document_texts SET status = 'failed', error = ?, finished_at = CURRENT_TIMESTAMP
+                   WHERE sha256 = ?""",
+                (f"{type(error).__name__}: {error}"[:500], sha256)
+            )
+            db.commit()
+        self.failed += 1
+        print(f"PDF {sha256[:12]} extraction failed: {error}")
+
+    def resume_pending(self):
+        """Re-queue jobs a previous process left queued or half-done"""
+        try:
+            with db_connection() as db:
+                rows = db.execute(
+                    """SELECT t.sha256, b.path FROM document_texts t JOIN blobs b ON b.sha256 = t.sha256
+                       WHERE t.status IN ('queued', 'processing')"""
+                ).fetchall()
+                db.execute("UPDATE document_texts SET status = 'queued' WHERE status = 'processing'")
+                db.commit()
+        except sqlite3.OperationalError as e:
+            print(f"PDF jobs not resumed: {e}")
+            return
+        for sha256, path in rows:
+            self._dispatch(sha256, path)
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "max_pages": self.max_pages,
+            "max_seconds": self.max_seconds,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+        }
+
+
+def get_text_status(db: sqlite3.Connection, sha256: str, include_text: bool = False) -> Optional[dict]:
+    """Extraction job status (and text, once done) for a blob"""
+    row = db.execute(
+        """SELECT status, page_count, pages_parsed, truncated_reason, error, queued_at, finished_at, text
+           FROM document_texts WHERE sha256 = ?""",
+        (sha256,)
+    ).fetchone()
+    if row is None:
+        return None
+    result = {
+        "status": row[0],
+        "page_count": row[1],
+        "pages_parsed": row[2],
+        "truncated": row[3] is not None,
+        "truncated_reason": row[3],
+        "error": row[4],
+        "queued_at": row[5],
+        "finished_at": row[6],
+    }
+    if include_text:
+        result["text"] = row[7]
+    return result
+
+
+pdf_pool = PDFExtractionPool(settings.PDF_WORKERS, settings.PDF_MAX_PAGES, settings.PDF_MAX_SECONDS)
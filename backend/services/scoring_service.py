@@ -1,3 +1,6 @@
+from typing import Dict, List, Optional
+import numpy as np
+
 
 def score_university(student, uni, weights):
     score = 0
@@ -7,3 +10,172 @@ def score_university(student, uni, weights):
     if uni["scholarship_available"]:
         score += weights["scholarship_weight"]
     return score
+
+
+# ============= Vectorized recommendation scoring =============
+
+MIN_RECOMMENDATION_SCORE = 0.3
+
+
+class UniversityScoringEngine:
+    """
+    In-memory column store of the university catalog.
+    Scores every candidate at once with array ops; reasons/pros/cons are only
+    built for the rows that are actually returned.
+    """
+
+    def __init__(self, universities: List[tuple], majors: List[tuple], links: List[tuple]):
+        """
+        universities: (id, name, country, tuition_fee, min_gpa, scholarship_available,
+                       success_weight, acceptance_rate), active rows only
+        majors: (id, name)
+        links: (university_id, major_id)
+        """
+        # Same candidate order as the old SQL query (success_weight DESC)
+        self.rows = sorted(universities, key=lambda u: (-(u[6] if u[6] is not None else float("-inf")), u[0]))
+        n = len(self.rows)
+
+        def column(i):
+            return np.array([np.nan if r[i] is None else r[i] for r in self.rows], dtype=np.float64)
+
+        self.ids = np.array([r[0] for r in self.rows], dtype=np.int64)
+        self.tuition = column(3)
+        self.min_gpa = column(4)
+        self.scholarship = np.array([bool(r[5]) for r in self.rows], dtype=bool)
+        self.success_weight = column(6)
+        self.acceptance_rate = column(7)
+
+        # Countries as small integer codes (case-insensitive), -1 for missing
+        self.country_codes: Dict[str, int] = {}
+        codes = np.full(n, -1, dtype=np.int32)
+        for i, r in enumerate(self.rows):
+            if r[2] is not None:
+                codes[i] = self.country_codes.setdefault(r[2].lower(), len(self.country_codes))
+        self.country = codes
+
+        # Major name -> row indices of universities offering it
+        position = {uni_id: i for i, uni_id in enumerate(self.ids.tolist())}
+        by_major: Dict[int, list] = {}
+        for uni_id, major_id in links:
+            if uni_id in position:
+                by_major.setdefault(major_id, []).append(position[uni_id])
+        self.majors = [
+            (name.lower(), np.array(by_major.get(major_id, []), dtype=np.int64))
+            for major_id, name in majors if name is not None
+        ]
+
+    def __len__(self):
+        return len(self.rows)
+
+    def candidates(self, preferred_major: str) -> np.ndarray:
+        """Boolean mask of universities offering a major whose name contains preferred_major"""
+        mask = np.zeros(len(self.rows), dtype=bool)
+        needle = (preferred_major or "").lower()
+        for name, rows in self.majors:
+            if needle in name:
+                mask[rows] = True
+        return mask
+
+    def score(self, gpa: float, budget: Optional[float], preferred_country: Optional[str],
+              mask: np.ndarray) -> np.ndarray:
+        """Score every university; rows that are not recommendable get NaN"""
+        min_gpa = self.min_gpa
+        tuition = self.tuition
+        budget_value = np.nan if budget is None else float(budget)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # GPA match (30%) - only universities with min_gpa >= the student's GPA stay in
+            eligible = mask & (gpa <= min_gpa)
+            gpa_score = np.where(min_gpa < 4.0, np.minimum(1.0, (gpa - min_gpa) / (4.0 - min_gpa)), 1.0)
+            score = 0.0 + gpa_score * 0.3
+
+            # Budget match (25%), partial credit when scholarships may cover the gap
+            within_budget = tuition <= budget_value
+            budget_score = 1.0 - (tuition / budget_value) * 0.5
+            score = score + np.where(within_budget, budget_score * 0.25,
+                                     np.where(self.scholarship, 0.15, 0.0))
+
+        # Scholarship availability (20%)
+        score = score + np.where(self.scholarship, 0.2, 0.0)
+
+        # Country preference (10%)
+        if preferred_country:
+            code = self.country_codes.get(preferred_country.lower(), -2)
+            score = score + np.where(self.country == code, 0.1, 0.0)
+
+        # Success weight (15%)
+        score = score + (self.success_weight - 1.0) * 0.15
+
+        return np.where(eligible & (score > MIN_RECOMMENDATION_SCORE), score, np.nan)
+
+    def top_k(self, scores: np.ndarray, k: int) -> List[int]:
+        """
+        Row indices of the k best scores, ordered like a stable sort on the
+        2-decimal rounded score (ties keep catalog order)
+        """
+        valid = np.flatnonzero(~np.isnan(scores))
+        if valid.size == 0 or k <= 0:
+            return []
+
+        rounded = np.round(scores[valid], 2)
+        if valid.size > k:
+            kth = np.partition(rounded, valid.size - k)[valid.size - k]
+            # np.round and round() can disagree by one step each way; keep a margin so ties stay exact
+            keep = rounded >= kth - 0.021
+            valid, rounded = valid[keep], rounded[keep]
+
+        exact = np.array([round(float(s), 2) for s in scores[valid]])
+        order = np.lexsort((valid, -exact))
+        return valid[order[:k]].tolist()
+
+    def explain(self, i: int, gpa: float, budget, preferred_country: Optional[str],
+                score: float) -> Dict:
+        uni_id, name, country, tuition, min_gpa, has_scholarship, success_weight, _ = self.rows[i]
+        reasons, pros, cons = [], [], []
+
+        if gpa >= min_gpa + 0.3:
+            pros.append(f"Your GPA ({gpa}) exceeds requirements ({min_gpa})")
+            reasons.append("Strong academic match based on GPA")
+
+        if budget is not None and tuition is not None and tuition <= budget:
+            pros.append(f"Tuition (${tuition}) is within your budget (${budget})")
+            reasons.append("Affordable tuition within budget")
+        elif has_scholarship:
+            pros.append("Scholarship opportunities available")
+            cons.append(f"Tuition (${tuition}) exceeds budget, but scholarships may help")
+        else:
+            cons.append(f"Tuition (${tuition}) exceeds budget (${budget})")
+
+        if has_scholarship:
+            reasons.append("Scholarship opportunities available")
+
+        if preferred_country and country and country.lower() == preferred_country.lower():
+            reasons.append(f"Located in your preferred country ({country})")
+            pros.append(f"Located in {country} as preferred")
+
+        if success_weight > 1.1:
+            reasons.append("Strong success history with past students")
+            pros.append("High success rate with previous applicants")
+
+        return {
+            "id": uni_id,
+            "name": name,
+            "country": country,
+            "tuition_fee": tuition,
+            "min_gpa": min_gpa,
+            "scholarship_available": bool(has_scholarship),
+            "recommendation_score": round(score, 2),
+            "reasons": reasons,
+            "pros": pros,
+            "cons": cons
+        }
+
+    def recommend(self, gpa: float, budget, preferred_country: Optional[str],
+                  preferred_major: str, max_results: int = 10) -> List[Dict]:
+        if gpa is None:
+            return []
+        scores = self.score(gpa, budget, preferred_country, self.candidates(preferred_major))
+        return [
+            self.explain(i, gpa, budget, preferred_country, float(scores[i]))
+            for i in self.top_k(scores, max_results)
+        ]
@@ -1,61 +1,100 @@
 import os
 import aiofiles
 from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
 from config import settings
-from typing import Optional
+from services.pdf_service import pdf_pool
+from services.image_service import image_pool
+from sqlite import db_connection
+from PIL import Image
+from typing import AsyncIterator, Optional
+from concurrent.futures.process import BrokenProcessPool
+from urllib.parse import quote
 import hashlib
+import secrets
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
 from datetime import datetime
 
-async def save_upload_file(file: UploadFile, user_id: int, category: str = "general") -> dict:
+async def _upload_chunks(file: UploadFile) -> AsyncIterator[bytes]:
+    while True:
+        chunk = await file.read(settings.UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            return
+        yield chunk
+
+async def write_stream(chunks: AsyncIterator[bytes], dest_path: str, max_size: int,
+                       hash_name: str = "sha256") -> tuple:
+    """
+    Copy a stream of chunks to dest_path, hashing as it goes. Writes to a
+    temp file in the same directory and renames it into place, so dest_path
+    never holds a partial file. Raises ValueError as soon as the stream
+    exceeds max_size. Returns (size, hex_digest).
+    """
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(dest_path), suffix=".part")
+    os.close(fd)
+    digest = hashlib.new(hash_name)
+    size = 0
+    
+    try:
+        async with aiofiles.open(temp_path, 'wb') as out:
+            async for chunk in chunks:
+                size += len(chunk)
+                if size > max_size:
+                    raise ValueError(f"File size exceeds maximum allowed size of {max_size / (1024*1024)}MB")
+                digest.update(chunk)
+                await out.write(chunk)
+        os.replace(temp_path, dest_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    
+    return size, digest.hexdigest()
+
+async def stream_to_file(file: UploadFile, dest_path: str, max_size: int) -> tuple:
     """
-    Save an uploaded file to storage
+    Copy an upload to dest_path in UPLOAD_CHUNK_SIZE chunks (see write_stream).
+    Returns (file_size, md5_hex).
+    """
+    if file.size is not None and file.size > max_size:
+        raise ValueError(f"File size exceeds maximum allowed size of {max_size / (1024*1024)}MB")
+    return await write_stream(_upload_chunks(file), dest_path, max_size, "md5")
+
+async def save_upload_file(file: UploadFile, user_id: int, category: str = "general",
+                           allowed_types: Optional[set] = None) -> dict:
+    """
+    Save an uploaded file to storage (streamed; memory use stays at one chunk)
     Returns dict with file info
     """
     # Validate file extension
+    allowed_types = allowed_types or settings.ALLOWED_EXTENSIONS
     file_ext = os.path.splitext(file.filename)[1].lower()
-    if file_ext not in settings.ALLOWED_EXTENSIONS:
-        raise ValueError(f"File type {file_ext} not allowed. Allowed types: {settings.ALLOWED_EXTENSIONS}")
+    if file_ext not in allowed_types:
+        raise ValueError(f"File type {file_ext} not allowed. Allowed types: {allowed_types}")
     
     # Create user directory
     user_dir = os.path.join(settings.UPLOAD_DIR, str(user_id), category)
     os.makedirs(user_dir, exist_ok=True)
     
-    # Generate unique filename
+    # Generate unique filename (basename: a client-supplied path must not escape user_dir)
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    safe_filename = file.filename.replace(" ", "_")
+    safe_filename = os.path.basename(file.filename).replace(" ", "_")
     filename = f"{timestamp}_{safe_filename}"
     file_path = os.path.join(user_dir, filename)
     
-    # Save file
-    try:
-        # Read file content
-        contents = await file.read()
-        file_size = len(contents)
-        
-        # Check file size
-        if file_size > settings.MAX_FILE_SIZE:
-            raise ValueError(f"File size exceeds maximum allowed size of {settings.MAX_FILE_SIZE / (1024*1024)}MB")
-        
-        # Write file
-        async with aiofiles.open(file_path, 'wb') as f:
-            await f.write(contents)
-        
-        # Calculate file hash for integrity
-        file_hash = hashlib.md5(contents).hexdigest()
-        
-        return {
-            "file_path": file_path,
-            "file_name": safe_filename,
-            "file_size": file_size,
-            "file_hash": file_hash,
-            "file_ext": file_ext
-        }
-        
-    except Exception as e:
-        # Clean up if error
-        if os.path.exists(file_path):
-            os.remove(file_path)
-        raise e
+    file_size, file_hash = await stream_to_file(file, file_path, settings.MAX_FILE_SIZE)
+    
+    return {
+        "file_path": file_path,
+        "file_name": safe_filename,
+        "file_size": file_size,
+        "file_hash": file_hash,
+        "file_ext": file_ext
+    }
 
 async def delete_file(file_path: str) -> bool:
     """Delete a file from storage"""
@@ -69,11 +108,38 @@ async def delete_file(file_path: str) -> bool:
         return False
 
 def get_file_url(file_path: str) -> str:
-    """Convert file path to accessible URL"""
+    """Convert file path to its /uploads URL (served by routers/files.py)"""
     # In production, this would return a CDN or signed URL
-    # For now, return relative path from upload directory
-    relative_path = file_path.replace(settings.UPLOAD_DIR, "/uploads")
-    return relative_path
+    relative_path = os.path.relpath(file_path, settings.UPLOAD_DIR).replace(os.sep, "/")
+    return "/uploads/" + quote(relative_path)
+
+PUBLIC_UPLOAD_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp', '.mp4', '.webm'}
+
+def _is_public_upload(parts: list) -> bool:
+    """
+    Only the categories written by save_profile_image (<user_id>/profile/...)
+    and save_university_media (0/universities/...) are public; documents and
+    anything else stay behind authenticated routes
+    """
+    if len(parts) < 3 or not parts[0].isdigit():
+        return False
+    return parts[1] == "profile" or (parts[0] == "0" and parts[1] == "universities")
+
+def resolve_upload_path(relative_path: str) -> Optional[str]:
+    """
+    Filesystem path for an /uploads URL path, or None unless it is a public
+    upload: a profile image or university media file (or one of their
+    variants) inside UPLOAD_DIR
+    """
+    root = os.path.realpath(settings.UPLOAD_DIR)
+    path = os.path.realpath(os.path.join(root, relative_path))
+    if os.path.commonpath([root, path]) != root or path == root:
+        return None
+    if not _is_public_upload(os.path.relpath(path, root).split(os.sep)):
+        return None
+    if os.path.splitext(path)[1].lower() not in PUBLIC_UPLOAD_EXTENSIONS:
+        return None
+    return path if os.path.isfile(path) else None
 
 def validate_file_type(filename: str, allowed_types: Optional[set] = None) -> bool:
     """Validate file type"""
@@ -87,25 +153,560 @@ def get_file_size_mb(file_size_bytes: int) -> float:
     """Convert bytes to MB"""
     return round(file_size_bytes / (1024 * 1024), 2)
 
+# ============= Content-addressed blobs =============
+
+def blob_path(sha256: str) -> str:
+    """UPLOAD_DIR/blobs/ab/cd/abcd... (two fan-out levels keep directories small)"""
+    return os.path.join(settings.UPLOAD_DIR, "blobs", sha256[:2], sha256[2:4], sha256)
+
+async def hash_upload(file: UploadFile, max_size: int) -> tuple:
+    """
+    Read an upload once, chunk by chunk, without writing anything.
+    Returns (file_size, sha256_hex); raises ValueError past max_size.
+    """
+    if file.size is not None and file.size > max_size:
+        raise ValueError(f"File size exceeds maximum allowed size of {max_size / (1024*1024)}MB")
+    
+    sha256 = hashlib.sha256()
+    file_size = 0
+    while True:
+        chunk = await file.read(settings.UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        file_size += len(chunk)
+        if file_size > max_size:
+            raise ValueError(f"File size exceeds maximum allowed size of {max_size / (1024*1024)}MB")
+        sha256.update(chunk)
+    await file.seek(0)
+    return file_size, sha256.hexdigest()
+
+def _existing_blob(db: sqlite3.Connection, sha256: str, file_size: int) -> Optional[dict]:
+    """An already stored blob for this content, touched so GC keeps it"""
+    cursor = db.cursor()
+    cursor.execute("SELECT path FROM blobs WHERE sha256 = ?", (sha256,))
+    row = cursor.fetchone()
+    if not row or not os.path.exists(row[0]):
+        return None
+    cursor.execute("UPDATE blobs SET released_at = ? WHERE sha256 = ?", (time.time(), sha256))
+    db.commit()
+    if cursor.rowcount == 0:
+        # gc_blobs deleted the row while we waited for the write lock
+        return None
+    return {"sha256": sha256, "file_path": row[0], "file_size": file_size, "deduplicated": True}
+
+def _register_blob(db: sqlite3.Connection, sha256: str, file_size: int, path: str) -> dict:
+    db.execute(
+        """INSERT INTO blobs (sha256, size, path, ref_count, released_at) VALUES (?, ?, ?, 0, ?)
+           ON CONFLICT(sha256) DO UPDATE SET path = excluded.path, released_at = excluded.released_at""",
+        (sha256, file_size, path, time.time())
+    )
+    db.commit()
+    return {"sha256": sha256, "file_path": path, "file_size": file_size, "deduplicated": False}
+
+async def store_blob(db: sqlite3.Connection, file: UploadFile, max_size: Optional[int] = None) -> dict:
+    """
+    Store an upload by content. Content that is already stored is not written
+    again: the existing blob is touched (so GC keeps it) and reused.
+    The caller adds the referencing documents/application_documents row.
+    The blobs lookup and insert run in the threadpool, off the event loop.
+    """
+    max_size = max_size or settings.MAX_FILE_SIZE
+    file_size, sha256 = await hash_upload(file, max_size)
+    existing = await run_in_threadpool(_existing_blob, db, sha256, file_size)
+    if existing:
+        return existing
+    
+    path = blob_path(sha256)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    await stream_to_file(file, path, max_size)
+    return await run_in_threadpool(_register_blob, db, sha256, file_size, path)
+
+def store_blob_file(db: sqlite3.Connection, src_path: str, file_size: int, sha256: str) -> dict:
+    """
+    store_blob for a file already on disk under UPLOAD_DIR and already hashed:
+    it is renamed into place, or removed if the content is already stored
+    """
+    existing = _existing_blob(db, sha256, file_size)
+    if existing:
+        os.remove(src_path)
+        return existing
+    
+    path = blob_path(sha256)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    os.replace(src_path, path)
+    return _register_blob(db, sha256, file_size, path)
+
+def gc_blobs(db: sqlite3.Connection, grace_seconds: Optional[float] = None) -> dict:
+    """
+    Remove blobs no row references any more. Blobs released or touched within
+    the grace period are kept, so an upload between store_blob and its
+    documents INSERT is never collected.
+    The file is moved to a tombstone before the DELETE commits: a concurrent
+    store_blob of the same content then finds no file and writes a fresh one
+    at blob_path, which GC never touches.
+    """
+    if grace_seconds is None:
+        grace_seconds = settings.BLOB_GC_GRACE_SECONDS
+    cutoff = time.time() - grace_seconds
+    
+    cursor = db.cursor()
+    cursor.execute(
+        "SELECT sha256, path, size FROM blobs WHERE ref_count <= 0 AND released_at < ?", (cutoff,)
+    )
+    removed = 0
+    bytes_freed = 0
+    for sha256, path, size in cursor.fetchall():
+        # Re-check in the DELETE: a concurrent upload may have touched it since
+        deleted = db.execute(
+            "DELETE FROM blobs WHERE sha256 = ? AND ref_count <= 0 AND released_at < ?",
+            (sha256, cutoff)
+        ).rowcount
+        if not deleted:
+            db.commit()
+            continue
+        db.execute("DELETE FROM document_texts WHERE sha256 = ?", (sha256,))
+        tombstone = f"{path}.gc-{secrets.token_hex(4)}"
+        try:
+            os.replace(path, tombstone)
+        except FileNotFoundError:
+            tombstone = None
+        except BaseException:
+            db.rollback()
+            raise
+        try:
+            db.commit()
+        except BaseException:
+            if tombstone:
+                os.replace(tombstone, path)
+            raise
+        if tombstone:
+            os.remove(tombstone)
+            removed += 1
+            bytes_freed += size
+    
+    expired_uploads = expire_upload_sessions(db)
+    print(f"Blob GC removed {removed} blobs ({get_file_size_mb(bytes_freed)}MB), "
+          f"{expired_uploads} expired multipart uploads")
+    return {"removed": removed, "bytes_freed": bytes_freed, "expired_uploads": expired_uploads}
+
+class BlobGCScheduler:
+    """
+    Runs gc_blobs (which also expires abandoned multipart uploads) every
+    interval_seconds on a daemon thread. interval_seconds=0 leaves it to
+    POST /admin/blobs/gc.
+    """
+
+    def __init__(self, interval_seconds: float):
+        self.interval_seconds = interval_seconds
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                with db_connection() as db:
+                    gc_blobs(db)
+            except Exception as e:
+                print(f"Scheduled blob GC failed: {e}")
+
+    def start(self):
+        if self.interval_seconds <= 0 or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="blob-gc", daemon=True)
+        self._thread.start()
+
+    def shutdown(self):
+        self._stop.set()
+        self._thread = None
+
+blob_gc = BlobGCScheduler(settings.BLOB_GC_INTERVAL_SECONDS)
+
+def blob_stats(db: sqlite3.Connection) -> dict:
+    """Stored bytes vs bytes referenced by documents (the difference is saved by dedup)"""
+    stored_blobs, stored_bytes = db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM blobs").fetchone()
+    referenced_bytes = db.execute(
+        """SELECT COALESCE(SUM(b.size), 0) FROM (
+               SELECT blob_sha256 FROM documents WHERE blob_sha256 IS NOT NULL
+               UNION ALL
+               SELECT blob_sha256 FROM application_documents WHERE blob_sha256 IS NOT NULL
+           ) r JOIN blobs b ON b.sha256 = r.blob_sha256"""
+    ).fetchone()[0]
+    unreferenced = db.execute("SELECT COUNT(*) FROM blobs WHERE ref_count <= 0").fetchone()[0]
+    return {
+        "blobs": stored_blobs,
+        "stored_bytes": stored_bytes,
+        "referenced_bytes": referenced_bytes,
+        "saved_bytes": max(0, referenced_bytes - stored_bytes),
+        "unreferenced_blobs": unreferenced,
+    }
+
 # Document-specific helpers
-async def save_document(file: UploadFile, user_id: int, doc_type: str) -> dict:
-    """Save a user document"""
-    return await save_upload_file(file, user_id, f"documents/{doc_type}")
+def _validate_document_name(file_name: str) -> str:
+    file_ext = os.path.splitext(file_name)[1].lower()
+    if file_ext not in settings.ALLOWED_EXTENSIONS:
+        raise ValueError(f"File type {file_ext} not allowed. Allowed types: {settings.ALLOWED_EXTENSIONS}")
+    return file_ext
+
+def _create_document(db: sqlite3.Connection, blob: dict, user_id: int, doc_type: str, file_name: str) -> dict:
+    """documents row for a stored blob; queues text extraction for PDFs"""
+    file_name = os.path.basename(file_name).replace(" ", "_")
+    cursor = db.cursor()
+    cursor.execute(
+        """INSERT INTO documents (user_id, doc_type, file_path, file_name, file_size, blob_sha256)
+           VALUES (?, ?, ?, ?, ?, ?)""",
+        (user_id, doc_type, blob["file_path"], file_name, blob["file_size"], blob["sha256"])
+    )
+    db.commit()
+    document_id = cursor.lastrowid
+    
+    # Text extraction runs in the background, once per distinct PDF
+    if os.path.splitext(file_name)[1].lower() == ".pdf":
+        pdf_pool.submit(blob["sha256"], blob["file_path"], db=db)
+    
+    return {
+        "id": document_id,
+        "doc_type": doc_type,
+        "file_name": file_name,
+        "file_size": blob["file_size"],
+        "sha256": blob["sha256"],
+        "deduplicated": blob["deduplicated"],
+    }
+
+async def save_document(db: sqlite3.Connection, file: UploadFile, user_id: int, doc_type: str) -> dict:
+    """
+    Save a user document (content-addressed: identical files share one blob).
+    Only the file I/O runs on the event loop; the inserts (and queueing PDF
+    text extraction) run in the threadpool.
+    """
+    _validate_document_name(file.filename)
+    blob = await store_blob(db, file)
+    return await run_in_threadpool(_create_document, db, blob, user_id, doc_type, file.filename)
+
+def attach_document_to_application(db: sqlite3.Connection, document_id: int, user_id: int,
+                                   application_id: int) -> Optional[int]:
+    """Reference a user's document from an application (metadata only, no copy)"""
+    cursor = db.cursor()
+    cursor.execute(
+        """SELECT d.doc_type, d.file_path, d.file_name, d.blob_sha256
+           FROM documents d JOIN applications a ON a.id = ? AND a.user_id = d.user_id
+           WHERE d.id = ? AND d.user_id = ?""",
+        (application_id, document_id, user_id)
+    )
+    doc = cursor.fetchone()
+    if not doc:
+        return None
+    
+    cursor.execute(
+        """INSERT INTO application_documents (application_id, document_type, file_path, file_name, blob_sha256)
+           VALUES (?, ?, ?, ?, ?)""",
+        (application_id, doc[0], doc[1], doc[2], doc[3])
+    )
+    db.commit()
+    return cursor.lastrowid
+
+def delete_document(db: sqlite3.Connection, document_id: int, user_id: int) -> bool:
+    """Drop a document row; its blob is removed by gc_blobs once nothing references it"""
+    cursor = db.cursor()
+    # A completed upload session keeps pointing at its document until now
+    cursor.execute(
+        """UPDATE upload_sessions SET document_id = NULL
+           WHERE document_id = ? AND user_id = ?""", (document_id, user_id)
+    )
+    cursor.execute("DELETE FROM documents WHERE id = ? AND user_id = ?", (document_id, user_id))
+    db.commit()
+    return cursor.rowcount > 0
+
+# ============= Resumable multipart uploads =============
+# init -> PUT parts (any order, in parallel, retried freely) -> complete.
+# Parts are files under UPLOAD_DIR/multipart/<upload_id>/; complete stitches
+# them into a content-addressed blob and creates the documents row.
+
+class UploadConflictError(Exception):
+    """The upload session is not open (completing, completed, expired)"""
+
+def multipart_dir(upload_id: str) -> str:
+    return os.path.join(settings.UPLOAD_DIR, "multipart", upload_id)
+
+def _part_path(upload_id: str, part_number: int) -> str:
+    return os.path.join(multipart_dir(upload_id), f"part-{part_number:05d}")
+
+def _load_session(db: sqlite3.Connection, upload_id: str, user_id: int) -> Optional[dict]:
+    row = db.execute(
+        """SELECT id, doc_type, file_name, file_size, part_size, part_count, status, document_id, expires_at
+           FROM upload_sessions WHERE id = ? AND user_id = ?""",
+        (upload_id, user_id)
+    ).fetchone()
+    if row is None:
+        return None
+    keys = ["upload_id", "doc_type", "file_name", "file_size", "part_size", "part_count",
+            "status", "document_id", "expires_at"]
+    return dict(zip(keys, row))
+
+def _expected_part_size(session: dict, part_number: int) -> int:
+    if part_number < session["part_count"]:
+        return session["part_size"]
+    return session["file_size"] - session["part_size"] * (session["part_count"] - 1)
+
+def create_upload_session(db: sqlite3.Connection, user_id: int, doc_type: str, file_name: str,
+                          file_size: int, part_size: Optional[int] = None) -> dict:
+    """Validate the declared file up front and open a session for its parts"""
+    _validate_document_name(file_name)
+    if file_size <= 0 or file_size > settings.MULTIPART_MAX_FILE_SIZE:
+        raise ValueError(
+            f"File size must be between 1 byte and {settings.MULTIPART_MAX_FILE_SIZE / (1024*1024)}MB"
+        )
+    part_size = part_size or settings.MULTIPART_PART_SIZE
+    if not settings.MULTIPART_MIN_PART_SIZE <= part_size <= settings.MULTIPART_MAX_PART_SIZE:
+        raise ValueError(
+            f"Part size must be between {settings.MULTIPART_MIN_PART_SIZE} and {settings.MULTIPART_MAX_PART_SIZE} bytes"
+        )
+    part_count = -(-file_size // part_size)
+    
+    upload_id = secrets.token_urlsafe(16)
+    expires_at = time.time() + settings.MULTIPART_SESSION_TTL_SECONDS
+    db.execute(
+        """INSERT INTO upload_sessions
+           (id, user_id, doc_type, file_name, file_size, part_size, part_count, expires_at)
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+        (upload_id, user_id, doc_type, os.path.basename(file_name), file_size, part_size, part_count, expires_at)
+    )
+    db.commit()
+    os.makedirs(multipart_dir(upload_id), exist_ok=True)
+    return {
+        "upload_id": upload_id,
+        "part_size": part_size,
+        "part_count": part_count,
+        "expires_at": expires_at,
+    }
+
+def get_upload_session(db: sqlite3.Connection, upload_id: str, user_id: int) -> Optional[dict]:
+    """Session state plus received/missing parts, so a client can resume"""
+    session = _load_session(db, upload_id, user_id)
+    if session is None:
+        return None
+    received = {
+        row[0]: {"part_number": row[0], "size": row[1], "sha256": row[2]}
+        for row in db.execute(
+            "SELECT part_number, size, sha256 FROM upload_parts WHERE upload_id = ? ORDER BY part_number",
+            (upload_id,)
+        )
+    }
+    session["parts"] = list(received.values())
+    if session["status"] == "completed":
+        # Parts rows are dropped on completion; nothing is left to send
+        session["missing_parts"] = []
+    else:
+        session["missing_parts"] = [n for n in range(1, session["part_count"] + 1) if n not in received]
+    return session
+
+def _load_session_pooled(upload_id: str, user_id: int) -> Optional[dict]:
+    with db_connection() as db:
+        return _load_session(db, upload_id, user_id)
+
+def _record_part(upload_id: str, part_number: int, size: int, sha256: str):
+    with db_connection() as db:
+        db.execute(
+            """INSERT INTO upload_parts (upload_id, part_number, size, sha256) VALUES (?, ?, ?, ?)
+               ON CONFLICT(upload_id, part_number) DO UPDATE
+               SET size = excluded.size, sha256 = excluded.sha256, received_at = CURRENT_TIMESTAMP""",
+            (upload_id, part_number, size, sha256)
+        )
+        db.commit()
+
+async def write_upload_part(upload_id: str, user_id: int, part_number: int,
+                            chunks: AsyncIterator[bytes], expected_sha256: Optional[str] = None) -> Optional[dict]:
+    """
+    Stream one part to disk. Re-sending a part replaces it, so a client
+    retries exactly the parts that failed. Returns None for an unknown
+    session; raises ValueError for a wrong size/checksum and
+    UploadConflictError once the session is no longer open.
+    A pooled connection is only held (in the threadpool, off the event loop)
+    for the lookup and the final upsert, never while a slow client is sending.
+    """
+    session = await run_in_threadpool(_load_session_pooled, upload_id, user_id)
+    if session is None:
+        return None
+    if session["status"] != "open" or session["expires_at"] < time.time():
+        raise UploadConflictError(f"Upload is {session['status'] if session['status'] != 'open' else 'expired'}")
+    if not 1 <= part_number <= session["part_count"]:
+        raise ValueError(f"Part number must be between 1 and {session['part_count']}")
+    
+    expected_size = _expected_part_size(session, part_number)
+    path = _part_path(upload_id, part_number)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    size, sha256 = await write_stream(chunks, path, expected_size)
+    if size != expected_size or (expected_sha256 and expected_sha256.lower() != sha256):
+        os.remove(path)
+        reason = f"expected {expected_size} bytes, got {size}" if size != expected_size else "checksum mismatch"
+        raise ValueError(f"Part {part_number} rejected: {reason}")
+    
+    await run_in_threadpool(_record_part, upload_id, part_number, size, sha256)
+    return {"part_number": part_number, "size": size, "sha256": sha256}
+
+def _claim_upload_session(upload_id: str, user_id: int) -> Optional[dict]:
+    """
+    Session with every part received, marked 'completing' so only one caller
+    stitches it. A claim older than MULTIPART_COMPLETE_LEASE_SECONDS belongs
+    to a process that died mid-completion and is taken over.
+    """
+    with db_connection() as db:
+        session = get_upload_session(db, upload_id, user_id)
+        if session is None or session["status"] == "completed":
+            return session
+        if session["missing_parts"]:
+            raise ValueError(f"Missing parts: {session['missing_parts'][:20]}")
+        
+        now = time.time()
+        claimed = db.execute(
+            """UPDATE upload_sessions SET status = 'completing', claimed_at = ?
+               WHERE id = ? AND expires_at >= ?
+                 AND (status = 'open' OR (status = 'completing' AND COALESCE(claimed_at, 0) < ?))""",
+            (now, upload_id, now, now - settings.MULTIPART_COMPLETE_LEASE_SECONDS)
+        ).rowcount
+        db.commit()
+    if not claimed:
+        raise UploadConflictError("Upload is already being completed or has expired")
+    return session
+
+def _reopen_upload_session(upload_id: str):
+    with db_connection() as db:
+        db.execute("UPDATE upload_sessions SET status = 'open', claimed_at = NULL WHERE id = ?", (upload_id,))
+        db.commit()
+
+def _finish_upload_session(session: dict, user_id: int, assembled: str, file_size: int, sha256: str) -> dict:
+    """Blob + documents row for the stitched file; the session is reopened if this fails"""
+    upload_id = session["upload_id"]
+    with db_connection() as db:
+        try:
+            blob = store_blob_file(db, assembled, file_size, sha256)
+            document = _create_document(db, blob, user_id, session["doc_type"], session["file_name"])
+        except BaseException:
+            db.execute("UPDATE upload_sessions SET status = 'open', claimed_at = NULL WHERE id = ?", (upload_id,))
+            db.commit()
+            raise
+        
+        db.execute(
+            "UPDATE upload_sessions SET status = 'completed', document_id = ? WHERE id = ?",
+            (document["id"], upload_id)
+        )
+        db.execute("DELETE FROM upload_parts WHERE upload_id = ?", (upload_id,))
+        db.commit()
+    shutil.rmtree(multipart_dir(upload_id), ignore_errors=True)
+    return document
+
+async def complete_upload_session(upload_id: str, user_id: int) -> Optional[dict]:
+    """
+    Concatenate the parts (hashing as they are copied) into a blob and create
+    the document. Completing twice returns the same document.
+    The session is claimed, then the connection is released while the parts
+    are stitched, and a fresh one is checked out to record the result.
+    """
+    session = await run_in_threadpool(_claim_upload_session, upload_id, user_id)
+    if session is None:
+        return None
+    if session["status"] == "completed":
+        return {"id": session["document_id"], "upload_id": upload_id, "already_completed": True}
+    
+    assembled = os.path.join(multipart_dir(upload_id), "assembled")
+    try:
+        async def part_chunks():
+            for number in range(1, session["part_count"] + 1):
+                async with aiofiles.open(_part_path(upload_id, number), "rb") as part:
+                    while True:
+                        chunk = await part.read(settings.UPLOAD_CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        yield chunk
+        
+        file_size, sha256 = await write_stream(part_chunks(), assembled, session["file_size"])
+        if file_size != session["file_size"]:
+            raise ValueError(f"Assembled {file_size} bytes, expected {session['file_size']}")
+    except BaseException:
+        await run_in_threadpool(_reopen_upload_session, upload_id)
+        raise
+    
+    document = await run_in_threadpool(_finish_upload_session, session, user_id, assembled, file_size, sha256)
+    return {**document, "upload_id": upload_id}
+
+def abort_upload_session(db: sqlite3.Connection, upload_id: str, user_id: int) -> bool:
+    """Drop an unfinished session and its parts"""
+    # Parts first: they reference the session
+    db.execute(
+        """DELETE FROM upload_parts WHERE upload_id = (
+               SELECT id FROM upload_sessions WHERE id = ? AND user_id = ? AND status = 'open'
+           )""", (upload_id, user_id)
+    )
+    cursor = db.execute(
+        "DELETE FROM upload_sessions WHERE id = ? AND user_id = ? AND status = 'open'", (upload_id, user_id)
+    )
+    db.commit()
+    if cursor.rowcount:
+        shutil.rmtree(multipart_dir(upload_id), ignore_errors=True)
+    return cursor.rowcount > 0
+
+def expire_upload_sessions(db: sqlite3.Connection) -> int:
+    """
+    Remove sessions past expires_at along with any parts left on disk.
+    A 'completing' session is only removed once its claim's lease has run out.
+    """
+    now = time.time()
+    expired = [
+        row[0] for row in db.execute(
+            """SELECT id FROM upload_sessions WHERE expires_at < ?
+               AND (status != 'completing' OR COALESCE(claimed_at, 0) < ?)""",
+            (now, now - settings.MULTIPART_COMPLETE_LEASE_SECONDS)
+        )
+    ]
+    for upload_id in expired:
+        db.execute("DELETE FROM upload_parts WHERE upload_id = ?", (upload_id,))
+        db.execute("DELETE FROM upload_sessions WHERE id = ?", (upload_id,))
+        db.commit()
+        shutil.rmtree(multipart_dir(upload_id), ignore_errors=True)
+    return len(expired)
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png'}
+
+def _variant_urls(variants: dict) -> dict:
+    """{name: {ext: {"url", "width", "height", "bytes"}}} for API responses"""
+    return {
+        name: {
+            ext: {"url": get_file_url(v["path"]), "width": v["width"], "height": v["height"], "bytes": v["bytes"]}
+            for ext, v in formats.items()
+        }
+        for name, formats in variants.items()
+    }
+
+async def _with_variants(info: dict) -> dict:
+    """Generate thumbnail/card/full variants next to a stored image"""
+    out_dir = os.path.splitext(info["file_path"])[0]
+    try:
+        variants = await image_pool.generate(info["file_path"], out_dir)
+    except (OSError, BrokenProcessPool, Image.DecompressionBombError, Image.DecompressionBombWarning) as e:
+        # BrokenProcessPool: the file killed its worker (the pool is replaced for the next upload)
+        print(f"Image variant generation failed for {info['file_path']}: {e}")
+        await delete_file(info["file_path"])
+        raise ValueError("Uploaded file is not a valid image")
+    info["variants"] = _variant_urls(variants)
+    return info
 
 async def save_profile_image(file: UploadFile, user_id: int) -> dict:
-    """Save a profile image"""
+    """Save a profile image and its resized variants"""
     # Only allow image types
-    allowed_images = {'.jpg', '.jpeg', '.png'}
-    if not validate_file_type(file.filename, allowed_images):
+    if not validate_file_type(file.filename, IMAGE_EXTENSIONS):
         raise ValueError("Only JPG and PNG images are allowed for profile pictures")
     
-    return await save_upload_file(file, user_id, "profile")
+    info = await save_upload_file(file, user_id, "profile")
+    return await _with_variants(info)
 
 async def save_university_media(file: UploadFile, university_id: int, media_type: str) -> dict:
-    """Save university image or video"""
+    """Save university image or video (images also get resized variants)"""
     allowed_media = {'.jpg', '.jpeg', '.png', '.mp4', '.webm'}
     if not validate_file_type(file.filename, allowed_media):
         raise ValueError(f"Only image and video files are allowed. Got: {file.filename}")
     
     category = f"universities/{university_id}/{media_type}"
-    return await save_upload_file(file, 0, category)  # User ID 0 for admin uploads
+    info = await save_upload_file(file, 0, category, allowed_media)  # User ID 0 for admin uploads
+    if info["file_ext"] in IMAGE_EXTENSIONS:
+        info = await _with_variants(info)
+    return info
@@ -1 +1,165 @@
 # user_service.py - Part of services module
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+from config import settings
+from sqlite import db_connection
+
+
+class UserCache:
+    """
+    Per-user read-through cache. Entries live for ttl_seconds; the least
+    recently used are dropped beyond max_entries. Writers to the underlying
+    rows call invalidate(user_id) (or invalidate_user for every cache).
+    A miss loads through the caller's connection when one is passed.
+    invalidate() bumps the user's generation; a load that started before it
+    is returned to its caller but not stored, so it cannot resurrect the
+    stale value.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int,
+                 loader: Callable[[sqlite3.Connection, int], object]):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.loader = loader
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()  # user_id -> (expires_at, value)
+        self._generations: Dict[int, int] = {}  # user_id -> invalidation count (only while a load is running)
+        self._loading: Dict[int, int] = {}  # user_id -> loads in flight
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale_loads = 0
+
+    def get(self, user_id: int, db: Optional[sqlite3.Connection] = None):
+        user_id = int(user_id)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            generation = self._generations.get(user_id, 0)
+            self._loading[user_id] = self._loading.get(user_id, 0) + 1
+
+        value = None
+        loaded = False
+        try:
+            with db_connection(db) as conn:
+                value = self.loader(conn, user_id)
+            loaded = True
+        finally:
+            with self._lock:
+                fresh = self._generations.get(user_id, 0) == generation
+                self._loading[user_id] -= 1
+                if not self._loading[user_id]:
+                    del self._loading[user_id]
+                    self._generations.pop(user_id, None)
+                if loaded and fresh:
+                    self._entries[user_id] = (now + self.ttl_seconds, value)
+                    self._entries.move_to_end(user_id)
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+                elif loaded:
+                    self.stale_loads += 1
+        return value
+
+    def invalidate(self, user_id: int):
+        user_id = int(user_id)
+        with self._lock:
+            self._entries.pop(user_id, None)
+            if user_id in self._loading:
+                self._generations[user_id] = self._generations.get(user_id, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            for user_id in self._loading:
+                self._generations[user_id] = self._generations.get(user_id, 0) + 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "stale_loads": self.stale_loads,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+def _load_status(db: sqlite3.Connection, user_id: int) -> Optional[dict]:
+    """{"is_active": bool, "is_premium": bool}, or None for an unknown user"""
+    row = db.execute(
+        "SELECT is_active, is_premium FROM users WHERE id = ?", (user_id,)
+    ).fetchone()
+    return {"is_active": bool(row[0]), "is_premium": bool(row[1])} if row else None
+
+
+USER_COLUMNS = ["id", "email", "phone", "auth_provider", "is_active", "is_premium", "created_at"]
+PROFILE_COLUMNS = [
+    "id", "user_id", "full_name", "nationality", "date_of_birth", "gpa", "budget",
+    "preferred_country", "preferred_major", "learning_style", "career_goal", "bio", "profile_image",
+    "profile_image_variants"
+]
+
+
+def _load_profile(db: sqlite3.Connection, user_id: int) -> Optional[tuple]:
+    """
+    (json_body, etag) for /auth/me, from one users LEFT JOIN student_profiles
+    query, or None for an unknown user
+    """
+    columns = [f"u.{c}" for c in USER_COLUMNS] + [f"p.{c}" for c in PROFILE_COLUMNS]
+    row = db.execute(
+        f"""SELECT {', '.join(columns)}
+            FROM users u LEFT JOIN student_profiles p ON p.user_id = u.id
+            WHERE u.id = ?""",
+        (user_id,)
+    ).fetchone()
+    if row is None:
+        return None
+
+    user = dict(zip(USER_COLUMNS, row[:len(USER_COLUMNS)]))
+    user["is_active"] = bool(user["is_active"])
+    user["is_premium"] = bool(user["is_premium"])
+    profile_row = row[len(USER_COLUMNS):]
+    profile = dict(zip(PROFILE_COLUMNS, profile_row)) if profile_row[0] is not None else None
+    if profile and profile["profile_image_variants"]:
+        profile["profile_image_variants"] = json.loads(profile["profile_image_variants"])
+
+    body = json.dumps(
+        {"user": user, "profile": profile}, ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+    etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+    return body, etag
+
+
+user_status_cache = UserCache(
+    settings.USER_STATUS_CACHE_TTL_SECONDS, settings.USER_STATUS_CACHE_MAX_ENTRIES, _load_status
+)
+profile_cache = UserCache(
+    settings.PROFILE_CACHE_TTL_SECONDS, settings.PROFILE_CACHE_MAX_ENTRIES, _load_profile
+)
+
+
+def invalidate_user(user_id: int):
+    """Drop every cached view of a user after writing users / student_profiles"""
+    user_status_cache.invalidate(user_id)
+    profile_cache.invalidate(user_id)
+
+
+def set_user_active(db, user_id: int, is_active: bool) -> bool:
+    """Activate or deactivate an account; returns False if the user does not exist"""
+    cursor = db.cursor()
+    cursor.execute("UPDATE users SET is_active = ? WHERE id = ?", (1 if is_active else 0, user_id))
+    db.commit()
+    invalidate_user(user_id)
+    return cursor.rowcount > 0
@@ -1,8 +1,200 @@
+import queue
 import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+from fastapi import HTTPException, Request, status
 from config import settings
 
-def get_db():
-    conn = sqlite3.connect(settings.DATABASE_NAME, check_same_thread=False)
-    conn.row_factory = sqlite3.Row
-    print(f"db connection sucessful created")
-    return conn
+
+STORAGE_PROFILE = {
+    "journal_mode": settings.DB_JOURNAL_MODE,
+    "synchronous": settings.DB_SYNCHRONOUS,
+    "mmap_size": settings.DB_MMAP_SIZE,
+    "cache_size": settings.DB_CACHE_SIZE,
+    "temp_store": settings.DB_TEMP_STORE,
+    "busy_timeout": settings.DB_BUSY_TIMEOUT_MS,
+    "foreign_keys": settings.DB_FOREIGN_KEYS,
+}
+
+
+def apply_storage_profile(conn: sqlite3.Connection, profile: dict = None):
+    """
+    Apply the storage PRAGMAs to a connection.
+    journal_mode=WAL lets readers proceed while a writer commits; the other
+    settings are per-connection and must be set every time a connection opens
+    (SQLite ignores REFERENCES and ON DELETE CASCADE unless foreign_keys is ON).
+    """
+    if profile is None:
+        profile = STORAGE_PROFILE
+    for pragma, value in profile.items():
+        conn.execute(f"PRAGMA {pragma} = {value}")
+
+
+class PoolTimeoutError(RuntimeError):
+    """Raised when no pooled connection becomes free within the timeout"""
+
+
+class ConnectionPool:
+    """
+    Bounded pool of SQLite connections shared by all request threads.
+    Connections are opened lazily up to `size` and handed back on release.
+    """
+
+    def __init__(self, database: str, size: int = 10, timeout: float = 5.0, profile: dict = None):
+        self.database = database
+        self.size = size
+        self.timeout = timeout
+        self.profile = profile
+        self._idle = queue.LifoQueue(maxsize=size)
+        self._lock = threading.Lock()
+        self._created = 0
+        self._checkouts = 0
+        self._waits = 0
+        self._wait_time = 0.0
+        self._timeouts = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.database, check_same_thread=False, timeout=self.timeout)
+        conn.row_factory = sqlite3.Row
+        apply_storage_profile(conn, self.profile)
+        return conn
+
+    def acquire(self) -> sqlite3.Connection:
+        """Check out a connection, waiting up to `timeout` seconds if the pool is exhausted"""
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = None
+            with self._lock:
+                if self._created < self.size:
+                    self._created += 1
+                    create = True
+                else:
+                    create = False
+            if create:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+            else:
+                started = time.perf_counter()
+                try:
+                    conn = self._idle.get(timeout=self.timeout)
+                except queue.Empty:
+                    with self._lock:
+                        self._timeouts += 1
+                    raise PoolTimeoutError(
+                        f"No database connection available after {self.timeout}s"
+                    )
+                finally:
+                    with self._lock:
+                        self._waits += 1
+                        self._wait_time += time.perf_counter() - started
+
+        with self._lock:
+            self._checkouts += 1
+        return conn
+
+    def release(self, conn: sqlite3.Connection):
+        """Return a connection to the pool, discarding any uncommitted work"""
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            # Broken connection - drop it so a fresh one is opened next time
+            conn.close()
+            with self._lock:
+                self._created -= 1
+            return
+        self._idle.put_nowait(conn)
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close_all(self):
+        """Close every idle connection (used on shutdown)"""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._created -= 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": self.size,
+                "open": self._created,
+                "idle": self._idle.qsize(),
+                "in_use": self._created - self._idle.qsize(),
+                "checkouts": self._checkouts,
+                "waits": self._waits,
+                "timeouts": self._timeouts,
+                "total_wait_ms": round(self._wait_time * 1000, 2),
+                "avg_wait_ms": round(self._wait_time * 1000 / self._waits, 2) if self._waits else 0.0,
+            }
+
+
+pool = ConnectionPool(settings.DATABASE_NAME, settings.DB_POOL_SIZE, settings.DB_POOL_TIMEOUT)
+
+
+def _database_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Database is busy, please retry"
+    )
+
+
+def get_db(request: Request):
+    """
+    FastAPI dependency yielding a pooled connection for the duration of a request.
+    The connection is always returned to the pool, even if the handler raises.
+    It is also left on request.state.db so other dependencies (the auth
+    checks) reuse it instead of checking out a second connection.
+    """
+    try:
+        conn = pool.acquire()
+    except PoolTimeoutError:
+        raise _database_busy()
+    request.state.db = conn
+    try:
+        yield conn
+    finally:
+        request.state.db = None
+        pool.release(conn)
+
+
+def request_db(request: Request) -> Optional[sqlite3.Connection]:
+    """The connection get_db checked out for this request, if any"""
+    return getattr(request.state, "db", None)
+
+
+@contextmanager
+def db_connection(db: Optional[sqlite3.Connection] = None):
+    """
+    Context manager for code outside the request cycle (services, scripts).
+    Passing the caller's connection as db reuses it, so a request never holds
+    two pooled connections at once. An exhausted pool is a 503, as in get_db.
+    """
+    if db is not None:
+        yield db
+        return
+    try:
+        conn = pool.acquire()
+    except PoolTimeoutError:
+        raise _database_busy()
+    try:
+        yield conn
+    finally:
+        pool.release(conn)
@@ -0,0 +1,139 @@
+# assets.py - Part of utils module
+"""
+Frontend asset build: fingerprinted copies of frontend/static with
+precompressed siblings, plus templates rewritten to point at them.
+
+    python backend/utils/assets.py   # build into ASSETS_BUILD_DIR
+"""
+import gzip
+import hashlib
+import json
+import os
+import re
+import tempfile
+
+try:
+    import brotli
+except ImportError:  # optional: gzip-only builds without it
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = {".css", ".js", ".html", ".svg", ".json", ".txt"}
+MIN_COMPRESS_BYTES = 256  # smaller files are served as-is
+TEMPLATES_DIR = "templates"
+MANIFEST_NAME = "manifest.json"
+
+# href="/static/css/x.css", src='/static/js/x.js'
+STATIC_REFERENCE = re.compile(r"""(?P<attr>\b(?:href|src)\s*=\s*)(?P<quote>["'])/static/(?P<path>[^"'?#]+)(?P=quote)""")
+
+
+def _write_atomic(path: str, data: bytes):
+    """Readers (other workers, the running server) never see a partial file"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def _write_with_encodings(path: str, data: bytes) -> list:
+    """Write data plus .br / .gz siblings when they are worth it; returns the codings written"""
+    _write_atomic(path, data)
+    encodings = []
+    if os.path.splitext(path)[1] not in COMPRESSIBLE_EXTENSIONS or len(data) < MIN_COMPRESS_BYTES:
+        return encodings
+    if brotli is not None:
+        _write_atomic(path + ".br", brotli.compress(data, quality=11))
+        encodings.append("br")
+    # mtime=0 keeps the .gz bytes (and so rebuilds) deterministic
+    _write_atomic(path + ".gz", gzip.compress(data, compresslevel=9, mtime=0))
+    encodings.append("gzip")
+    return encodings
+
+
+def _fingerprint(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:12]
+
+
+def build_assets(src_dir: str, out_dir: str) -> dict:
+    """
+    Build src_dir into out_dir and return the manifest (also written to
+    out_dir/manifest.json):
+
+    - every file outside templates/ is copied to assets/<dir>/<stem>.<hash><ext>
+    - every template has its /static/... references rewritten to those names
+      and is written to templates/<name>
+    - compressible files get .gz (and .br when brotli is installed) siblings
+
+    Fingerprinted names only change with content, so several workers building
+    the same tree at once write identical files.
+    """
+    manifest = {"assets": {}, "templates": {}}
+    written = set()
+
+    for root, _, files in os.walk(src_dir):
+        rel_root = os.path.relpath(root, src_dir)
+        if rel_root.split(os.sep)[0] == TEMPLATES_DIR:
+            continue
+        for name in sorted(files):
+            rel_path = os.path.normpath(os.path.join(rel_root, name)).replace(os.sep, "/")
+            with open(os.path.join(root, name), "rb") as f:
+                data = f.read()
+            digest = _fingerprint(data)
+            stem, ext = os.path.splitext(rel_path)
+            fingerprinted = f"{stem}.{digest}{ext}"
+            out_path = os.path.join(out_dir, "assets", fingerprinted)
+            encodings = _write_with_encodings(out_path, data)
+            written.add(out_path)
+            written.update(out_path + (".br" if c == "br" else ".gz") for c in encodings)
+            manifest["assets"][rel_path] = {
+                "url": f"/assets/{fingerprinted}",
+                "etag": f'"{digest}"',
+                "encodings": encodings,
+            }
+
+    def rewrite(match):
+        entry = manifest["assets"].get(match.group("path"))
+        if entry is None:
+            return match.group(0)
+        return f'{match.group("attr")}{match.group("quote")}{entry["url"]}{match.group("quote")}'
+
+    templates_src = os.path.join(src_dir, TEMPLATES_DIR)
+    for name in sorted(os.listdir(templates_src)) if os.path.isdir(templates_src) else []:
+        with open(os.path.join(templates_src, name), "r", encoding="utf-8") as f:
+            html = STATIC_REFERENCE.sub(rewrite, f.read())
+        data = html.encode("utf-8")
+        out_path = os.path.join(out_dir, TEMPLATES_DIR, name)
+        encodings = _write_with_encodings(out_path, data)
+        written.add(out_path)
+        written.update(out_path + (".br" if c == "br" else ".gz") for c in encodings)
+        manifest["templates"][name] = {"etag": f'"{_fingerprint(data)}"', "encodings": encodings}
+
+    # Fingerprints from earlier builds are no longer referenced by anything
+    for root, _, files in os.walk(out_dir):
+        for name in files:
+            path = os.path.join(root, name)
+            if path not in written and name != MANIFEST_NAME and not name.endswith(".part"):
+                os.remove(path)
+
+    _write_atomic(os.path.join(out_dir, MANIFEST_NAME), json.dumps(manifest, indent=2).encode("utf-8"))
+    return manifest
+
+
+def load_manifest(out_dir: str) -> dict:
+    with open(os.path.join(out_dir, MANIFEST_NAME), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+if __name__ == "__main__":
+    import sys
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from config import settings
+
+    result = build_assets(settings.ASSETS_SOURCE_DIR, settings.ASSETS_BUILD_DIR)
+    print(f"Built {len(result['assets'])} assets and {len(result['templates'])} templates "
+          f"into {settings.ASSETS_BUILD_DIR} (brotli: {'yes' if brotli else 'not installed'})")
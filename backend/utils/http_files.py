@@ -0,0 +1,112 @@
+# http_files.py - Part of utils module
+import mimetypes
+import os
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Optional, Sequence
+from urllib.parse import quote
+from fastapi import HTTPException, Request
+from fastapi.responses import FileResponse, Response
+
+
+def file_etag(stat_result: os.stat_result) -> str:
+    """Strong validator from size + mtime (changes whenever the file is replaced)"""
+    return f'"{stat_result.st_size:x}-{stat_result.st_mtime_ns:x}"'
+
+
+def accepts_encoding(request: Request, coding: str) -> bool:
+    """True if Accept-Encoding allows coding (q=0 means refused)"""
+    for part in request.headers.get("accept-encoding", "").split(","):
+        name, _, params = part.partition(";")
+        if name.strip().lower() not in (coding, "*"):
+            continue
+        params = params.strip().replace(" ", "")
+        if params.startswith("q="):
+            try:
+                return float(params[2:]) > 0
+            except ValueError:
+                return False
+        return True
+    return False
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match list against etag: weak comparison, "*" matches anything"""
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag.removeprefix("W/") in tags
+
+
+def is_not_modified(request: Request, etag: str, last_modified: float) -> bool:
+    """
+    Evaluate If-None-Match, or If-Modified-Since when no If-None-Match was
+    sent (RFC 9110 13.2.2). Weak comparison, as required for GET/HEAD.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag_matches(if_none_match, etag)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(last_modified) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def file_response(
+    request: Request,
+    path: str,
+    cache_control: str,
+    etag: Optional[str] = None,
+    media_type: Optional[str] = None,
+    encodings: Sequence[tuple] = (),
+    filename: Optional[str] = None,
+) -> Response:
+    """
+    Serve a file with validators, conditional requests and byte ranges.
+
+    encodings lists precompressed siblings as (coding, suffix) pairs in order
+    of preference, e.g. [("br", ".br"), ("gzip", ".gz")]; the first one the
+    client accepts is sent with Content-Encoding. etag defaults to
+    file_etag(); a per-coding suffix is added when an encoding is used.
+    Range / If-Range are handled by FileResponse; 304 is answered here.
+    """
+    served_path = path
+    content_encoding = None
+    for coding, suffix in encodings:
+        if accepts_encoding(request, coding):
+            served_path = path + suffix
+            content_encoding = coding
+            break
+
+    try:
+        stat_result = os.stat(served_path)
+    except (FileNotFoundError, NotADirectoryError):
+        raise HTTPException(status_code=404, detail="File not found")
+
+    etag = etag or file_etag(stat_result)
+    if content_encoding:
+        etag = etag[:-1] + f'-{content_encoding}"'
+
+    headers = {
+        "ETag": etag,
+        "Cache-Control": cache_control,
+        "Last-Modified": formatdate(stat_result.st_mtime, usegmt=True),
+    }
+    if encodings:
+        headers["Vary"] = "Accept-Encoding"
+
+    if is_not_modified(request, etag, stat_result.st_mtime):
+        return Response(status_code=304, headers=headers)
+
+    if content_encoding:
+        headers["Content-Encoding"] = content_encoding
+    if filename:
+        headers["Content-Disposition"] = f"attachment; filename*=utf-8''{quote(filename)}"
+
+    return FileResponse(
+        served_path,
+        headers=headers,
+        media_type=media_type or mimetypes.guess_type(filename or path)[0] or "application/octet-stream",
+        stat_result=stat_result,
+    )
@@ -0,0 +1,67 @@
+# image_processing.py - Part of utils module
+import os
+import warnings
+from PIL import Image, ImageOps
+
+# name -> (width, height, crop); crop=True fills the box exactly, otherwise fit inside it
+VARIANTS = {
+    "thumbnail": (160, 160, True),
+    "card": (480, 320, True),
+    "full": (1600, 1600, False),
+}
+
+FORMATS = {
+    "webp": {"format": "WEBP", "quality": 80, "method": 4},
+    "jpeg": {"format": "JPEG", "quality": 82, "optimize": True, "progressive": True},
+}
+
+# Pillow only warns between MAX_IMAGE_PIXELS and twice that (and raises
+# DecompressionBombError above); generate_variants turns the warning into an
+# error too, so nothing past the limit is decoded
+Image.MAX_IMAGE_PIXELS = 50_000_000
+
+def _has_alpha(image: Image.Image) -> bool:
+    return image.mode in ("RGBA", "LA", "PA") or (image.mode == "P" and "transparency" in image.info)
+
+def _flatten(image: Image.Image) -> Image.Image:
+    """JPEG has no alpha channel: composite transparent images onto white"""
+    if image.mode != "RGBA":
+        return image
+    background = Image.new("RGB", image.size, (255, 255, 255))
+    background.paste(image, mask=image.getchannel("A"))
+    return background
+
+def generate_variants(src_path: str, out_dir: str) -> dict:
+    """
+    Write every VARIANTS size in every FORMATS encoding to out_dir/<name>.<ext>.
+    Returns {name: {ext: {"path", "width", "height", "bytes"}}}.
+    Runs in a worker process.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", Image.DecompressionBombWarning)
+        with Image.open(src_path) as original:
+            image = ImageOps.exif_transpose(original)
+            # Keep transparency (logos) for WebP; JPEG variants are flattened onto white
+            image = image.convert("RGBA" if _has_alpha(image) else "RGB")
+
+    variants = {}
+    for name, (width, height, crop) in VARIANTS.items():
+        if crop:
+            resized = ImageOps.fit(image, (width, height), Image.Resampling.LANCZOS)
+        else:
+            resized = image.copy()
+            resized.thumbnail((width, height), Image.Resampling.LANCZOS)
+
+        variants[name] = {}
+        for ext, options in FORMATS.items():
+            path = os.path.join(out_dir, f"{name}.{ext}")
+            encoded = resized if options["format"] == "WEBP" else _flatten(resized)
+            encoded.save(path, **options)
+            variants[name][ext] = {
+                "path": path,
+                "width": resized.width,
+                "height": resized.height,
+                "bytes": os.path.getsize(path),
+            }
+    return variants
@@ -1,6 +1,59 @@
 # pdf_parser.py - Part of utils module
+import signal
+import threading
+import time
 import pdfplumber
 
 def extract_text(path):
     with pdfplumber.open(path) as pdf:
-        return "\n".join(p.page.extract_text() for p in pdf.pages)
+        return "\n".join(p.extract_text() or "" for p in pdf.pages)
+
+class _Timeout(Exception):
+    pass
+
+def _alarm(signum, frame):
+    raise _Timeout()
+
+def extract_text_budgeted(path: str, max_pages: int, max_seconds: float) -> dict:
+    """
+    Page-by-page extraction that stops at max_pages or max_seconds.
+    Each page's layout cache is released before the next one is parsed.
+    Meant to run in a worker process: a SIGALRM cuts off a single page that
+    would otherwise run past the time budget.
+    """
+    started = time.monotonic()
+    texts = []
+    page_count = 0
+    reason = None
+
+    use_alarm = hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread()
+    if use_alarm:
+        previous = signal.signal(signal.SIGALRM, _alarm)
+        signal.setitimer(signal.ITIMER_REAL, max_seconds)
+    try:
+        with pdfplumber.open(path) as pdf:
+            page_count = len(pdf.pages)
+            for page in pdf.pages:
+                if len(texts) >= max_pages:
+                    reason = "page_budget"
+                    break
+                if time.monotonic() - started > max_seconds:
+                    reason = "time_budget"
+                    break
+                texts.append(page.extract_text() or "")
+                page.close()
+    except _Timeout:
+        reason = "time_budget"
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+
+    return {
+        "text": "\n".join(texts),
+        "page_count": page_count,
+        "pages_parsed": len(texts),
+        "truncated": reason is not None,
+        "truncated_reason": reason,
+        "seconds": round(time.monotonic() - started, 3),
+    }
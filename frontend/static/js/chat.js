@@ -1,13 +1,60 @@
 async function send() {
   const msg = document.getElementById("msg").value;
-  document.getElementById("chat").innerHTML += `<div>User: ${msg}</div>`;
+  const chat = document.getElementById("chat");
+  chat.innerHTML += `<div>User: ${msg}</div>`;
 
-  const res = await fetch("http://localhost:8000/chat", {
+  const bot = document.createElement("div");
+  bot.textContent = "Bot: ";
+  chat.appendChild(bot);
+
+  const res = await fetch("http://localhost:8000/chat/stream", {
     method:"POST",
     headers:{ "Content-Type":"application/json" },
     body:JSON.stringify({ user_id:1, message:msg })
   });
 
-  const data = await res.json();
-  document.getElementById("chat").innerHTML += `<div>Bot: ${data.reply}</div>`;
+  // Errors (429 from the rate limiter, 4xx/5xx) are plain JSON, not an event stream
+  if (!res.ok) {
+    let detail = res.statusText;
+    try {
+      const body = await res.json();
+      if (typeof body.detail === "string") detail = body.detail;
+    } catch (e) {}
+    const retryAfter = res.headers.get("Retry-After");
+    if (res.status === 429 && retryAfter) detail += ` (retry in ${retryAfter}s)`;
+    bot.textContent += `[${detail}]`;
+    return;
+  }
+
+  // Server-Sent Events over a POST body: read the stream and split on blank lines
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream:true });
+
+    let boundary;
+    while ((boundary = buffer.indexOf("\n\n")) !== -1) {
+      const raw = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+
+      let event = "message";
+      let data = "";
+      for (const line of raw.split("\n")) {
+        if (line.startsWith("event: ")) event = line.slice(7);
+        else if (line.startsWith("data: ")) data += line.slice(6);
+      }
+      if (!data) continue;
+      const payload = JSON.parse(data);
+
+      if (event === "error") {
+        bot.textContent += ` [${payload.detail}]`;
+      } else if (event === "message") {
+        bot.textContent += payload.token;
+      }
+    }
+  }
 }